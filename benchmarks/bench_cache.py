@@ -0,0 +1,71 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from match_cache import MatchCache
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, load_palette_table
+
+def workload(size, distinct, seed=0):
+    # Few distinct colors repeated many times, like brand colors and near-identical cluster centers
+    rng = np.random.default_rng(seed)
+    colors = rng.integers(0, 256, (distinct, 3))
+    return colors[rng.zipf(1.3, size) % distinct]
+
+def check(matcher, colors, directory):
+    expected, expected_distances = matcher.match(colors)
+
+    cache = MatchCache(matcher, max_size=len(colors))
+    for _ in range(2):
+        indices, distances = cache.match(colors)
+        assert np.array_equal(indices, expected) and np.allclose(distances, expected_distances)
+    distinct = len(np.unique(np.asarray(colors), axis=0))
+    assert cache.misses == distinct and cache.hits == 2 * len(colors) - distinct, cache.stats()
+
+    # Quantized keys answer for the cell center
+    quantized = MatchCache(matcher, bits=5)
+    centers = (np.asarray(colors) >> 3 << 3) + 3.5
+    assert np.array_equal(quantized.match(colors)[0], matcher.match(centers)[0])
+
+    small = MatchCache(matcher, max_size=10)
+    small.match(colors[:50])
+    assert len(small.entries) <= 10 and small.evictions == len(np.unique(colors[:50], axis=0)) - len(small.entries)
+
+    path = os.path.join(directory, 'cache.npz')
+    cache.save(path)
+    reloaded = MatchCache.load(matcher, path=path)
+    assert list(reloaded.entries.items()) == list(cache.entries.items())
+    assert np.array_equal(reloaded.match(colors)[0], expected) and reloaded.misses == 0
+
+    # A different palette must not reuse persisted matches
+    other = PantoneMatcher({'00-0000': {'name': 'only', 'hex': '808080'}}, metric=matcher.metric)
+    assert len(MatchCache.load(other, path=path).entries) == 0
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the match cache and time it on a repetitive workload.')
+    parser.add_argument('--size', type=int, default=20000, help='Colors per batch')
+    parser.add_argument('--distinct', type=int, default=500, help='Distinct colors in the workload')
+    parser.add_argument('--batch', type=int, default=9, help='Colors per call, like one image palette')
+    args = parser.parse_args()
+
+    table = load_palette_table(PANTONE_FILE_PATH)
+    colors = workload(args.size, args.distinct)
+    with tempfile.TemporaryDirectory() as directory:
+        for metric in ('rgb', 'de2000'):
+            matcher = PantoneMatcher(table, metric=metric)
+            check(matcher, colors[:2000], directory)
+
+            timings = {}
+            for label, target in (('uncached', matcher), ('cached', MatchCache(matcher, max_size=4096))):
+                start = time.perf_counter()
+                for i in range(0, len(colors), args.batch):
+                    target.match(colors[i:i + args.batch])
+                timings[label] = time.perf_counter() - start
+            stats = target.stats()
+            print(f"{metric:<7} {len(colors)} colors in calls of {args.batch}: uncached {timings['uncached'] * 1000:8.1f} ms"
+                  f"  cached {timings['cached'] * 1000:8.1f} ms  hit rate {stats['hit_rate']:.1%}"
+                  f"  evictions {stats['evictions']}")
+
+if __name__ == '__main__':
+    main()
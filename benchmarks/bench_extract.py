@@ -0,0 +1,82 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from extract_html import iter_swatches
+
+HTML_PATH = './pantone-colors.html'
+ITEM_MARKER = '<div class="col-3 color-item">'
+
+def soup_full(file_path):
+    from bs4 import BeautifulSoup
+    with open(file_path, 'r') as file:
+        soup = BeautifulSoup(file, 'html.parser')
+    return [swatch_record(tag) for tag in soup.find_all(attrs={'data-clipboard-text': True})]
+
+def soup_strained(file_path):
+    from bs4 import BeautifulSoup, SoupStrainer
+    with open(file_path, 'r') as file:
+        soup = BeautifulSoup(file, 'html.parser', parse_only=SoupStrainer(attrs={'data-clipboard-text': True}))
+    return [swatch_record(tag) for tag in soup.find_all(attrs={'data-clipboard-text': True})]
+
+def swatch_record(tag):
+    name = [cls for cls in tag.get('class', []) if cls not in ('color-box', 'color-name', 'color-item')][0]
+    return name, tag['data-clipboard-text']
+
+def streaming(file_path):
+    return list(iter_swatches(file_path))
+
+EXTRACTORS = [('bs4 full tree', soup_full), ('bs4 SoupStrainer', soup_strained), ('streaming', streaming)]
+
+def enlarged_copy(file_path, factor, directory):
+    with open(file_path, 'r') as file:
+        html = file.read()
+    # Repeat the swatch blocks to get a vendor-sized dump with the same structure
+    start = html.index(ITEM_MARKER)
+    end = html.rindex('</div>', 0, html.rindex('</div>')) + len('</div>')
+    items = html[start:end]
+    path = os.path.join(directory, f'pantone-colors-x{factor}.html')
+    with open(path, 'w') as file:
+        file.write(html[:start])
+        for _ in range(factor):
+            file.write(items)
+        file.write(html[end:])
+    return path
+
+def measure(extract, file_path):
+    start = time.perf_counter()
+    records = extract(file_path)
+    elapsed = time.perf_counter() - start
+
+    # Separate run: tracemalloc slows the parsers down several times
+    tracemalloc.start()
+    extract(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare swatch extraction from pantone-colors.html.')
+    parser.add_argument('--factor', type=int, default=100, help='Size multiplier of the synthetic dump')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        inputs = [('shipped', HTML_PATH), (f'x{args.factor}', enlarged_copy(HTML_PATH, args.factor, directory))]
+        for label, file_path in inputs:
+            size = os.path.getsize(file_path) / 1e6
+            expected = None
+            for name, extract in EXTRACTORS:
+                try:
+                    records, elapsed, peak = measure(extract, file_path)
+                except ImportError:
+                    print(f'{label:<8} {name:<17} skipped (bs4 not installed)')
+                    continue
+                if expected is None:
+                    expected = records
+                assert records == expected, f'{name} disagrees on {label}'
+                print(f'{label:<8} {size:7.1f} MB  {name:<17} {len(records):>7} swatches  '
+                      f'{elapsed * 1000:9.1f} ms  peak {peak / 1e6:7.1f} MB')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import time
+import numpy as np
+from matcher import PantoneMatcher, METRICS
+
+PANTONE_FILE_PATH = './engine/pantone-html-cmyk.json'
+
+def bench_metric(metric, colors, repeat):
+    start = time.perf_counter()
+    matcher = PantoneMatcher.from_json(PANTONE_FILE_PATH, metric=metric)
+    matcher.match(colors[:1])
+    setup = time.perf_counter() - start
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matcher.match(colors)
+        best = min(best, time.perf_counter() - start)
+
+    return setup, best
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare matching throughput of each distance metric.')
+    parser.add_argument('--colors', type=int, default=10000, help='Query colors per batch')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    colors = np.random.default_rng(args.seed).integers(0, 256, (args.colors, 3))
+
+    print(f"{'metric':<8} {'setup ms':>10} {'batch ms':>10} {'colors/s':>12}")
+    for metric in METRICS:
+        setup, elapsed = bench_metric(metric, colors, args.repeat)
+        print(f'{metric:<8} {setup * 1000:>10.2f} {elapsed * 1000:>10.2f} {len(colors) / elapsed:>12.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from benchmarks.suite import synthetic_palette
+from palette import PANTONE_FILE_PATH, Palette, load_json_palette, load_palette_table, load_pantone_colors
+
+def retained(load):
+    # Memory still held by the loaded structure, and the time the load took
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = load()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, size, elapsed
+
+def best_time(load, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the dict palette with the structure-of-arrays Palette.')
+    parser.add_argument('--size', type=int, default=100000, help='Size of the synthetic palette')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic_path = os.path.join(directory, 'palette.json')
+        with open(synthetic_path, 'w') as f:
+            json.dump(synthetic_palette(args.size), f)
+        cache_dir = os.path.join(directory, 'cache')
+
+        for label, path in (('shipped', PANTONE_FILE_PATH), (f'{args.size // 1000}k', synthetic_path)):
+            load_palette_table(path, cache_dir)
+            loaders = {
+                'dict (json)': lambda: load_json_palette(path),
+                'dict (compiled)': lambda: load_pantone_colors(path, cache_dir),
+                'Palette': lambda: Palette.load(path, cache_dir),
+            }
+            palette = Palette.load(path, cache_dir)
+            assert palette.to_dict() == load_pantone_colors(path, cache_dir)
+
+            print(f'{label}: {len(palette)} swatches')
+            for name, load in loaders.items():
+                _, size, _ = retained(load)
+                print(f'  {name:<16} load {best_time(load, args.repeat) * 1000:8.1f} ms   memory {size / 1e6:7.2f} MB')
+
+            codes = palette.codes[::max(1, len(palette) // 1000)]
+            start = time.perf_counter()
+            for code in codes:
+                palette.index[code]
+            lookup = (time.perf_counter() - start) / len(codes)
+            start = time.perf_counter()
+            subset = palette.select(prefix='19-')
+            select = time.perf_counter() - start
+            print(f'  code -> index {lookup * 1e9:.0f} ns, select(prefix="19-") {select * 1000:.1f} ms ({len(subset)} swatches)')
+
+if __name__ == '__main__':
+    main()
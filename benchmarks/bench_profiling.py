@@ -0,0 +1,57 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import profiling
+from profiling import stage
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - start) / calls * 1e9
+
+def bare(calls):
+    for _ in range(calls):
+        pass
+
+def staged(calls):
+    for _ in range(calls):
+        with stage('noop', items=1):
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the cost of the stage instrumentation.')
+    parser.add_argument('--calls', type=int, default=1000000)
+    args = parser.parse_args()
+
+    profiling.disable()
+    disabled = per_call(staged, args.calls) - per_call(bare, args.calls)
+    print(f'disabled: {disabled:8.1f} ns per stage')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'profile.jsonl')
+        profiling.enable(path)
+        try:
+            calls = max(1, args.calls // 100)
+            enabled = per_call(staged, calls) - per_call(bare, calls)
+            with stage('outer', image='x.png'):
+                with stage('inner'):
+                    block = bytearray(64 << 20)
+                del block
+        finally:
+            profiling.disable()
+
+        with open(path, 'r') as f:
+            records = [json.loads(line) for line in f]
+    print(f'enabled:  {enabled / 1000:8.1f} us per stage (one JSON line each)')
+
+    inner, outer = records[-2], records[-1]
+    assert len(records) == calls + 2
+    assert inner['stage'] == 'inner' and inner['image'] == 'x.png'
+    # The outer stage keeps the peak seen inside the inner one
+    assert outer['peak_rss_mb'] >= inner['peak_rss_mb'] >= 64
+    print(f"nested peak RSS: inner {inner['peak_rss_mb']} MB, outer {outer['peak_rss_mb']} MB ({inner['rss_scope']} scope)")
+
+if __name__ == '__main__':
+    main()
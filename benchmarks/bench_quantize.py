@@ -0,0 +1,60 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from benchmarks.bench_reduction import palette_drift, synthetic_image
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, load_palette_table
+from quantize import QUANTIZERS, quantize
+
+def quantization_error(pixels, centers):
+    # RMS distance from each pixel to its nearest center
+    pixels = pixels.astype(np.float64)
+    d2 = (pixels ** 2).sum(1)[:, None] - 2 * pixels @ centers.T + (centers ** 2).sum(1)[None, :]
+    return np.sqrt(np.maximum(d2.min(axis=1), 0).mean())
+
+def run(pixels, num_colors, method, seed):
+    start = time.perf_counter()
+    centers = quantize(pixels, num_colors, method, seed=seed).astype(int)
+    return centers, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the quantizer backends with scikit-learn KMeans.')
+    parser.add_argument('--sizes', nargs='*', default=['640x480', '1600x1200'], help='Synthetic image sizes, WxH')
+    parser.add_argument('--images', nargs='*', default=[], help='Real images to add to the comparison')
+    parser.add_argument('--colors', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    matcher = PantoneMatcher(load_palette_table(PANTONE_FILE_PATH))
+    with tempfile.TemporaryDirectory() as directory:
+        images = list(args.images)
+        for size in args.sizes:
+            width, height = (int(v) for v in size.split('x'))
+            path = os.path.join(directory, f'synthetic-{size}.png')
+            synthetic_image(path, width, height, seed=args.seed)
+            images.append(path)
+
+        for path in images:
+            pixels = np.asarray(Image.open(path).convert('RGB')).reshape(-1, 3)
+            reference, _ = run(pixels, args.colors, 'kmeans', args.seed)
+            reference_codes = set(matcher.codes[i] for i in matcher.match(reference)[0])
+
+            print(f'{os.path.basename(path)} ({len(pixels)} pixels)')
+            print(f'  {"quantizer":<12} {"time ms":>9} {"speedup":>8} {"rms error":>10} {"drift":>7} {"pantone overlap":>16}')
+            timings = {}
+            for method in QUANTIZERS:
+                centers, elapsed = run(pixels, args.colors, method, args.seed)
+                timings[method] = elapsed
+                again, _ = run(pixels, args.colors, method, args.seed)
+                codes = set(matcher.codes[i] for i in matcher.match(centers)[0])
+                overlap = len(codes & reference_codes) / len(reference_codes)
+                deterministic = '' if np.array_equal(centers, again) else '  (differs between runs)'
+                print(f'  {method:<12} {elapsed * 1000:9.1f} {timings["kmeans"] / elapsed:7.1f}x '
+                      f'{quantization_error(pixels, centers):10.2f} {palette_drift(reference, centers):7.2f} '
+                      f'{overlap:15.0%}{deterministic}')
+
+if __name__ == '__main__':
+    main()
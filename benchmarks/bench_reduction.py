@@ -0,0 +1,72 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image
+from picker import extract_colors
+
+MODES = {
+    'full': {'seed': 0},
+    'downscale-512': {'max_side': 512, 'seed': 0},
+    'random-100k': {'sample': 'random', 'max_pixels': 100000, 'seed': 0},
+    'stratified-100k': {'sample': 'stratified', 'max_pixels': 100000, 'seed': 0},
+    'unique': {'unique': True, 'seed': 0},
+    'stratified-100k+unique': {'sample': 'stratified', 'max_pixels': 100000, 'unique': True, 'seed': 0},
+}
+
+def synthetic_image(path, width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    # Smooth gradients with a few flat blocks and noise, roughly photo-like
+    y, x = np.mgrid[0:height, 0:width]
+    img = np.stack([
+        255 * x / width,
+        255 * y / height,
+        127 + 127 * np.sin(x / 97.0) * np.cos(y / 61.0)
+    ], axis=-1)
+    for _ in range(12):
+        x0, y0 = rng.integers(0, width), rng.integers(0, height)
+        img[y0:y0 + height // 6, x0:x0 + width // 6] = rng.integers(0, 256, 3)
+    img += rng.normal(0, 6, img.shape)
+    Image.fromarray(np.clip(img, 0, 255).astype(np.uint8)).save(path)
+
+def palette_drift(reference, colors):
+    # Mean distance from each reference center to its nearest counterpart, both ways
+    d = np.sqrt(((reference[:, None, :] - colors[None, :, :]) ** 2).sum(-1))
+    return (d.min(axis=1).mean() + d.min(axis=0).mean()) / 2
+
+def run(image_path, options):
+    tracemalloc.start()
+    start = time.perf_counter()
+    colors = extract_colors(image_path, **options)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return colors, elapsed, peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Time, memory and palette drift of extract_colors reduction modes.')
+    parser.add_argument('image', nargs='?', help='Image to analyze (default: synthetic image)')
+    parser.add_argument('--size', default='2000x1500', help='Synthetic image size, WxH')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = args.image
+        if not image_path:
+            width, height = (int(v) for v in args.size.split('x'))
+            image_path = os.path.join(tmp, 'synthetic.png')
+            synthetic_image(image_path, width, height)
+
+        print(f'Image: {image_path}')
+        print(f"{'mode':<24} {'time s':>8} {'saved':>7} {'peak MB':>9} {'saved':>7} {'drift':>7}")
+        reference = None
+        for name, options in MODES.items():
+            colors, elapsed, peak = run(image_path, options)
+            if reference is None:
+                reference, base_time, base_peak = colors, elapsed, peak
+            print(f'{name:<24} {elapsed:>8.2f} {1 - elapsed / base_time:>7.0%} {peak / 2 ** 20:>9.1f} '
+                  f'{1 - peak / base_peak:>7.0%} {palette_drift(reference, colors):>7.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_reduction import synthetic_image
+from lut import PantoneLUT
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, Palette
+from remap import remap_image
+
+def check(image_path, matcher, lut):
+    from PIL import Image
+
+    # Reference: every pixel through the matcher directly, no dedupe or chunking
+    pixels = np.asarray(Image.open(image_path).convert('RGB')).reshape(-1, 3)
+    expected, _ = matcher.match(pixels)
+    runs = [
+        dict(jobs=1),
+        dict(jobs=2, chunk_pixels=pixels.shape[0] // 7),
+        dict(jobs=2, chunk_pixels=pixels.shape[0] // 7, lut=lut),
+    ]
+    for options in runs:
+        with remap_image(image_path, matcher, **options) as (output, indices, counts):
+            assert np.array_equal(indices.reshape(-1), expected)
+            assert np.array_equal(output.reshape(-1, 3), np.rint(matcher.rgb[expected]).astype(np.uint8))
+            assert np.array_equal(counts, np.bincount(expected, minlength=len(matcher)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-image remap throughput by worker count.')
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--jobs', type=int, nargs='*', help='Worker counts to try (default: 1, 2, 4 ... CPU count)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    jobs = args.jobs or sorted({1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus} | {cpus})
+    matcher = PantoneMatcher(Palette.load(PANTONE_FILE_PATH))
+    lut = PantoneLUT.load()
+
+    with tempfile.TemporaryDirectory() as directory:
+        small_path = os.path.join(directory, 'small.png')
+        synthetic_image(small_path, 320, 240)
+        check(small_path, matcher, lut)
+        print('Remap matches the per-pixel matcher for 1 and 2 workers, with and without the lookup table')
+
+        image_path = os.path.join(directory, 'image.png')
+        synthetic_image(image_path, args.width, args.height)
+        megapixels = args.width * args.height / 1e6
+        print(f'{args.width}x{args.height} ({megapixels:.1f} MP), {len(matcher)} swatches, {cpus} CPU(s)')
+
+        for label, table in (('matcher only', None), (f'{lut.bits}-bit lookup table', lut)):
+            print(f'  {label}')
+            baseline = None
+            for count in jobs:
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    with remap_image(image_path, matcher, jobs=count, lut=table):
+                        pass
+                    timings.append(time.perf_counter() - start)
+                best = min(timings)
+                baseline = baseline or best
+                print(f'    -j {count:<3} {best:8.2f} s  {megapixels / best:7.2f} MP/s  speedup {baseline / best:5.2f}x')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import random
+import time
+from creator import card_search_index
+from palette import PANTONE_FILE_PATH, load_pantone_colors
+from search_index import build_search_index, decode_postings, search
+
+def viewer_fields(colors):
+    # The fields each generated page searched with its old substring scan
+    return {
+        'creator': [[code, color['name'], f"#{color['hex'].upper()}"] for code, color in colors.items()],
+        'list': [[color['name'], color['hex'], ', '.join(f'{value:.2f}' for value in color['cmyk'])]
+                 for color in colors.values()],
+        'pantoner2': [[color['name'], f"#{color['hex']}"] for color in colors.values()],
+    }
+
+def substring_matches(fields, query):
+    query = query.lower()
+    return [i for i, values in enumerate(fields) if any(query in value.lower() for value in values)]
+
+def sample_queries(fields, count, seed):
+    rng = random.Random(seed)
+    queries = ['', 'a', 'bl', 'blue', '#f', '19-', 'zzz', '0.00', 'dark-blue']
+    for _ in range(count):
+        value = rng.choice(rng.choice(fields)).lower()
+        start = rng.randrange(len(value))
+        queries.append(value[start:start + rng.randint(1, 8)])
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the viewer search index against the old substring scan.')
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    colors = load_pantone_colors(PANTONE_FILE_PATH)
+    print(f"{'viewer':<10} {'queries':>8} {'scan ms':>9} {'index ms':>9}")
+    for viewer, fields in viewer_fields(colors).items():
+        index = card_search_index(colors) if viewer == 'creator' else build_search_index(fields)
+        postings = decode_postings(index)
+        queries = sample_queries(fields, args.queries, args.seed)
+
+        start = time.perf_counter()
+        for query in queries:
+            substring_matches(fields, query)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            search(index, query, postings)
+        index_time = time.perf_counter() - start
+
+        print(f'{viewer:<10} {len(queries):>8} {scan_time * 1000:>9.1f} {index_time * 1000:>9.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from PIL import Image
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, Palette
+from sequence import DEFAULT_THRESHOLD, SequenceAnalyzer, iter_frames
+
+def synthetic_sequence(path, frames, width, height, scene_length=60, seed=0):
+    # A slow pan over a scene with sensor noise, cutting to a new scene every scene_length frames
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width + frames]
+    images = []
+    for frame in range(frames):
+        if frame % scene_length == 0:
+            tint = rng.integers(0, 256, 3)
+            scene = np.stack([
+                (255 * x / (width + frames) + tint[0]) % 256,
+                (255 * y / height + tint[1]) % 256,
+                127 + 127 * np.sin((x + tint[2]) / 37.0) * np.cos(y / 23.0),
+            ], axis=-1)
+        view = scene[:, frame:frame + width] + rng.normal(0, 3, (height, width, 3))
+        images.append(Image.fromarray(np.clip(view, 0, 255).astype(np.uint8)))
+    images[0].save(path, save_all=True, append_images=images[1:])
+
+def run(path, matcher, threshold, warm=True):
+    analyzer = SequenceAnalyzer(matcher, quantizer='hist-kmeans', threshold=threshold, seed=0)
+    timings = []
+    for _, pixels in iter_frames([path]):
+        if not warm:
+            analyzer.centers = None
+        start = time.perf_counter()
+        analyzer.add(pixels)
+        timings.append(time.perf_counter() - start)
+    return analyzer, np.array(timings)
+
+def peak_memory(path, matcher):
+    tracemalloc.start()
+    run(path, matcher, DEFAULT_THRESHOLD)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main():
+    parser = argparse.ArgumentParser(description='Sequence mode: warm starts, frame skipping and flat cost per frame.')
+    parser.add_argument('--frames', type=int, default=240)
+    parser.add_argument('--width', type=int, default=320)
+    parser.add_argument('--height', type=int, default=240)
+    args = parser.parse_args()
+
+    matcher = PantoneMatcher(Palette.load(PANTONE_FILE_PATH))
+    with tempfile.TemporaryDirectory() as directory:
+        short_path = os.path.join(directory, 'short.tif')
+        long_path = os.path.join(directory, 'long.tif')
+        synthetic_sequence(short_path, max(2, args.frames // 8), args.width, args.height)
+        synthetic_sequence(long_path, args.frames, args.width, args.height)
+        print(f'{args.frames} frames of {args.width}x{args.height}')
+
+        runs = {
+            'cold, every frame': run(long_path, matcher, 0.0, warm=False),
+            'warm, every frame': run(long_path, matcher, 0.0),
+            f'warm, skip < {DEFAULT_THRESHOLD}': run(long_path, matcher, DEFAULT_THRESHOLD),
+        }
+        for label, (analyzer, timings) in runs.items():
+            half = len(timings) // 2
+            print(f'  {label:<22} {timings.mean() * 1000:7.2f} ms/frame  '
+                  f'(first half {timings[:half].mean() * 1000:6.2f}, second half {timings[half:].mean() * 1000:6.2f})  '
+                  f'{analyzer.analyzed} clustered')
+
+        analyzer, _ = runs[f'warm, skip < {DEFAULT_THRESHOLD}']
+        assert analyzer.frames == args.frames
+        assert 0 < analyzer.analyzed < analyzer.frames
+        assert analyzer.palette()
+
+        short, long = peak_memory(short_path, matcher), peak_memory(long_path, matcher)
+        print(f'  peak traced memory: {short / 1e6:.1f} MB for {args.frames // 8} frames, {long / 1e6:.1f} MB for {args.frames}')
+        assert long < short * 1.5
+
+if __name__ == '__main__':
+    main()
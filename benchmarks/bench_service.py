@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from benchmarks.bench_reduction import synthetic_image
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(
+        f'{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n\r\n'.encode() + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        key, _, value = line.decode().partition(':')
+        if key.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def wait_ready(host, port, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+            status, _ = await request(reader, writer, 'GET', '/health')
+            writer.close()
+            if status == 200:
+                return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError('Service did not come up')
+
+async def load(host, port, scenario, clients, total):
+    latencies, statuses = [], {}
+    remaining = iter(range(total))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        for _ in remaining:
+            method, path, payload = scenario()
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, method, path, payload)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return np.array(latencies), statuses, time.perf_counter() - start
+
+def scenarios(image_path, seed=0):
+    rng = np.random.default_rng(seed)
+    random_hex = lambda: '#' + ''.join(f'{c:02x}' for c in rng.integers(0, 256, 3))
+    return {
+        'match-get': lambda: ('GET', f'/match?hex={random_hex()[1:]}', None),
+        'match-post': lambda: ('POST', '/match', {'color': random_hex()}),
+        'batch-100': lambda: ('POST', '/match', {'colors': [random_hex() for _ in range(100)]}),
+        'batch-5000': lambda: ('POST', '/match', {'colors': rng.integers(0, 256, (5000, 3)).tolist()}),
+        'extract': lambda: ('POST', '/extract', {'path': image_path, 'colors': 9, 'max_side': 256, 'seed': 0}),
+    }
+
+async def run(host, port, clients, requests, image_path, only):
+    await wait_ready(host, port)
+
+    # Correctness spot checks against the resident matcher
+    reader, writer = await asyncio.open_connection(host, port)
+    status, body = await request(reader, writer, 'GET', '/match?hex=ff0000')
+    assert status == 200 and body['match']['distance'] >= 0, body
+    status, body = await request(reader, writer, 'POST', '/match', {'colors': ['#ffffff', [0, 0, 0]]})
+    assert status == 200 and len(body['matches']) == 2, body
+    status, _ = await request(reader, writer, 'POST', '/match', {'color': 'nope'})
+    assert status == 400
+    writer.close()
+
+    print(f'{"scenario":<12} {"requests":>8} {"clients":>7} {"p50 ms":>9} {"p99 ms":>9} {"req/s":>9}  status')
+    for name, scenario in scenarios(image_path).items():
+        if only and name not in only:
+            continue
+        count = requests if not name.startswith(('batch-5000', 'extract')) else max(1, requests // 20)
+        latencies, statuses, elapsed = await load(host, port, scenario, clients, count)
+        p50, p99 = np.percentile(latencies * 1000, [50, 99])
+        print(f'{name:<12} {count:>8} {clients:>7} {p50:9.2f} {p99:9.2f} {count / elapsed:9.1f}  {statuses}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the matching service and report p50/p99 latency.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='Test a service already running here instead of starting one')
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent keep-alive connections')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per scenario (fewer for heavy ones)')
+    parser.add_argument('--jobs', type=int, help='Worker processes for a started service')
+    parser.add_argument('--only', nargs='*', help='Scenarios to run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        image_path = os.path.join(directory, 'load.png')
+        synthetic_image(image_path, 1024, 768)
+
+        process = None
+        port = args.port
+        if port is None:
+            port = free_port()
+            command = [sys.executable, 'server.py', '--host', args.host, '--port', str(port)]
+            if args.jobs:
+                command += ['--jobs', str(args.jobs)]
+            process = subprocess.Popen(command)
+        try:
+            asyncio.run(run(args.host, port, args.clients, args.requests, image_path, args.only))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import json
+import time
+import numpy as np
+from palette import PANTONE_FILE_PATH, SORT_ORDERS, load_pantone_colors, sort_orders
+
+def synthetic_palette(size, seed=0):
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, (size, 3))
+    # Duplicate names and hexes, so ties are part of the workload
+    return {
+        f'{11 + i % 9}-{i:05d}': {'name': f'color-{i % (size // 4 + 1)}', 'hex': ''.join(f'{c:02x}' for c in rgb[i // 2 * 2])}
+        for i in range(size)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the precomputed sort orders.')
+    parser.add_argument('--size', type=int, default=20000, help='Size of the synthetic palette')
+    args = parser.parse_args()
+
+    palettes = {'shipped': load_pantone_colors(PANTONE_FILE_PATH), 'synthetic': synthetic_palette(args.size)}
+    for label, pantone_colors in palettes.items():
+        start = time.perf_counter()
+        orders = sort_orders(pantone_colors)
+        elapsed = time.perf_counter() - start
+        size = len(json.dumps(orders, separators=(',', ':')))
+        print(f'{label:<10} {len(pantone_colors):>7} swatches  {len(SORT_ORDERS)} orders, both directions, '
+              f'in {elapsed * 1000:.1f} ms  ({size / 1e3:.0f} kB embedded)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ('sklearn', 'PIL', 'scipy')
+COMMANDS = {
+    # What `import picker` cost when PIL and scikit-learn were imported at module top
+    'eager imports': ['-c', 'import PIL.Image, sklearn.cluster, picker'],
+    'import picker': ['-c', 'import picker'],
+    'picker.py hex': ['picker.py', 'hex', 'ff6f61'],
+}
+
+def import_times(args):
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, total_us, name = line.split('|')
+        # Keep the indentation: it encodes nesting
+        cumulative[name[1:]] = int(total_us)
+    return cumulative
+
+def wall_time(args, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure picker cold start with -X importtime.')
+    parser.add_argument('--runs', type=int, default=5, help='Process launches per command for the wall time')
+    args = parser.parse_args()
+
+    print(f'{"command":<16} {"wall ms":>9} {"imports ms":>11}  heavy modules loaded')
+    for label, command in COMMANDS.items():
+        modules = import_times(command)
+        # Top-level modules only, so nested imports aren't counted twice
+        top_level = {name: total for name, total in modules.items() if not name.startswith(' ')}
+        heavy = sorted({name.strip().split('.')[0] for name in modules} & set(HEAVY_MODULES))
+        wall = wall_time(command, args.runs)
+        print(f'{label:<16} {wall * 1000:9.1f} {sum(top_level.values()) / 1000:11.1f}  {", ".join(heavy) or "none"}')
+        if label == 'picker.py hex':
+            assert not heavy, f'hex matching loaded {heavy}'
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from benchmarks.bench_reduction import synthetic_image
+from streaming import DEFAULT_TILE_ROWS, image_histogram, iter_strips
+
+FORMATS = {
+    'raw TIFF': ('raw.tif', {}),
+    'LZW TIFF': ('lzw.tif', {'compression': 'tiff_lzw'}),
+    'tiled Deflate TIFF': ('tiled.tif', {'compression': 'tiff_adobe_deflate', 'tile': (256, 256)}),
+    'PNG': ('image.png', {}),
+    'JPEG': ('image.jpg', {'quality': 90}),
+}
+
+def read_hwm():
+    with open('/proc/self/status', 'r') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+
+def child(mode, image_path, tile_rows):
+    # Runs in a fresh process, so VmHWM is this mode's peak RSS alone
+    if mode == 'streamed':
+        image_histogram(image_path, tile_rows)
+    elif mode == 'full':
+        with Image.open(image_path) as img:
+            np.asarray(img.convert('RGB'))
+    print(read_hwm())
+
+def peak_rss(mode, image_path, tile_rows=DEFAULT_TILE_ROWS):
+    command = [sys.executable, '-m', 'benchmarks.bench_streaming', '--child', mode, image_path, str(tile_rows)]
+    start = time.perf_counter()
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return int(output.split()[-1]), time.perf_counter() - start
+
+def check(directory):
+    # Strips stitched back together must equal PIL's full decode, whatever the format
+    source = os.path.join(directory, 'check.png')
+    synthetic_image(source, 389, 517)
+    img = Image.open(source)
+    for label, (name, options) in FORMATS.items():
+        path = os.path.join(directory, f'check-{name}')
+        img.save(path, **options)
+        with Image.open(path) as saved:
+            expected = np.asarray(saved.convert('RGB'))
+        for tile_rows in (1, 37, DEFAULT_TILE_ROWS, 1000):
+            assert np.array_equal(np.concatenate(list(iter_strips(path, tile_rows))), expected), label
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak RSS of the streamed histogram against a full decode, by format.')
+    parser.add_argument('--size', type=int, default=6000, help='Width and height of the test image')
+    parser.add_argument('--tile-rows', type=int, default=DEFAULT_TILE_ROWS)
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'IMAGE', 'TILE_ROWS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, image_path, tile_rows = args.child
+        child(mode, image_path, int(tile_rows))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        check(directory)
+        print('Streamed strips match the full decode for every format')
+
+        source = os.path.join(directory, 'source.png')
+        synthetic_image(source, args.size, args.size)
+        img = Image.open(source)
+        baseline, _ = peak_rss('imports', source)
+        print(f'{args.size}x{args.size}, {args.tile_rows} rows per strip; '
+              f'peak RSS with imports only: {baseline / 1e6:.0f} MB')
+
+        for label, (name, options) in FORMATS.items():
+            path = os.path.join(directory, name)
+            img.save(path, **options)
+            full, full_time = peak_rss('full', path)
+            streamed, streamed_time = peak_rss('streamed', path, args.tile_rows)
+            print(f'  {label:<19} full decode {full / 1e6:7.0f} MB {full_time:6.2f} s   '
+                  f'streamed {streamed / 1e6:7.0f} MB {streamed_time:6.2f} s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import math
+import os
+import tempfile
+import time
+from html.parser import HTMLParser
+from creator import CARD_GAP, CARD_HEIGHT, CARD_WIDTH, generate_html
+from palette import PANTONE_FILE_PATH, load_pantone_colors
+
+# Elements in one rendered .card tree (card, color-block, card-info, 4 <p>, 4 <span>)
+NODES_PER_CARD = 11
+
+class ElementCounter(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.elements = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.elements += 1
+
+def measure(path):
+    with open(path, 'r') as f:
+        html = f.read()
+    start = time.perf_counter()
+    counter = ElementCounter()
+    counter.feed(html)
+    counter.close()
+    return len(html.encode()), counter.elements, time.perf_counter() - start
+
+def virtual_window_cards(viewport_width, viewport_height, buffer_rows=2):
+    columns = max(1, (viewport_width + CARD_GAP) // (CARD_WIDTH + CARD_GAP))
+    rows = math.ceil(viewport_height / (CARD_HEIGHT + CARD_GAP)) + 1 + 2 * buffer_rows
+    return columns * rows
+
+def main():
+    parser = argparse.ArgumentParser(description='File size, DOM size and parse cost of the cards viewer modes.')
+    parser.add_argument('--viewport', default='1920x1080', help='Viewport used to size the virtual window, WxH')
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.viewport.split('x'))
+
+    colors = load_pantone_colors(PANTONE_FILE_PATH)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('cards', 'virtual'):
+            path = os.path.join(tmp, f'{mode}.html')
+            start = time.perf_counter()
+            generate_html(colors, path, mode)
+            generate_time = time.perf_counter() - start
+            size, elements, parse_time = measure(path)
+            if mode == 'virtual':
+                elements += virtual_window_cards(width, height) * NODES_PER_CARD
+            results[mode] = (size, elements, parse_time, generate_time)
+
+    print(f"{'mode':<8} {'bytes':>10} {'DOM elements':>13} {'parse ms':>9} {'generate ms':>12}")
+    for mode, (size, elements, parse_time, generate_time) in results.items():
+        print(f'{mode:<8} {size:>10} {elements:>13} {parse_time * 1000:>9.1f} {generate_time * 1000:>12.1f}')
+
+    size, elements = results['virtual'][:2]
+    print(f'Virtual mode: {size / results["cards"][0]:.1%} of the bytes, {elements / results["cards"][1]:.1%} of the DOM elements')
+
+if __name__ == '__main__':
+    main()
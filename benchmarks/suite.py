@@ -0,0 +1,199 @@
+import argparse
+import importlib
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from benchmarks.bench_reduction import synthetic_image
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, Palette, load_json_palette, load_palette_table, load_pantone_colors, rgb_to_cmyk
+from picker import extract_colors, find_closest_pantone_color
+
+RESULTS_PATH = './benchmark-results.json'
+PALETTE_SIZES = (10000, 100000)
+IMAGE_SIZES = ((256, 256), (1024, 768), (2048, 1536))
+DEFAULT_THRESHOLD = 0.10
+# Latency changes smaller than this are noise, whatever the ratio
+NOISE_FLOOR_MS = 1.0
+NOISE_FLOOR_MB = 1.0
+
+def synthetic_palette(size, seed=0):
+    rng = np.random.default_rng(seed)
+    palette = {}
+    for i, rgb in enumerate(rng.integers(0, 256, (size, 3)).tolist()):
+        palette[f'{11 + i % 9}-{i:06d}'] = {
+            'name': f'synthetic-{i}',
+            'hex': ''.join(f'{c:02x}' for c in rgb),
+            'cmyk': rgb_to_cmyk(rgb),
+        }
+    return palette
+
+def measure(fn, items, repeat):
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    # Separate run: tracing allocations slows the code down
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        'items': items,
+        'repeat': repeat,
+        'median_ms': median * 1000,
+        'min_ms': min(timings) * 1000,
+        'max_ms': max(timings) * 1000,
+        'throughput': items / median if median else None,
+        'peak_mb': peak / 1e6,
+    }
+
+def cases(workdir, quick=False):
+    palette_paths = {'shipped': PANTONE_FILE_PATH}
+    for size in PALETTE_SIZES[:1] if quick else PALETTE_SIZES:
+        path = os.path.join(workdir, f'palette-{size}.json')
+        with open(path, 'w') as f:
+            json.dump(synthetic_palette(size), f)
+        palette_paths[f'{size // 1000}k'] = path
+
+    cache_dir = os.path.join(workdir, 'cache')
+    cold_dirs = (os.path.join(workdir, f'cold-{i}') for i in itertools.count())
+    rng = np.random.default_rng(0)
+    queries = rng.integers(0, 256, (10000, 3))
+
+    for label, path in palette_paths.items():
+        size = len(load_json_palette(path))
+        yield f'load/json/{label}', lambda path=path: load_json_palette(path), size
+        yield f'load/compiled-cold/{label}', lambda path=path: load_palette_table(path, next(cold_dirs)), size
+        load_palette_table(path, cache_dir)
+        yield f'load/pantone-colors/{label}', lambda path=path: load_pantone_colors(path, cache_dir), size
+        yield f'load/palette/{label}', lambda path=path: Palette.load(path, cache_dir), size
+
+    for label, path in palette_paths.items():
+        matcher = PantoneMatcher(load_palette_table(path, cache_dir))
+        singles = queries[:100].tolist()
+        yield f'match/single/{label}', lambda m=matcher: [find_closest_pantone_color(rgb, m) for rgb in singles], len(singles)
+        yield f'match/batch/{label}', lambda m=matcher: m.match(queries), len(queries)
+    de2000 = PantoneMatcher(load_palette_table(PANTONE_FILE_PATH, cache_dir), metric='de2000')
+    yield 'match/batch-de2000/shipped', lambda: de2000.match(queries[:1000]), 1000
+
+    for width, height in IMAGE_SIZES[:2] if quick else IMAGE_SIZES:
+        image_path = os.path.join(workdir, f'image-{width}x{height}.png')
+        synthetic_image(image_path, width, height)
+        yield f'extract/{width}x{height}', lambda p=image_path: extract_colors(p, seed=0), width * height
+        if max(width, height) > 512:
+            yield f'extract/{width}x{height}/max-side-512', lambda p=image_path: extract_colors(p, max_side=512, seed=0), width * height
+
+    creator = importlib.import_module('creator')
+    lister = importlib.import_module('list')
+    for label in ('shipped', '10k'):
+        colors = load_pantone_colors(palette_paths[label], cache_dir)
+        output = os.path.join(workdir, f'{label}.html')
+        yield f'html/creator-cards/{label}', lambda c=colors: creator.generate_html(c, output), len(colors)
+        yield f'html/creator-virtual/{label}', lambda c=colors: creator.generate_html(c, output, mode='virtual'), len(colors)
+        yield f'html/list/{label}', lambda c=colors: lister.generate_html(c, output), len(colors)
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+def run(output_path, repeat, quick=False, only=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, fn, items in cases(workdir, quick):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            # Generators print progress; keep the table readable
+            stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+            try:
+                results[name] = measure(fn, items, repeat)
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            result = results[name]
+            print(f"{name:<40} {result['median_ms']:10.2f} ms  {result['throughput']:14.1f} items/s  peak {result['peak_mb']:8.1f} MB")
+
+    with open(output_path, 'w') as f:
+        json.dump({'environment': dict(environment(), quick=quick, repeat=repeat), 'results': results}, f, indent=2)
+    print(f'Results saved to {output_path}')
+
+def compare(old_path, new_path, threshold=DEFAULT_THRESHOLD):
+    with open(old_path, 'r') as f:
+        old = json.load(f)['results']
+    with open(new_path, 'r') as f:
+        new = json.load(f)['results']
+
+    regressions = []
+    print(f'{"case":<40} {"old ms":>10} {"new ms":>10} {"time":>8} {"memory":>8}')
+    for name in sorted(set(old) & set(new)):
+        before, after = old[name], new[name]
+        time_change = after['median_ms'] / before['median_ms'] - 1 if before['median_ms'] else 0.0
+        memory_change = after['peak_mb'] / before['peak_mb'] - 1 if before['peak_mb'] else 0.0
+
+        flags = []
+        if time_change > threshold and after['median_ms'] - before['median_ms'] > NOISE_FLOOR_MS:
+            flags.append('SLOWER')
+        elif time_change < -threshold / (1 + threshold) and before['median_ms'] - after['median_ms'] > NOISE_FLOOR_MS:
+            flags.append('faster')
+        if memory_change > threshold and after['peak_mb'] - before['peak_mb'] > NOISE_FLOOR_MB:
+            flags.append('MORE MEMORY')
+        if {'SLOWER', 'MORE MEMORY'} & set(flags):
+            regressions.append(name)
+
+        print(f"{name:<40} {before['median_ms']:10.2f} {after['median_ms']:10.2f} {time_change:+8.1%} {memory_change:+8.1%}  {' '.join(flags)}")
+
+    for name in sorted(set(old) ^ set(new)):
+        print(f"{name:<40} only in {'old' if name in old else 'new'} run")
+
+    if regressions:
+        print(f'{len(regressions)} regression(s) over {threshold:.0%}: {", ".join(regressions)}')
+    else:
+        print(f'No regressions over {threshold:.0%}.')
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite for palette load, matching, extraction and HTML generation.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the suite and save the results')
+    run_parser.add_argument('-o', '--output', default=RESULTS_PATH)
+    run_parser.add_argument('--repeat', type=int, default=5, help='Timed runs per case')
+    run_parser.add_argument('--quick', action='store_true', help='Skip the 100k palette and the largest image')
+    run_parser.add_argument('--only', nargs='*', help='Only cases starting with these prefixes, e.g. match/ html/list')
+
+    compare_parser = commands.add_parser('compare', help='Compare two result files and flag regressions')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Relative change to flag')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args.output, args.repeat, args.quick, args.only)
+    elif compare(args.old, args.new, args.threshold):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+from palette import hex_to_rgb, normalize_hex, rgb_to_cmyk
+
+SOURCE_PATH = './engine/pantone-numbers.json'
+MANIFEST_PATH = './engine/.build-manifest.json'
+BUILD_SCRIPT = './build.py'
+
+def sha256_file(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_source(path=SOURCE_PATH):
+    with open(path, 'r') as f:
+        source = json.load(f)
+
+    # CMYK is derived here once and shared by every artifact below
+    palette = {}
+    for code, color in source.items():
+        hex_code = normalize_hex(color['hex'])
+        palette[code] = {'name': color['name'], 'hex': hex_code, 'cmyk': rgb_to_cmyk(hex_to_rgb(hex_code))}
+    return palette
+
+def render_numbers(palette):
+    return json.dumps({code: {'name': c['name'], 'hex': c['hex']} for code, c in palette.items()}, indent=2)
+
+def render_colors_json(palette):
+    names = ',\n'.join(f'    {json.dumps(c["name"])}' for c in palette.values())
+    # The shipped file indents the values list deeper than the names list
+    values = ',\n'.join(f'      "#{c["hex"]}"' for c in palette.values())
+    return f'{{\n  "names": [\n{names}\n  ],\n  "values": [\n{values}\n  ]\n}}\n'
+
+def render_html_cmyk(palette):
+    return json.dumps(palette, indent=4)
+
+def render_scss(palette):
+    return ''.join(f"${c['name']}:#{c['hex']};\n" for c in palette.values())
+
+def render_txt(palette):
+    return ''.join(f"{c['name']} - #{c['hex']}\n" for c in palette.values())
+
+def render_color_map(palette):
+    entries = ',\n'.join(f"{c['name']}:#{c['hex']}" for c in palette.values())
+    return f'$pantone: (\n{entries}\n);\n'
+
+def local_modules(script, found=None):
+    # The script plus every module of this repo it imports, directly or through another module
+    found = [] if found is None else found
+    if script in found:
+        return found
+    found.append(script)
+    with open(script, 'r') as f:
+        tree = ast.parse(f.read(), script)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            path = f"./{name.split('.')[0]}.py"
+            if os.path.isfile(path):
+                local_modules(path, found)
+    return found
+
+def generator_inputs(render):
+    # HTML tools also depend on build.py, which loads the palette they render
+    scripts = local_modules(render.generator) if hasattr(render, 'generator') else []
+    return local_modules(BUILD_SCRIPT, scripts)
+
+def html_tool(module_name):
+    def render(palette, output_path):
+        importlib.import_module(module_name).generate_html(palette, output_path)
+    render.generator = f'./{module_name}.py'
+    return render
+
+# (output, upstream inputs, render). Text renders return the file content;
+# HTML tools write their own output. Listed in dependency order.
+TARGETS = [
+    ('./engine/pantone-colors/pantone-numbers.json', [SOURCE_PATH], lambda p: render_numbers(p) + '\n'),
+    ('./engine/pantone-colors.json', [SOURCE_PATH], render_colors_json),
+    ('./engine/pantone-html-cmyk.json', [SOURCE_PATH], render_html_cmyk),
+    ('./engine/pantone-colors.scss', [SOURCE_PATH], render_scss),
+    ('./engine/pantone-colors/pantone-colors.txt', [SOURCE_PATH], render_txt),
+    ('./engine/pantone-colors/pantone-color-map.scss', [SOURCE_PATH], render_color_map),
+    ('./output/PANTONE_CHART_Viewer_0001.html', ['./engine/pantone-html-cmyk.json'], html_tool('creator')),
+    ('./output/PANTONE-TOOL_0001.html', ['./engine/pantone-html-cmyk.json'], html_tool('list')),
+    ('./Pantone-Colour-Cart-tool.html', ['./engine/pantone-html-cmyk.json'], html_tool('pantoner2')),
+]
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.isfile(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def write_if_changed(path, content):
+    if os.path.isfile(path):
+        with open(path, 'r') as f:
+            if f.read() == content:
+                return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+def build(targets=None, force=False, manifest_path=MANIFEST_PATH):
+    manifest = load_manifest(manifest_path)
+    hashes = {}
+    palette = None
+    built = []
+
+    def file_hash(path):
+        if path not in hashes:
+            hashes[path] = sha256_file(path)
+        return hashes[path]
+
+    for output, inputs, render in TARGETS:
+        if targets and output not in targets:
+            continue
+
+        input_hashes = {path: file_hash(path) for path in inputs + generator_inputs(render)}
+        recorded = manifest.get(output, {})
+        fresh = (
+            not force
+            and recorded.get('inputs') == input_hashes
+            and os.path.isfile(output)
+            and recorded.get('output') == file_hash(output)
+        )
+        if fresh:
+            continue
+
+        if palette is None:
+            palette = load_source()
+
+        if hasattr(render, 'generator'):
+            render(palette, output)
+        else:
+            write_if_changed(output, render(palette))
+
+        # Downstream targets see the new content hash, so an unchanged output cuts off the rebuild
+        hashes[output] = sha256_file(output)
+        manifest[output] = {'inputs': input_hashes, 'output': hashes[output]}
+        built.append(output)
+        print(f'Built {output}')
+
+    save_manifest(manifest, manifest_path)
+    return built
+
+def main():
+    parser = argparse.ArgumentParser(description=f'Regenerate the palette artifacts from {SOURCE_PATH}.')
+    parser.add_argument('targets', nargs='*', help='Only build these outputs')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if up to date')
+    parser.add_argument('--list', action='store_true', help='List the build targets and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        for output, inputs, render in TARGETS:
+            print(f"{output} <- {', '.join(inputs + generator_inputs(render))}")
+        return
+
+    targets = [os.path.join('.', os.path.normpath(target)) for target in args.targets]
+    built = build(targets, force=args.force)
+    if not built:
+        print('Everything is up to date.')
+
+if __name__ == '__main__':
+    main()
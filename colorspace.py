@@ -0,0 +1,96 @@
+import numpy as np
+
+# sRGB (D65) -> CIE XYZ
+SRGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041]
+])
+D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+def rgb_to_lab(rgb):
+    rgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    xyz = (linear @ SRGB_TO_XYZ.T) / D65_WHITE
+
+    delta = 6.0 / 29.0
+    f = np.where(xyz > delta ** 3, np.cbrt(xyz), xyz / (3 * delta ** 2) + 4.0 / 29.0)
+    fx, fy, fz = f[..., 0], f[..., 1], f[..., 2]
+
+    return np.stack([116.0 * fy - 16.0, 500.0 * (fx - fy), 200.0 * (fy - fz)], axis=-1)
+
+def delta_e_76(lab1, lab2):
+    return np.sqrt(np.sum((np.asarray(lab1) - np.asarray(lab2)) ** 2, axis=-1))
+
+def delta_e_94(lab_ref, lab, kL=1.0, K1=0.045, K2=0.015):
+    # Graphic-arts weights; lab_ref is the reference (the palette swatch)
+    lab_ref = np.asarray(lab_ref, dtype=np.float64)
+    lab = np.asarray(lab, dtype=np.float64)
+    L1, a1, b1 = lab_ref[..., 0], lab_ref[..., 1], lab_ref[..., 2]
+    L2, a2, b2 = lab[..., 0], lab[..., 1], lab[..., 2]
+
+    C1 = np.hypot(a1, b1)
+    C2 = np.hypot(a2, b2)
+    dL = L1 - L2
+    dC = C1 - C2
+    dH2 = np.maximum((a1 - a2) ** 2 + (b1 - b2) ** 2 - dC ** 2, 0.0)
+
+    SC = 1.0 + K1 * C1
+    SH = 1.0 + K2 * C1
+
+    return np.sqrt((dL / kL) ** 2 + (dC / SC) ** 2 + dH2 / SH ** 2)
+
+def delta_e_2000(lab1, lab2, kL=1.0, kC=1.0, kH=1.0):
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    C_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2.0
+    C_bar7 = C_bar ** 7
+    G = 0.5 * (1.0 - np.sqrt(C_bar7 / (C_bar7 + 25.0 ** 7)))
+
+    a1p = (1.0 + G) * a1
+    a2p = (1.0 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360.0
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360.0
+
+    chroma_zero = (C1p * C2p) == 0
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180.0, dhp - 360.0, dhp)
+    dhp = np.where(dhp < -180.0, dhp + 360.0, dhp)
+    dhp = np.where(chroma_zero, 0.0, dhp)
+    dHp = 2.0 * np.sqrt(C1p * C2p) * np.sin(np.radians(dhp) / 2.0)
+
+    Lp_bar = (L1 + L2) / 2.0
+    Cp_bar = (C1p + C2p) / 2.0
+    h_sum = h1p + h2p
+    hp_bar = np.where(
+        np.abs(h1p - h2p) <= 180.0,
+        h_sum / 2.0,
+        np.where(h_sum < 360.0, (h_sum + 360.0) / 2.0, (h_sum - 360.0) / 2.0)
+    )
+    hp_bar = np.where(chroma_zero, h_sum, hp_bar)
+
+    T = (1.0
+         - 0.17 * np.cos(np.radians(hp_bar - 30.0))
+         + 0.24 * np.cos(np.radians(2.0 * hp_bar))
+         + 0.32 * np.cos(np.radians(3.0 * hp_bar + 6.0))
+         - 0.20 * np.cos(np.radians(4.0 * hp_bar - 63.0)))
+    d_theta = 30.0 * np.exp(-(((hp_bar - 275.0) / 25.0) ** 2))
+    Cp_bar7 = Cp_bar ** 7
+    RC = 2.0 * np.sqrt(Cp_bar7 / (Cp_bar7 + 25.0 ** 7))
+    SL = 1.0 + (0.015 * (Lp_bar - 50.0) ** 2) / np.sqrt(20.0 + (Lp_bar - 50.0) ** 2)
+    SC = 1.0 + 0.045 * Cp_bar
+    SH = 1.0 + 0.015 * Cp_bar * T
+    RT = -np.sin(np.radians(2.0 * d_theta)) * RC
+
+    L_term = dLp / (kL * SL)
+    C_term = dCp / (kC * SC)
+    H_term = dHp / (kH * SH)
+
+    return np.sqrt(L_term ** 2 + C_term ** 2 + H_term ** 2 + RT * C_term * H_term)
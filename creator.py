@@ -1,70 +1,110 @@
+import argparse
 import json
 import os
+from extract_html import iter_swatches, swatches_to_palette
+from palette import Palette, as_palette
+from search_index import DEBOUNCE_MS, SEARCH_SCRIPT, build_search_index, search_index_json
 
-def generate_html(colors, output_path):
-    if not output_path or os.path.dirname(output_path) == '':
-        raise ValueError("Output path is invalid. Please provide a valid path.")
+VIEWER_MODES = ('cards', 'virtual')
+CARD_WIDTH = 200
+CARD_HEIGHT = 250
+CARD_GAP = 15
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+def write_page_start(file, extra_css=()):
+    file.write('<!DOCTYPE html>\n')
+    file.write('<html lang="en">\n')
+    file.write('<head>\n')
+    file.write('  <meta charset="UTF-8">\n')
+    file.write('  <meta name="viewport" content="width=device-width, initial-scale=1.0">\n')
+    file.write('  <title>Pantone Cards Viewer</title>\n')
+    file.write('  <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Roboto:wght@400;700&display=swap">\n')
+    file.write('  <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;700&display=swap">\n')
+    file.write('  <style>\n')
+    file.write('    body { font-family: "Roboto", sans-serif; background-color: #f0f0f0; margin: 0; padding: 20px; }\n')
+    file.write('    header { text-align: center; margin-bottom: 20px; }\n')
+    file.write('    .search-bar input { padding: 10px; width: 50%; font-size: 16px; border: 1px solid #ccc; border-radius: 4px; margin-bottom: 10px; }\n')
+    file.write('    .controls { text-align: center; margin-bottom: 20px; }\n')
+    file.write('    .controls button { padding: 10px 20px; font-size: 16px; margin: 0 10px; cursor: pointer; }\n')
+    file.write('    .selected-colors { display: flex; flex-wrap: wrap; gap: 10px; justify-content: center; margin-bottom: 20px; }\n')
+    file.write('    .selected-color { width: 100px; height: 100px; border: 2px solid #ccc; cursor: pointer; position: relative; }\n')
+    file.write('    .selected-color:hover { border-color: #000; }\n')
+    file.write('    .selected-color .remove { position: absolute; top: 2px; right: 2px; background: #fff; border: 1px solid #ccc; border-radius: 50%; cursor: pointer; padding: 2px; }\n')
+    file.write('    .grid-container { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; justify-items: center; margin-top: 20px; }\n')
+    file.write('    .card { width: 200px; height: 250px; background-color: white; box-shadow: 0 4px 8px rgba(0,0,0,0.2), 0 0 15px rgba(255,255,255,0.7) inset; display: flex; flex-direction: column; justify-content: flex-end; border-radius: 10px; position: relative; overflow: hidden; }\n')
+    file.write('    .color-block { height: 60%; display: flex; align-items: center; justify-content: center; font-size: 18px; font-weight: bold; color: #fff; cursor: pointer; border-bottom: 1px solid rgba(0,0,0,0.1); position: relative; z-index: 1; }\n')
+    file.write('    .color-block::after { content: \'\'; position: absolute; bottom: 0; left: 0; width: 100%; height: 50px; background: linear-gradient(to top, rgba(255,255,255,0.6), rgba(255,255,255,0)); z-index: -1; }\n')
+    file.write('    .card-info { height: 40%; padding: 10px; text-align: center; background-color: #fff; border-top: 1px solid #ddd; }\n')
+    file.write('    .pantone-family { font-family: "Playfair Display", serif; font-size: 16px; font-weight: bold; margin: 5px 0; color: #000; text-transform: capitalize; }\n')
+    file.write('    .pantone-name { font-size: 14px; margin: 5px 0; color: #555; text-transform: capitalize; }\n')
+    file.write('    .pantone-hex { font-size: 16px; margin: 5px 0; color: #555; }\n')
+    file.write('    .pantone-cmyk { font-size: 14px; margin: 5px 0; color: #555; }\n')
+    file.write('    .pantone-cmyk span { display: inline; }\n')
+    for rule in extra_css:
+        file.write(f'    {rule}\n')
+    file.write('  </style>\n')
+    file.write('</head>\n')
+    file.write('<body>\n')
 
-    with open(output_path, 'w') as file:
-        file.write('<!DOCTYPE html>\n')
-        file.write('<html lang="en">\n')
-        file.write('<head>\n')
-        file.write('  <meta charset="UTF-8">\n')
-        file.write('  <meta name="viewport" content="width=device-width, initial-scale=1.0">\n')
-        file.write('  <title>Pantone Cards Viewer</title>\n')
-        file.write('  <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Roboto:wght@400;700&display=swap">\n')
-        file.write('  <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;700&display=swap">\n')
-        file.write('  <style>\n')
-        file.write('    body { font-family: "Roboto", sans-serif; background-color: #f0f0f0; margin: 0; padding: 20px; }\n')
-        file.write('    header { text-align: center; margin-bottom: 20px; }\n')
-        file.write('    .search-bar input { padding: 10px; width: 50%; font-size: 16px; border: 1px solid #ccc; border-radius: 4px; margin-bottom: 10px; }\n')
-        file.write('    .controls { text-align: center; margin-bottom: 20px; }\n')
-        file.write('    .controls button { padding: 10px 20px; font-size: 16px; margin: 0 10px; cursor: pointer; }\n')
-        file.write('    .selected-colors { display: flex; flex-wrap: wrap; gap: 10px; justify-content: center; margin-bottom: 20px; }\n')
-        file.write('    .selected-color { width: 100px; height: 100px; border: 2px solid #ccc; cursor: pointer; position: relative; }\n')
-        file.write('    .selected-color:hover { border-color: #000; }\n')
-        file.write('    .selected-color .remove { position: absolute; top: 2px; right: 2px; background: #fff; border: 1px solid #ccc; border-radius: 50%; cursor: pointer; padding: 2px; }\n')
-        file.write('    .grid-container { display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; justify-items: center; margin-top: 20px; }\n')
-        file.write('    .card { width: 200px; height: 250px; background-color: white; box-shadow: 0 4px 8px rgba(0,0,0,0.2), 0 0 15px rgba(255,255,255,0.7) inset; display: flex; flex-direction: column; justify-content: flex-end; border-radius: 10px; position: relative; overflow: hidden; }\n')
-        file.write('    .color-block { height: 60%; display: flex; align-items: center; justify-content: center; font-size: 18px; font-weight: bold; color: #fff; cursor: pointer; border-bottom: 1px solid rgba(0,0,0,0.1); position: relative; z-index: 1; }\n')
-        file.write('    .color-block::after { content: \'\'; position: absolute; bottom: 0; left: 0; width: 100%; height: 50px; background: linear-gradient(to top, rgba(255,255,255,0.6), rgba(255,255,255,0)); z-index: -1; }\n')
-        file.write('    .card-info { height: 40%; padding: 10px; text-align: center; background-color: #fff; border-top: 1px solid #ddd; }\n')
-        file.write('    .pantone-family { font-family: "Playfair Display", serif; font-size: 16px; font-weight: bold; margin: 5px 0; color: #000; text-transform: capitalize; }\n')
-        file.write('    .pantone-name { font-size: 14px; margin: 5px 0; color: #555; text-transform: capitalize; }\n')
-        file.write('    .pantone-hex { font-size: 16px; margin: 5px 0; color: #555; }\n')
-        file.write('    .pantone-cmyk { font-size: 14px; margin: 5px 0; color: #555; }\n')
-        file.write('    .pantone-cmyk span { display: inline; }\n')
-        file.write('  </style>\n')
-        file.write('</head>\n')
-        file.write('<body>\n')
-
-        file.write('  <header>\n')
-        file.write('    <div class="search-bar">\n')
-        file.write('      <input type="text" id="search" placeholder="Search by name, number, or code...">\n')
-        file.write('    </div>\n')
-        file.write('  </header>\n')
-
-        file.write('  <div class="controls">\n')
-        file.write('    <div class="selected-colors" id="selectedColors"></div>\n')
-        file.write('    <button id="savePNG">Save as PNG</button>\n')
-        file.write('    <button id="resetSelection">Reset</button>\n')
-        file.write('  </div>\n')
+    file.write('  <header>\n')
+    file.write('    <div class="search-bar">\n')
+    file.write('      <input type="text" id="search" placeholder="Search by name, number, or code...">\n')
+    file.write('    </div>\n')
+    file.write('  </header>\n')
 
-        file.write('  <div class="grid-container" id="cardContainer">\n')
+    file.write('  <div class="controls">\n')
+    file.write('    <div class="selected-colors" id="selectedColors"></div>\n')
+    file.write('    <button id="savePNG">Save as PNG</button>\n')
+    file.write('    <button id="resetSelection">Reset</button>\n')
+    file.write('  </div>\n')
+
+def write_selection_script(file):
+    file.write('let selectedColors = [];\n')
+
+    file.write('function updateSelectedColors() {\n')
+    file.write('  const container = document.getElementById("selectedColors");\n')
+    file.write('  container.innerHTML = "";\n')
+    file.write('  selectedColors.forEach(color => {\n')
+    file.write('    const colorDiv = document.createElement("div");\n')
+    file.write('    colorDiv.classList.add("selected-color");\n')
+    file.write('    colorDiv.style.backgroundColor = color.hex;\n')
+    file.write('    colorDiv.innerHTML = "<div class=\'remove\'>&times;</div>";\n')
+    file.write('    colorDiv.addEventListener("click", () => {\n')
+    file.write('      selectedColors = selectedColors.filter(c => c.hex !== color.hex);\n')
+    file.write('      updateSelectedColors();\n')
+    file.write('    });\n')
+    file.write('    container.appendChild(colorDiv);\n')
+    file.write('  });\n')
+    file.write('}\n')
+
+def card_search_index(colors):
+    palette = as_palette(colors)
+    # Same fields the viewer searched before: code, family and #HEX
+    return build_search_index(zip(palette.codes, palette.names, palette.hex_strings(upper=True, prefix='#').tolist()))
+
+def generate_html(colors, output_path, mode='cards'):
+    if not output_path:
+        raise ValueError("Output path is invalid. Please provide a valid path.")
+    if mode not in VIEWER_MODES:
+        raise ValueError(f"Unknown viewer mode '{mode}'. Expected one of: {', '.join(VIEWER_MODES)}")
+
+    # A bare file name is written to the current directory
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    palette = as_palette(colors)
 
-        for code, color in colors.items():
-            hex_code = f'#{color["hex"].upper()}'
-            family = color["name"]
-            name = code
-            cmyk = color.get("cmyk", [0.0, 0.0, 0.0, 0.0])
+    if mode == 'virtual':
+        generate_virtual_html(palette, output_path)
+        return
 
-            if len(cmyk) != 4:
-                cmyk = [0.0, 0.0, 0.0, 0.0]
+    hex_codes = palette.hex_strings(upper=True, prefix='#').tolist()
+    cmyk_strings = palette.cmyk_strings('%.1f%%').tolist()
+
+    with open(output_path, 'w') as file:
+        write_page_start(file)
 
-            cmyk_percent = [f"{val:.1f}%" for val in cmyk]
+        file.write('  <div class="grid-container" id="cardContainer">\n')
 
+        for name, family, hex_code, cmyk_percent in zip(palette.codes, palette.names, hex_codes, cmyk_strings):
             file.write(f'    <div class="card" data-name="{name}" data-family="{family}" data-hex="{hex_code}" data-cmyk="{",".join(cmyk_percent)}">\n')
             file.write(f'      <div class="color-block" style="background-color: {hex_code};" data-clipboard-text="{hex_code}" title="Click to copy {hex_code}">\n')
             file.write('      </div>\n')
@@ -77,27 +117,12 @@ def generate_html(colors, output_path):
             file.write('    </div>\n')
 
         file.write('  </div>\n')
+        file.write(f'<script type="application/json" id="searchIndex">{search_index_json(card_search_index(palette))}</script>\n')
 
         file.write('<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>\n')
         file.write('<script>\n')
 
-        file.write('let selectedColors = [];\n')
-
-        file.write('function updateSelectedColors() {\n')
-        file.write('  const container = document.getElementById("selectedColors");\n')
-        file.write('  container.innerHTML = "";\n')
-        file.write('  selectedColors.forEach(color => {\n')
-        file.write('    const colorDiv = document.createElement("div");\n')
-        file.write('    colorDiv.classList.add("selected-color");\n')
-        file.write('    colorDiv.style.backgroundColor = color.hex;\n')
-        file.write('    colorDiv.innerHTML = "<div class=\'remove\'>&times;</div>";\n')
-        file.write('    colorDiv.addEventListener("click", () => {\n')
-        file.write('      selectedColors = selectedColors.filter(c => c.hex !== color.hex);\n')
-        file.write('      updateSelectedColors();\n')
-        file.write('    });\n')
-        file.write('    container.appendChild(colorDiv);\n')
-        file.write('  });\n')
-        file.write('}\n')
+        write_selection_script(file)
 
         file.write('function handleCardClick(event) {\n')
         file.write('  const card = event.currentTarget;\n')
@@ -131,25 +156,163 @@ def generate_html(colors, output_path):
         file.write('  });\n')
         file.write('});\n')
 
-        file.write('document.getElementById("search").addEventListener("input", function() {\n')
-        file.write('  const query = this.value.toLowerCase();\n')
-        file.write('  document.querySelectorAll(".card").forEach(card => {\n')
-        file.write('    const name = card.dataset.name.toLowerCase();\n')
-        file.write('    const family = card.dataset.family.toLowerCase();\n')
-        file.write('    const hex = card.dataset.hex.toLowerCase();\n')
-        file.write('    const matches = name.includes(query) || family.includes(query) || hex.includes(query);\n')
-        file.write('    card.style.display = matches ? "block" : "none";\n')
+        file.write(SEARCH_SCRIPT)
+        file.write('const searchData = JSON.parse(document.getElementById("searchIndex").textContent);\n')
+        file.write('bindSearch(document.getElementById("search"), searchData, document.querySelectorAll(".card"), (card, show) => {\n')
+        file.write('  card.style.display = show ? "block" : "none";\n')
+        file.write('});\n')
+
+        file.write('</script>\n')
+        file.write('</body>\n')
+        file.write('</html>\n')
+
+def generate_virtual_html(palette, output_path):
+    # One row per card: code, family, hex, C, M, Y, K. Cards are built on demand.
+    rows = [
+        [code, name, hex_code] + [round(val, 1) for val in cmyk]
+        for code, name, hex_code, cmyk in zip(palette.codes, palette.names, palette.hex_strings(upper=True).tolist(),
+                                              palette.cmyk.tolist())
+    ]
+    data = json.dumps(rows, separators=(',', ':')).replace('</', '<\\/')
+
+    with open(output_path, 'w') as file:
+        write_page_start(file, extra_css=(
+            '.virtual-grid { position: relative; margin-top: 20px; }',
+            '.virtual-grid .card { position: absolute; top: 0; left: 0; }',
+            '.export-grid { position: absolute; left: -100000px; top: 0; width: 1200px; }',
+        ))
+
+        file.write('  <div class="virtual-grid" id="cardContainer"></div>\n')
+        file.write(f'<script type="application/json" id="paletteData">{data}</script>\n')
+        file.write(f'<script type="application/json" id="searchIndex">{search_index_json(card_search_index(palette))}</script>\n')
+
+        file.write('<script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>\n')
+        file.write('<script>\n')
+
+        write_selection_script(file)
+
+        file.write('const palette = JSON.parse(document.getElementById("paletteData").textContent);\n')
+        file.write(f'const CARD_WIDTH = {CARD_WIDTH}, CARD_HEIGHT = {CARD_HEIGHT}, CARD_GAP = {CARD_GAP}, BUFFER_ROWS = 2;\n')
+        file.write('const cardContainer = document.getElementById("cardContainer");\n')
+        file.write('let visible = palette.map((_, i) => i);\n')
+        file.write('let layout = { columns: 1, offset: 0 };\n')
+        file.write('let renderedRange = "";\n')
+
+        file.write('function percent(val) {\n')
+        file.write('  return val.toFixed(1) + "%";\n')
+        file.write('}\n')
+
+        file.write('function cardHTML(i, style) {\n')
+        file.write('  const [name, family, hex, c, m, y, k] = palette[i];\n')
+        file.write('  return `<div class="card" data-index="${i}" style="${style}">` +\n')
+        file.write('    `<div class="color-block" style="background-color: #${hex};" data-clipboard-text="#${hex}" title="Click to copy #${hex}"></div>` +\n')
+        file.write('    `<div class="card-info"><p class="pantone-family">PANTONE ${family}</p><p class="pantone-name">${name}</p>` +\n')
+        file.write('    `<p class="pantone-hex">#${hex}</p><p class="pantone-cmyk">C: <span>${percent(c)}</span> M: <span>${percent(m)}</span> ` +\n')
+        file.write('    `Y: <span>${percent(y)}</span> K: <span>${percent(k)}</span></p></div></div>`;\n')
+        file.write('}\n')
+
+        file.write('function updateLayout() {\n')
+        file.write('  const width = cardContainer.clientWidth;\n')
+        file.write('  const columns = Math.max(1, Math.floor((width + CARD_GAP) / (CARD_WIDTH + CARD_GAP)));\n')
+        file.write('  const offset = Math.max(0, (width - columns * CARD_WIDTH - (columns - 1) * CARD_GAP) / 2);\n')
+        file.write('  layout = { columns, offset };\n')
+        file.write('  const rows = Math.ceil(visible.length / columns);\n')
+        file.write('  cardContainer.style.height = Math.max(0, rows * (CARD_HEIGHT + CARD_GAP) - CARD_GAP) + "px";\n')
+        file.write('  renderedRange = "";\n')
+        file.write('  renderWindow();\n')
+        file.write('}\n')
+
+        file.write('function renderWindow() {\n')
+        file.write('  const rowHeight = CARD_HEIGHT + CARD_GAP;\n')
+        file.write('  const top = -cardContainer.getBoundingClientRect().top;\n')
+        file.write('  const firstRow = Math.max(0, Math.floor(top / rowHeight) - BUFFER_ROWS);\n')
+        file.write('  const lastRow = Math.max(firstRow, Math.ceil((top + window.innerHeight) / rowHeight) + BUFFER_ROWS);\n')
+        file.write('  const first = firstRow * layout.columns;\n')
+        file.write('  const last = Math.min(visible.length, (lastRow + 1) * layout.columns);\n')
+        file.write('  const range = first + ":" + last;\n')
+        file.write('  if (range === renderedRange) return;\n')
+        file.write('  renderedRange = range;\n')
+        file.write('  let html = "";\n')
+        file.write('  for (let pos = first; pos < last; pos++) {\n')
+        file.write('    const x = layout.offset + (pos % layout.columns) * (CARD_WIDTH + CARD_GAP);\n')
+        file.write('    const y = Math.floor(pos / layout.columns) * rowHeight;\n')
+        file.write('    html += cardHTML(visible[pos], `transform: translate(${x}px, ${y}px);`);\n')
+        file.write('  }\n')
+        file.write('  cardContainer.innerHTML = html;\n')
+        file.write('}\n')
+
+        file.write('let framePending = false;\n')
+        file.write('function scheduleRender() {\n')
+        file.write('  if (framePending) return;\n')
+        file.write('  framePending = true;\n')
+        file.write('  requestAnimationFrame(() => {\n')
+        file.write('    framePending = false;\n')
+        file.write('    renderWindow();\n')
         file.write('  });\n')
+        file.write('}\n')
+
+        file.write('window.addEventListener("scroll", scheduleRender, { passive: true });\n')
+        file.write('window.addEventListener("resize", updateLayout);\n')
+
+        file.write('cardContainer.addEventListener("click", event => {\n')
+        file.write('  const card = event.target.closest(".card");\n')
+        file.write('  if (!card) return;\n')
+        file.write('  const [name, family, hex, c, m, y, k] = palette[Number(card.dataset.index)];\n')
+        file.write('  const color = { name, family, hex: "#" + hex, cmyk: [c, m, y, k] };\n')
+        file.write('  if (!selectedColors.find(c => c.hex === color.hex)) {\n')
+        file.write('    selectedColors.push(color);\n')
+        file.write('    updateSelectedColors();\n')
+        file.write('  }\n')
         file.write('});\n')
 
+        file.write('document.getElementById("resetSelection").addEventListener("click", () => {\n')
+        file.write('  selectedColors = [];\n')
+        file.write('  updateSelectedColors();\n')
+        file.write('});\n')
+
+        file.write('document.getElementById("savePNG").addEventListener("click", () => {\n')
+        file.write('  // Only a window of cards is in the DOM, so lay out every matching card off-screen for the capture\n')
+        file.write('  const exportGrid = document.createElement("div");\n')
+        file.write('  exportGrid.className = "grid-container export-grid";\n')
+        file.write('  exportGrid.innerHTML = visible.map(i => cardHTML(i, "")).join("");\n')
+        file.write('  document.body.appendChild(exportGrid);\n')
+        file.write('  html2canvas(exportGrid).then(canvas => {\n')
+        file.write('    const link = document.createElement("a");\n')
+        file.write('    link.href = canvas.toDataURL("image/png");\n')
+        file.write('    link.download = "pantone_cards.png";\n')
+        file.write('    link.click();\n')
+        file.write('  }).finally(() => exportGrid.remove());\n')
+        file.write('});\n')
+
+        file.write(SEARCH_SCRIPT)
+        file.write('const searchData = JSON.parse(document.getElementById("searchIndex").textContent);\n')
+        file.write('document.getElementById("search").addEventListener("input", debounce(function() {\n')
+        file.write('  visible = searchIndex(searchData, this.value);\n')
+        file.write('  updateLayout();\n')
+        file.write(f'}}, {DEBOUNCE_MS}));\n')
+
+        file.write('updateLayout();\n')
+
         file.write('</script>\n')
         file.write('</body>\n')
         file.write('</html>\n')
 
-pantone_file_path = './engine/pantone-html-cmyk.json'
-output_path = './output/PANTONE_CHART_Viewer_0001.html'
+PANTONE_FILE_PATH = './engine/pantone-html-cmyk.json'
+OUTPUT_PATH = './output/PANTONE_CHART_Viewer_0001.html'
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the Pantone cards viewer.')
+    parser.add_argument('--mode', choices=VIEWER_MODES, default='cards',
+                        help='cards: one DOM card per swatch; virtual: JSON data island with windowed rendering')
+    parser.add_argument('--from-html', help='Read swatches from a vendor HTML dump such as pantone-colors.html')
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH)
+    args = parser.parse_args()
 
-with open(pantone_file_path) as f:
-    pantone_data = json.load(f)
+    if args.from_html:
+        palette = swatches_to_palette(iter_swatches(args.from_html))
+    else:
+        palette = Palette.load(PANTONE_FILE_PATH)
+    generate_html(palette, args.output, args.mode)
 
-generate_html(pantone_data, output_path)
+if __name__ == '__main__':
+    main()
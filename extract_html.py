@@ -0,0 +1,47 @@
+from html.parser import HTMLParser
+from palette import hex_to_rgb, normalize_hex, rgb_to_cmyk
+
+CHUNK_SIZE = 1 << 16
+# Layout classes that sit next to the swatch name in a class attribute
+LAYOUT_CLASSES = {'color-box', 'color-name', 'color-item'}
+
+class SwatchParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.records = []
+
+    def handle_starttag(self, tag, attrs):
+        hex_code = None
+        classes = ()
+        for key, value in attrs:
+            if key == 'data-clipboard-text':
+                hex_code = value
+            elif key == 'class' and value:
+                classes = value.split()
+
+        if not hex_code:
+            return
+        names = [cls for cls in classes if cls not in LAYOUT_CLASSES]
+        if names:
+            self.records.append((names[0], hex_code))
+
+def iter_swatches(file_path, chunk_size=CHUNK_SIZE):
+    parser = SwatchParser()
+    with open(file_path, 'r') as file:
+        for chunk in iter(lambda: file.read(chunk_size), ''):
+            parser.feed(chunk)
+            yield from parser.records
+            parser.records.clear()
+    parser.close()
+    yield from parser.records
+
+def swatches_to_palette(records):
+    # Vendor dumps carry no TCX codes, so swatches are keyed by name; CMYK is derived
+    # the same way build.py derives it, so every viewer can take a dump
+    palette = {}
+    for name, hex_code in records:
+        if name in palette:
+            continue
+        hex_code = normalize_hex(hex_code)
+        palette[name] = {'name': name, 'hex': hex_code, 'cmyk': rgb_to_cmyk(hex_to_rgb(hex_code))}
+    return palette
@@ -1,15 +1,11 @@
-import json
 import os
+from palette import Palette, load_pantone_colors
+from search_index import SEARCH_SCRIPT, build_search_index, search_index_json
 
 JSON_FILE_PATH = './engine/pantone-html-cmyk.json'
 HTML_FILE_PATH = './output/PANTONE-TOOL_0001.html'
 
-def load_pantone_colors(file_path):
-    with open(file_path, 'r') as file:
-        data = json.load(file)
-        return data
-
-def generate_html(colors):
+def generate_html(colors, output_path=HTML_FILE_PATH):
     html_content = '''
     <!DOCTYPE html>
     <html>
@@ -48,29 +44,35 @@ def generate_html(colors):
     <body>
       <h1 class="text-center">Pantone Colors</h1>
       <div class="text-center">
-        <input type="text" id="search" placeholder="Search by name, hex code, or CMYK" oninput="filterColors()">
+        <input type="text" id="search" placeholder="Search by name, hex code, or CMYK">
       </div>
       <div class="row">
         <div class="col-3" id="color-list">
     '''
 
     if isinstance(colors, dict):
+        valid = {}
         for code, color in colors.items():
             if isinstance(color, dict):
-                name = color.get('name', 'Unnamed')
-                hex_code = color.get('hex', '#000000')
-                cmyk = color.get('cmyk', [0, 0, 0, 0])
-                cmyk_str = ', '.join(f'{value:.2f}' for value in cmyk)
-                html_content += f'''
+                valid[code] = color
+            else:
+                print(f"Warning: Skipping invalid entry: {color}")
+        colors = Palette.from_dict(valid)
+    elif not isinstance(colors, Palette):
+        print("Error: JSON file does not contain a dictionary of color objects.")
+        colors = Palette.from_dict({})
+
+    search_entries = []
+    cmyk_strings = colors.cmyk_strings('%.2f').tolist()
+    for name, hex_code, cmyk in zip(colors.names, colors.hex.tolist(), cmyk_strings):
+        cmyk_str = ', '.join(cmyk)
+        search_entries.append([name, hex_code, cmyk_str])
+        html_content += f'''
                 <div class="color-item">
                   <div class="color-box" style="background-color: #{hex_code};" data-hex="{hex_code}" data-cmyk="{cmyk_str}" onclick="selectColor(this)"></div>
                   <span>{name}</span>
                 </div>
                 '''
-            else:
-                print(f"Warning: Skipping invalid entry: {color}")
-    else:
-        print("Error: JSON file does not contain a dictionary of color objects.")
 
     html_content += '''
         </div>
@@ -93,31 +95,24 @@ def generate_html(colors):
           navigator.clipboard.writeText(hex);
         }
 
-        function filterColors() {
-          const search = document.getElementById('search').value.toLowerCase();
-          const items = document.querySelectorAll('.color-item');
-          items.forEach(item => {
-            const name = item.querySelector('span').textContent.toLowerCase();
-            const hex = item.querySelector('.color-box').getAttribute('data-hex');
-            const cmyk = item.querySelector('.color-box').getAttribute('data-cmyk');
-            if (name.includes(search) || hex.includes(search) || cmyk.includes(search)) {
-              item.style.display = '';
-            } else {
-              item.style.display = 'none';
-            }
-          });
-        }
+      </script>
+      <script type="application/json" id="searchIndex">''' + search_index_json(build_search_index(search_entries)) + '''</script>
+      <script>''' + SEARCH_SCRIPT + '''
+        const searchData = JSON.parse(document.getElementById('searchIndex').textContent);
+        bindSearch(document.getElementById('search'), searchData, document.querySelectorAll('.color-item'), (item, show) => {
+          item.style.display = show ? '' : 'none';
+        });
       </script>
     </body>
     </html>
     '''
 
-    with open(HTML_FILE_PATH, 'w') as file:
+    with open(output_path, 'w') as file:
         file.write(html_content)
 
 def main():
-    pantone_colors = load_pantone_colors(JSON_FILE_PATH)
-    generate_html(pantone_colors)
+    palette = Palette.load(JSON_FILE_PATH)
+    generate_html(palette)
 
 if __name__ == '__main__':
     main()
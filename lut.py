@@ -0,0 +1,167 @@
+import argparse
+import glob
+import os
+import numpy as np
+from matcher import PantoneMatcher, PaletteIndex, METRICS, index_dtype
+from palette import CACHE_DIR, PANTONE_FILE_PATH, load_palette_table, palette_hash, source_key
+
+DEFAULT_BITS = 6
+# Bumped whenever the table layout changes, so older caches are rebuilt
+TABLE_FORMAT = 2
+
+def _nearest(matcher, colors):
+    if matcher.metric in ('rgb', 'de76'):
+        indices, distances = PaletteIndex(matcher).knn(colors, 1)
+        return indices[:, 0], distances[:, 0]
+    return matcher.match(colors)
+
+def _within(matcher, colors, radius):
+    if matcher.metric in ('rgb', 'de76'):
+        indices, _ = PaletteIndex(matcher).within(colors, radius)
+        return indices
+    # Perceptual metrics build large temporaries per pair, so rows are scored in the matcher's chunks
+    found = []
+    step = matcher.chunk_rows()
+    for start in range(0, len(colors), step):
+        distances = matcher.distances(colors[start:start + step])
+        found.extend(np.flatnonzero(row <= r) for row, r in zip(distances, radius[start:start + step]))
+    return found
+
+def _cell_radius(matcher, centers, width):
+    # Largest distance from a cell center to any color of the cell
+    if matcher.metric == 'rgb':
+        return np.full(len(centers), np.sqrt(3.0) * (width - 1) / 2.0)
+    # Lab metrics: measured at the corners, which bound a cell this small closely but not provably
+    offsets = np.array([[dr, dg, db] for dr in (0, 1) for dg in (0, 1) for db in (0, 1)]) * (width - 1)
+    lows = centers - (width - 1) / 2.0
+    corners = (lows[:, None, :] + offsets[None, :, :]).reshape(-1, 3)
+    points = matcher._prepare(np.repeat(centers, 8, axis=0))
+    corner_points = matcher._prepare(corners)
+    return np.sqrt(np.sum((points - corner_points) ** 2, axis=1)).reshape(-1, 8).max(axis=1)
+
+def _prune(rgb, lows, highs, rows):
+    # A swatch can only win somewhere in the box if its closest approach to the box
+    # is no farther than the worst case of the swatch with the best worst case
+    longest = max(len(row) for row in rows)
+    padded = np.array([np.resize(row, longest) for row in rows])
+    swatches = rgb[padded]
+    below, above = lows[:, None, :] - swatches, swatches - highs[:, None, :]
+    nearest = np.sum(np.maximum(np.maximum(below, above), 0.0) ** 2, axis=-1)
+    farthest = np.sum(np.maximum(np.abs(below), np.abs(above)) ** 2, axis=-1)
+    keep = nearest <= farthest.min(axis=1, keepdims=True) + 1e-9
+    return [np.unique(row[mask]) for row, mask in zip(padded, keep)]
+
+def build_tables(matcher, bits=DEFAULT_BITS, chunk_cells=1 << 14):
+    size = 1 << bits
+    width = 256 >> bits
+    dtype = index_dtype(matcher)
+    lows = np.arange(size) * width
+    grid = lambda r, g, b: np.stack(np.meshgrid(r, g, b, indexing='ij'), axis=-1).reshape(-1, 3)
+
+    # The swatch nearest to the cell center is the answer for the whole cell
+    centers = grid(*[lows + (width - 1) / 2.0] * 3)
+    nearest, distances = _nearest(matcher, centers)
+    table = nearest.astype(dtype).reshape(size, size, size)
+    if width == 1:
+        return table, table[..., None]
+
+    settled = np.zeros(len(centers), dtype=bool)
+    if matcher.metric == 'rgb':
+        # RGB Voronoi cells are convex: a cell whose 8 corners share the center's swatch lies inside it
+        corners = np.concatenate([lows, lows + width - 1])
+        corner_table, _ = _nearest(matcher, grid(corners, corners, corners))
+        corner_table = corner_table.reshape(2, size, 2, size, 2, size).transpose(1, 3, 5, 0, 2, 4).reshape(-1, 8)
+        settled = np.all(corner_table == nearest[:, None], axis=1)
+
+    # Everywhere else: for any color p in the cell, d(p, best) <= d(p, center) + d(center, nearest),
+    # so the best swatch lies within d(center, nearest) + 2 * cell radius of the center
+    rows = [np.array([index]) for index in nearest.tolist()]
+    open_cells = np.flatnonzero(~settled)
+    for start in range(0, len(open_cells), chunk_cells):
+        cells = open_cells[start:start + chunk_cells]
+        chunk = centers[cells]
+        radius = distances[cells] + 2.0 * _cell_radius(matcher, chunk, width) + 1e-9
+        found = _within(matcher, chunk, radius)
+        if matcher.metric == 'rgb':
+            found = _prune(matcher.rgb, chunk - (width - 1) / 2.0, chunk + (width - 1) / 2.0, found)
+        for cell, row in zip(cells.tolist(), found):
+            rows[cell] = np.sort(row)
+
+    # Padded with each row's last candidate, so duplicates never change the argmin
+    candidates = np.empty((len(rows), max(len(row) for row in rows)), dtype=dtype)
+    for i, row in enumerate(rows):
+        candidates[i, :len(row)] = row
+        candidates[i, len(row):] = row[-1]
+    return table, candidates.reshape(size, size, size, -1)
+
+def _save(path, array):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+class PantoneLUT:
+    def __init__(self, matcher, table, candidates):
+        self.matcher = matcher
+        self.table = table
+        self.candidates = candidates
+        self.bits = table.shape[0].bit_length() - 1
+        self.shift = 8 - self.bits
+
+    @classmethod
+    def load(cls, file_path=PANTONE_FILE_PATH, bits=DEFAULT_BITS, metric='rgb', cache_dir=CACHE_DIR, rebuild=False):
+        if not 1 <= bits <= 8:
+            raise ValueError('bits must be between 1 and 8')
+
+        matcher = PantoneMatcher(load_palette_table(file_path, cache_dir), metric=metric)
+        # Rebuilding only replaces tables of the same palette file, metric and size
+        prefix = os.path.join(cache_dir, f'lut-{metric}-{bits}-{source_key(file_path)}')
+        key = f'v{TABLE_FORMAT}-{palette_hash(file_path)[:16]}'
+        table_path = f'{prefix}-{key}-table.npy'
+        candidates_path = f'{prefix}-{key}-candidates.npy'
+
+        if rebuild or not (os.path.exists(table_path) and os.path.exists(candidates_path)):
+            os.makedirs(cache_dir, exist_ok=True)
+            # Tables from before the source key can't be traced to a palette file, so they go too
+            legacy = os.path.join(cache_dir, f'lut-{metric}-{bits}-')
+            legacy_tables = glob.glob(f'{legacy}v*-*.npy') + glob.glob(f'{legacy}{"[0-9a-f]" * 16}-*.npy')
+            for stale in glob.glob(f'{prefix}-*.npy') + legacy_tables:
+                os.remove(stale)
+            table, candidates = build_tables(matcher, bits)
+            _save(candidates_path, candidates)
+            _save(table_path, table)
+
+        table = np.load(table_path, mmap_mode='r')
+        candidates = np.load(candidates_path, mmap_mode='r')
+        return cls(matcher, table, candidates)
+
+    def _cells(self, colors):
+        colors = np.clip(np.rint(np.asarray(colors, dtype=np.float64)), 0, 255).astype(np.intp).reshape(-1, 3)
+        return colors, colors >> self.shift
+
+    def lookup(self, colors, refine=False):
+        colors, cells = self._cells(colors)
+        r, g, b = cells[:, 0], cells[:, 1], cells[:, 2]
+
+        if not refine or self.shift == 0:
+            return np.asarray(self.table[r, g, b], dtype=np.intp)
+
+        indices, _ = self.matcher.match_candidates(colors, self.candidates[r, g, b])
+        return indices
+
+    def closest(self, colors, refine=False):
+        return [dict(self.matcher.records[i]) for i in self.lookup(colors, refine=refine)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the RGB -> Pantone lookup table.')
+    parser.add_argument('--palette', default=PANTONE_FILE_PATH)
+    parser.add_argument('--bits', type=int, default=DEFAULT_BITS, help='Bits per channel (6 -> 64^3 cells, 8 -> full 256^3)')
+    parser.add_argument('--metric', choices=METRICS, default='rgb')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild even if a table for this palette exists')
+    args = parser.parse_args()
+
+    lut = PantoneLUT.load(args.palette, bits=args.bits, metric=args.metric, rebuild=args.rebuild)
+    print(f'Lookup table ready: {lut.table.shape[0]}^3 cells, {lut.candidates.shape[-1]} candidates per cell')
+
+if __name__ == '__main__':
+    main()
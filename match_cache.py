@@ -0,0 +1,159 @@
+import hashlib
+import os
+from collections import OrderedDict
+import numpy as np
+from palette import CACHE_DIR
+from streaming import pack_rgb, unpack_rgb
+
+DEFAULT_MAX_SIZE = 1 << 16
+
+def matcher_fingerprint(matcher, bits):
+    # Any change to the swatches, their order, the metric or the key quantization invalidates the cache
+    digest = hashlib.sha256(f'{matcher.metric}:{bits}:'.encode())
+    digest.update('\n'.join(matcher.codes).encode())
+    digest.update(np.ascontiguousarray(matcher.rgb).tobytes())
+    return digest.hexdigest()
+
+class MatchCache:
+    def __init__(self, matcher, max_size=DEFAULT_MAX_SIZE, bits=8, path=None):
+        if not 1 <= bits <= 8:
+            raise ValueError('bits must be between 1 and 8')
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+
+        self.matcher = matcher
+        self.max_size = max_size
+        self.bits = bits
+        self.shift = 8 - bits
+        self.path = path
+        self.fingerprint = matcher_fingerprint(matcher, bits)
+        self.entries = OrderedDict()
+        # Entries matched since take_fresh() last ran; only tracked once it has been called
+        self.fresh = None
+        self.hits = self.misses = self.evictions = 0
+
+    @classmethod
+    def load(cls, matcher, max_size=DEFAULT_MAX_SIZE, bits=8, path=None, cache_dir=CACHE_DIR):
+        path = path or os.path.join(cache_dir, f'match-cache-{matcher.metric}-{bits}.npz')
+        cache = cls(matcher, max_size, bits, path)
+        try:
+            with np.load(path) as data:
+                if str(data['fingerprint']) != cache.fingerprint:
+                    return cache
+                keys, indices, distances = data['keys'], data['indices'], data['distances']
+        except (OSError, KeyError, ValueError):
+            return cache
+
+        # Saved oldest first, so the most recently used entries survive a smaller max_size
+        for key, index, distance in zip(keys[-max_size:].tolist(), indices[-max_size:].tolist(), distances[-max_size:].tolist()):
+            cache.entries[key] = (index, distance)
+        return cache
+
+    def save(self, path=None):
+        path = path or self.path
+        if path is None:
+            raise ValueError('No cache path given')
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        entries = list(self.entries.items())
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                fingerprint=np.array(self.fingerprint),
+                keys=np.array([key for key, _ in entries], dtype=np.uint32),
+                indices=np.array([value[0] for _, value in entries], dtype=np.int64),
+                distances=np.array([value[1] for _, value in entries], dtype=np.float64),
+            )
+        os.replace(tmp_path, path)
+
+    @property
+    def metric(self):
+        return self.matcher.metric
+
+    @property
+    def records(self):
+        return self.matcher.records
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def bind(self, matcher):
+        # Rebinding to a different palette or metric drops every entry
+        fingerprint = matcher_fingerprint(matcher, self.bits)
+        if fingerprint != self.fingerprint:
+            self.entries.clear()
+            self.fresh = None if self.fresh is None else {}
+            self.fingerprint = fingerprint
+        self.matcher = matcher
+
+    def clear(self):
+        self.entries.clear()
+        self.fresh = None if self.fresh is None else {}
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def _keys(self, colors):
+        cells = np.clip(np.rint(np.asarray(colors, dtype=np.float64)), 0, 255).astype(np.uint32).reshape(-1, 3) >> self.shift
+        return pack_rgb(cells)
+
+    def _key_colors(self, keys):
+        cells = unpack_rgb(keys).astype(np.float64)
+        # Quantized keys are answered for the cell center, so the result doesn't depend on which color came first
+        return cells * (1 << self.shift) + ((1 << self.shift) - 1) / 2.0
+
+    def match(self, colors):
+        keys = self._keys(colors)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        results = [self.entries.get(key) for key in unique.tolist()]
+        missing = [i for i, entry in enumerate(results) if entry is None]
+
+        for key, entry in zip(unique.tolist(), results):
+            if entry is not None:
+                self.entries.move_to_end(key)
+
+        if missing:
+            found, found_distances = self.matcher.match(self._key_colors(unique[missing]))
+            for i, index, distance in zip(missing, found.tolist(), found_distances.tolist()):
+                results[i] = self.entries[int(unique[i])] = (index, distance)
+                if self.fresh is not None:
+                    self.fresh[int(unique[i])] = results[i]
+            self._evict()
+
+        # Each distinct key is matched once: one miss, and its repeats in the batch are hits
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+        indices, distances = zip(*results) if results else ((), ())
+        inverse = inverse.reshape(-1)
+        return np.array(indices, dtype=np.intp)[inverse], np.array(distances, dtype=np.float64)[inverse]
+
+    def take_fresh(self):
+        # A pool worker hands these back, so the process that saves the cache keeps them
+        fresh, self.fresh = self.fresh or {}, {}
+        return fresh
+
+    def merge(self, entries):
+        # Entries matched by a copy of this cache in another process
+        for key, value in entries.items():
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def closest(self, colors):
+        indices, _ = self.match(colors)
+        return [dict(self.records[i]) for i in indices]
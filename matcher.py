@@ -0,0 +1,206 @@
+import numpy as np
+from colorspace import rgb_to_lab, delta_e_94, delta_e_2000
+from palette import Palette, hex_to_rgb, iter_palette, load_palette_table
+
+CHUNK_SIZE = 4096
+PERCEPTUAL_CHUNK_SIZE = 256
+# Chunk sizes are for palettes up to this many swatches; larger ones get proportionally fewer rows
+CHUNK_SWATCHES = 2048
+METRICS = ('rgb', 'de76', 'de94', 'de2000')
+
+def index_dtype(matcher):
+    # Smallest unsigned type that holds every palette index
+    return np.uint16 if len(matcher) <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+class PantoneMatcher:
+    def __init__(self, pantone_colors, metric='rgb'):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Expected one of: {', '.join(METRICS)}")
+
+        self.metric = metric
+        self.records = []
+
+        if isinstance(pantone_colors, dict):
+            rgb = []
+            for code, pantone in pantone_colors.items():
+                self.records.append({
+                    'name': pantone['name'],
+                    'hex': pantone['hex'],
+                    'code': code,
+                    'cmyk': pantone.get('cmyk', [0, 0, 0, 0])
+                })
+                rgb.append(hex_to_rgb(pantone['hex']))
+        elif isinstance(pantone_colors, Palette):
+            self.records = pantone_colors.records()
+            rgb = pantone_colors.rgb
+        else:
+            # Compiled palette table from palette.load_palette_table
+            for code, name, hex_code, cmyk in iter_palette(pantone_colors):
+                self.records.append({'name': name, 'hex': hex_code, 'code': code, 'cmyk': cmyk})
+            rgb = pantone_colors['rgb']
+
+        self.codes = [record['code'] for record in self.records]
+
+        self.rgb = np.ascontiguousarray(rgb, dtype=np.float64).reshape(-1, 3)
+        self._lab = None
+        self._points = self.lab if metric == 'de76' else self.rgb
+        self._points_sq = np.einsum('ij,ij->i', self._points, self._points)
+
+    @classmethod
+    def from_json(cls, file_path, metric='rgb'):
+        return cls(load_palette_table(file_path), metric=metric)
+
+    @property
+    def lab(self):
+        if self._lab is None:
+            self._lab = np.ascontiguousarray(rgb_to_lab(self.rgb))
+        return self._lab
+
+    @property
+    def points(self):
+        if self.metric in ('de94', 'de2000'):
+            raise ValueError(f"Metric '{self.metric}' has no Euclidean embedding")
+        return self._points
+
+    def __len__(self):
+        return len(self.records)
+
+    def _prepare(self, colors):
+        colors = np.asarray(colors, dtype=np.float64).reshape(-1, 3)
+        return colors if self.metric == 'rgb' else rgb_to_lab(colors)
+
+    def _scores(self, points):
+        # |a - b|^2 = |a|^2 - 2ab + |b|^2; the |a|^2 term doesn't change the argmin
+        scores = points @ self._points.T
+        scores *= -2.0
+        scores += self._points_sq[None, :]
+        return scores
+
+    def distances(self, colors):
+        points = self._prepare(colors)
+
+        if self.metric == 'de94':
+            return delta_e_94(self.lab[None, :, :], points[:, None, :])
+        if self.metric == 'de2000':
+            return delta_e_2000(points[:, None, :], self.lab[None, :, :])
+
+        d2 = self._scores(points)
+        d2 += np.einsum('ij,ij->i', points, points)[:, None]
+        np.maximum(d2, 0.0, out=d2)
+        return np.sqrt(d2, out=d2)
+
+    def chunk_rows(self, columns=None):
+        # Rows scored at once against `columns` swatches each (default: the whole palette)
+        columns = len(self) if columns is None else columns
+        chunk_size = PERCEPTUAL_CHUNK_SIZE if self.metric in ('de94', 'de2000') else CHUNK_SIZE
+        return max(1, min(chunk_size, chunk_size * CHUNK_SWATCHES // max(columns, 1)))
+
+    def match(self, colors):
+        points = self._prepare(colors)
+        indices = np.empty(len(points), dtype=np.intp)
+        distances = np.empty(len(points), dtype=np.float64)
+        perceptual = self.metric in ('de94', 'de2000')
+        chunk_size = self.chunk_rows()
+
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            rows = np.arange(len(chunk))
+
+            if self.metric == 'de94':
+                scores = delta_e_94(self.lab[None, :, :], chunk[:, None, :])
+            elif self.metric == 'de2000':
+                scores = delta_e_2000(chunk[:, None, :], self.lab[None, :, :])
+            else:
+                scores = self._scores(chunk)
+
+            best = np.argmin(scores, axis=1)
+            best_scores = scores[rows, best]
+            if not perceptual:
+                best_scores = np.sqrt(np.maximum(best_scores + np.einsum('ij,ij->i', chunk, chunk), 0.0))
+
+            indices[start:start + len(best)] = best
+            distances[start:start + len(best)] = best_scores
+
+        return indices, distances
+
+    def match_candidates(self, colors, candidates):
+        points = self._prepare(colors)
+        candidates = np.asarray(candidates).reshape(len(points), -1)
+        palette = self.rgb if self.metric == 'rgb' else self.lab
+        indices = np.empty(len(points), dtype=np.intp)
+        distances = np.empty(len(points), dtype=np.float64)
+        chunk_size = self.chunk_rows(candidates.shape[1])
+
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            chunk_candidates = candidates[start:start + chunk_size]
+            swatches = palette[chunk_candidates]
+
+            if self.metric == 'de94':
+                scores = delta_e_94(swatches, chunk[:, None, :])
+            elif self.metric == 'de2000':
+                scores = delta_e_2000(chunk[:, None, :], swatches)
+            else:
+                scores = np.sqrt(np.sum((swatches - chunk[:, None, :]) ** 2, axis=-1))
+
+            rows = np.arange(len(chunk))
+            best = np.argmin(scores, axis=1)
+            indices[start:start + len(chunk)] = chunk_candidates[rows, best]
+            distances[start:start + len(chunk)] = scores[rows, best]
+
+        return indices, distances
+
+    def closest(self, colors):
+        indices, _ = self.match(colors)
+        return [dict(self.records[i]) for i in indices]
+
+class PaletteIndex:
+    def __init__(self, matcher, leaf_size=16):
+        from sklearn.neighbors import KDTree
+
+        self.matcher = matcher
+        self.tree = KDTree(matcher.points, leaf_size=leaf_size)
+
+    @classmethod
+    def from_json(cls, file_path, metric='rgb', leaf_size=16):
+        return cls(PantoneMatcher.from_json(file_path, metric=metric), leaf_size=leaf_size)
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def knn(self, colors, k=1):
+        colors = self.matcher._prepare(colors)
+        k = min(k, len(self))
+        probe = min(k + 1, len(self))
+        distances, indices = self.tree.query(colors, k=probe)
+
+        # Order equal distances by palette index, like argmin over the palette does
+        order = np.lexsort((indices, distances))
+        distances = np.take_along_axis(distances, order, axis=1)
+        indices = np.take_along_axis(indices, order, axis=1)
+
+        if probe > k:
+            # A tie straddling the k-th slot may hide more equally close swatches
+            for row in np.flatnonzero(distances[:, k] == distances[:, k - 1]):
+                ind, dist = self.tree.query_radius(colors[row:row + 1], r=distances[row, k - 1] + 1e-9, return_distance=True)
+                order = np.lexsort((ind[0], dist[0]))[:k]
+                indices[row, :k] = ind[0][order]
+                distances[row, :k] = dist[0][order]
+
+        return indices[:, :k], distances[:, :k]
+
+    def within(self, colors, radius):
+        colors = self.matcher._prepare(colors)
+        found, found_distances = self.tree.query_radius(colors, r=radius, return_distance=True)
+        indices, distances = [], []
+
+        for ind, dist in zip(found, found_distances):
+            order = np.lexsort((ind, dist))
+            indices.append(ind[order])
+            distances.append(dist[order])
+
+        return indices, distances
+
+    def closest(self, colors, k=1):
+        indices, _ = self.knn(colors, k)
+        return [[dict(self.matcher.records[i]) for i in row] for row in indices]
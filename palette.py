@@ -0,0 +1,236 @@
+import glob
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PANTONE_FILE_PATH = './engine/pantone-html-cmyk.json'
+CACHE_DIR = './engine/.cache'
+
+def palette_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def source_key(file_path):
+    # Identifies which palette file a cache entry came from, whatever its contents
+    return hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:8]
+
+def normalize_hex(value):
+    # '#FF6F61', 'ff6f61' and 'f66' all come out as 'ff6f61'
+    hex_code = value.strip().lstrip('#').lower()
+    if len(hex_code) == 3:
+        hex_code = ''.join(c * 2 for c in hex_code)
+    if len(hex_code) != 6 or any(c not in '0123456789abcdef' for c in hex_code):
+        raise ValueError(f"Invalid hex color '{value}'")
+    return hex_code
+
+def hex_to_rgb(value):
+    hex_code = normalize_hex(value)
+    return tuple(int(hex_code[i:i + 2], 16) for i in (0, 2, 4))
+
+def rgb_to_cmyk(rgb):
+    r, g, b = (c / 255 for c in rgb)
+    k = 1 - max(r, g, b)
+    if k == 1:
+        return [0.0, 0.0, 0.0, 100.0]
+    return [(1 - r - k) / (1 - k) * 100, (1 - g - k) / (1 - k) * 100, (1 - b - k) / (1 - k) * 100, k * 100]
+
+SORT_ORDERS = ('name', 'pantone', 'hex', 'hue', 'lightness', 'chroma')
+ACHROMATIC_CHROMA = 5.0
+
+def _code_key(code):
+    return tuple((0, int(part), '') if part.isdigit() else (1, 0, part) for part in code.split('-'))
+
+def sort_orders(pantone_colors):
+    from colorspace import rgb_to_lab
+
+    codes = list(pantone_colors.keys())
+    colors = list(pantone_colors.values())
+    lab = rgb_to_lab(np.array([hex_to_rgb(c['hex']) for c in colors], dtype=np.float64).reshape(-1, 3))
+    lightness = lab[:, 0].tolist()
+    chroma = np.hypot(lab[:, 1], lab[:, 2]).tolist()
+    hue = (np.degrees(np.arctan2(lab[:, 2], lab[:, 1])) % 360.0).tolist()
+    keys = {
+        'name': lambda i: colors[i]['name'].lower(),
+        'pantone': lambda i: _code_key(codes[i]),
+        'hex': lambda i: normalize_hex(colors[i]['hex']),
+        # Greys have no meaningful hue: list them first, dark to light
+        'hue': lambda i: (0, lightness[i], 0) if chroma[i] < ACHROMATIC_CHROMA else (1, hue[i], lightness[i]),
+        'lightness': lambda i: lightness[i],
+        'chroma': lambda i: chroma[i],
+    }
+    positions = range(len(codes))
+
+    # [ascending, descending] per order; sorted() is stable both ways, so equal keys keep palette order
+    return {
+        name: [sorted(positions, key=key), sorted(positions, key=key, reverse=True)]
+        for name, key in keys.items()
+    }
+
+def load_json_palette(file_path):
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+def compile_palette(pantone_colors):
+    codes = list(pantone_colors.keys())
+    names = [color['name'] for color in pantone_colors.values()]
+    dtype = np.dtype([
+        ('code', f'S{max(map(len, codes), default=1)}'),
+        ('name', f'S{max((len(name.encode()) for name in names), default=1)}'),
+        ('hex', 'S6'),
+        ('rgb', 'u1', (3,)),
+        ('cmyk', 'f8', (4,)),
+    ])
+
+    table = np.zeros(len(codes), dtype=dtype)
+    table['code'] = [code.encode() for code in codes]
+    table['name'] = [name.encode() for name in names]
+    hex_codes = [normalize_hex(color['hex']) for color in pantone_colors.values()]
+    table['hex'] = [hex_code.encode() for hex_code in hex_codes]
+    table['rgb'] = [hex_to_rgb(hex_code) for hex_code in hex_codes]
+    table['cmyk'] = [color.get('cmyk', [0, 0, 0, 0]) for color in pantone_colors.values()]
+    return table
+
+def _save_table(cache_path, table, stale_pattern):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, table)
+    os.replace(tmp_path, cache_path)
+
+    # Only older versions of the same palette file; other palettes keep their caches
+    for stale in glob.glob(stale_pattern):
+        if stale != cache_path:
+            os.remove(stale)
+
+def load_palette_table(file_path=PANTONE_FILE_PATH, cache_dir=CACHE_DIR):
+    if np is None:
+        raise ImportError('The compiled palette needs NumPy; use load_pantone_colors() instead')
+
+    prefix = os.path.join(cache_dir, f'palette-{source_key(file_path)}')
+    cache_path = f'{prefix}-{palette_hash(file_path)[:16]}.npy'
+    try:
+        return np.load(cache_path, mmap_mode='r')
+    except (OSError, ValueError):
+        pass
+
+    table = compile_palette(load_json_palette(file_path))
+    try:
+        _save_table(cache_path, table, f'{prefix}-*.npy')
+    except OSError as e:
+        print(f'Warning: could not write palette cache: {e}')
+    return table
+
+def iter_palette(table):
+    for code, name, hex_code, cmyk in zip(table['code'].tolist(), table['name'].tolist(),
+                                          table['hex'].tolist(), table['cmyk'].tolist()):
+        yield code.decode(), name.decode(), hex_code.decode(), cmyk
+
+def load_pantone_colors(file_path=PANTONE_FILE_PATH, cache_dir=CACHE_DIR):
+    if np is None:
+        return load_json_palette(file_path)
+
+    return {
+        code: {'name': name, 'hex': hex_code, 'cmyk': cmyk}
+        for code, name, hex_code, cmyk in iter_palette(load_palette_table(file_path, cache_dir))
+    }
+
+class Palette:
+    # Structure of arrays: one row per swatch, in file order. Codes and names are
+    # interned strings; everything numeric lives in NumPy arrays.
+    def __init__(self, codes, names, hex_codes, rgb, cmyk):
+        if np is None:
+            raise ImportError('Palette needs NumPy; use load_pantone_colors() instead')
+
+        self.codes = [sys.intern(code) for code in codes]
+        self.names = [sys.intern(name) for name in names]
+        self.hex = np.asarray(hex_codes, dtype='U6').reshape(-1)
+        self.rgb = np.ascontiguousarray(rgb, dtype=np.uint8).reshape(-1, 3)
+        self.cmyk = np.ascontiguousarray(cmyk, dtype=np.float64).reshape(-1, 4)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self._lab = None
+
+    @classmethod
+    def load(cls, file_path=PANTONE_FILE_PATH, cache_dir=CACHE_DIR):
+        table = load_palette_table(file_path, cache_dir)
+        return cls(
+            [code.decode() for code in table['code'].tolist()],
+            [name.decode() for name in table['name'].tolist()],
+            table['hex'].astype('U6'),
+            table['rgb'],
+            table['cmyk'],
+        )
+
+    @classmethod
+    def from_dict(cls, pantone_colors):
+        codes, names, hex_codes, cmyk = [], [], [], []
+        for code, color in pantone_colors.items():
+            codes.append(code)
+            names.append(color.get('name', 'Unnamed'))
+            hex_codes.append(normalize_hex(color.get('hex', '000000')))
+            values = color.get('cmyk', [0.0, 0.0, 0.0, 0.0])
+            cmyk.append(values if len(values) == 4 else [0.0, 0.0, 0.0, 0.0])
+        rgb = [hex_to_rgb(hex_code) for hex_code in hex_codes]
+        return cls(codes, names, hex_codes, np.array(rgb, dtype=np.uint8).reshape(-1, 3), cmyk)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self.index
+
+    def __getitem__(self, code):
+        i = self.index[code]
+        return {'name': self.names[i], 'hex': str(self.hex[i]), 'cmyk': self.cmyk[i].tolist()}
+
+    def record(self, i):
+        return {'name': self.names[i], 'hex': str(self.hex[i]), 'code': self.codes[i], 'cmyk': self.cmyk[i].tolist()}
+
+    def records(self):
+        return [
+            {'name': name, 'hex': hex_code, 'code': code, 'cmyk': cmyk}
+            for code, name, hex_code, cmyk in zip(self.codes, self.names, self.hex.tolist(), self.cmyk.tolist())
+        ]
+
+    def to_dict(self):
+        return {
+            code: {'name': name, 'hex': hex_code, 'cmyk': cmyk}
+            for code, name, hex_code, cmyk in zip(self.codes, self.names, self.hex.tolist(), self.cmyk.tolist())
+        }
+
+    def take(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        return Palette([self.codes[i] for i in indices], [self.names[i] for i in indices],
+                       self.hex[indices], self.rgb[indices], self.cmyk[indices])
+
+    def select(self, prefix=None, family=None):
+        # prefix: start of the code, e.g. '19-' or '19-40'; family: a word of the name, e.g. 'green'
+        mask = np.ones(len(self), dtype=bool)
+        if prefix:
+            mask &= np.char.startswith(np.array(self.codes, dtype=str), prefix)
+        if family:
+            names = np.char.add(np.char.add('-', np.char.lower(np.array(self.names, dtype=str))), '-')
+            mask &= np.char.find(names, f'-{family.lower()}-') >= 0
+        return self.take(np.flatnonzero(mask))
+
+    def hex_strings(self, upper=False, prefix=''):
+        hex_codes = np.char.upper(self.hex) if upper else self.hex
+        return np.char.add(prefix, hex_codes) if prefix else hex_codes
+
+    def cmyk_strings(self, fmt='%.2f'):
+        return np.char.mod(fmt, self.cmyk)
+
+    @property
+    def lab(self):
+        if self._lab is None:
+            from colorspace import rgb_to_lab
+            self._lab = rgb_to_lab(self.rgb.astype(np.float64))
+        return self._lab
+
+def as_palette(colors):
+    return colors if isinstance(colors, Palette) else Palette.from_dict(colors)
@@ -1,15 +1,7 @@
-from bs4 import BeautifulSoup
-
-with open('pantone-colors.html', 'r') as file:
-    soup = BeautifulSoup(file, 'html.parser')
-
-cells = soup.find_all('td')
+from extract_html import iter_swatches
 
 with open('pantone_colors.txt', 'w') as file:
-    for i in range(0, len(cells), 2):
-        color_name = cells[i].get('class', [''])[0]
-        color_code = cells[i].get('data-clipboard-text', '')
-
+    for color_name, color_code in iter_swatches('pantone-colors.html'):
         file.write(f"{color_name} - {color_code}\n")
 
 print("Data saved at pantone_colors.txt")
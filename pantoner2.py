@@ -1,17 +1,21 @@
+import argparse
 import json
 import os
+from extract_html import iter_swatches, swatches_to_palette
+from palette import PANTONE_FILE_PATH, load_pantone_colors, sort_orders
+from search_index import SEARCH_SCRIPT, build_search_index, search_index_json
 
 def load_colors_from_json(file_path):
     try:
-        with open(file_path, 'r') as file:
-            colors = json.load(file)
-            return colors
+        return load_pantone_colors(file_path)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f'Error: {e}')
         return {}
 
 def generate_html(colors, output_path):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # A bare file name is written to the current directory
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
     with open(output_path, 'w') as file:
         file.write('<!DOCTYPE html>\n')
@@ -43,6 +47,9 @@ def generate_html(colors, output_path):
         file.write('    <button onclick="sortTable(\'name\')">By name</button>\n')
         file.write('    <button onclick="sortTable(\'pantone\')">By Pantone order</button>\n')
         file.write('    <button onclick="sortTable(\'hex\')">By HTML code</button>\n')
+        file.write('    <button onclick="sortTable(\'hue\')">By hue</button>\n')
+        file.write('    <button onclick="sortTable(\'lightness\')">By lightness</button>\n')
+        file.write('    <button onclick="sortTable(\'chroma\')">By chroma</button>\n')
         file.write('    <table id="pantoneTable">\n')
         file.write('      <thead>\n')
         file.write('        <tr>\n')
@@ -64,29 +71,28 @@ def generate_html(colors, output_path):
         file.write('      </tbody>\n')
         file.write('    </table>\n')
         file.write('  </div>\n')
+        search_index = build_search_index([color['name'], f'#{color["hex"]}'] for color in colors.values())
+        file.write(f'  <script type="application/json" id="searchIndex">{search_index_json(search_index)}</script>\n')
+        orders = json.dumps(sort_orders(colors), separators=(',', ':'))
+        file.write(f'  <script type="application/json" id="sortOrders">{orders}</script>\n')
         file.write('  <script>\n')
-        file.write('    document.getElementById("search").addEventListener("input", function() {\n')
-        file.write('      let search = this.value.toLowerCase();\n')
-        file.write('      let rows = document.querySelectorAll("#pantoneTable tbody tr");\n')
-        file.write('      rows.forEach(row => {\n')
-        file.write('        let name = row.children[0].textContent.toLowerCase();\n')
-        file.write('        let hex = row.children[1].textContent.toLowerCase();\n')
-        file.write('        if (name.includes(search) || hex.includes(search)) {\n')
-        file.write('          row.classList.remove("hidden");\n')
-        file.write('        } else {\n')
-        file.write('          row.classList.add("hidden");\n')
-        file.write('        }\n')
-        file.write('      });\n')
+        file.write(SEARCH_SCRIPT)
+        file.write('    const searchData = JSON.parse(document.getElementById("searchIndex").textContent);\n')
+        file.write('    const searchRows = document.querySelectorAll("#pantoneTable tbody tr");\n')
+        file.write('    bindSearch(document.getElementById("search"), searchData, searchRows, (row, show) => {\n')
+        file.write('      row.classList.toggle("hidden", !show);\n')
         file.write('    });\n')
+        file.write('    const sortOrders = JSON.parse(document.getElementById("sortOrders").textContent);\n')
+        file.write('    let sortedBy = null, descending = false;\n')
         file.write('    function sortTable(by) {\n')
-        file.write('      let table = document.querySelector("#pantoneTable tbody");\n')
-        file.write('      let rows = Array.from(table.querySelectorAll("tr"));\n')
-        file.write('      rows.sort((a, b) => {\n')
-        file.write('        let valA = a.children[by === "name" ? 0 : by === "pantone" ? 0 : 1].textContent.toLowerCase();\n')
-        file.write('        let valB = b.children[by === "name" ? 0 : by === "pantone" ? 0 : 1].textContent.toLowerCase();\n')
-        file.write('        return valA.localeCompare(valB);\n')
-        file.write('      });\n')
-        file.write('      rows.forEach(row => table.appendChild(row));\n')
+        file.write('      // Clicking the same order again reverses it\n')
+        file.write('      descending = by === sortedBy && !descending;\n')
+        file.write('      sortedBy = by;\n')
+        file.write('      // Orders are precomputed row permutations: one reorder pass, no comparisons\n')
+        file.write('      const table = document.querySelector("#pantoneTable tbody");\n')
+        file.write('      const fragment = document.createDocumentFragment();\n')
+        file.write('      sortOrders[by][descending ? 1 : 0].forEach(i => fragment.appendChild(searchRows[i]));\n')
+        file.write('      table.appendChild(fragment);\n')
         file.write('    }\n')
         file.write('    new ClipboardJS(".color-box, .color-name");\n')
         file.write('  </script>\n')
@@ -94,9 +100,16 @@ def generate_html(colors, output_path):
         file.write('</html>\n')
 
 def main():
-    input_path = './pantone-colors/pantone-numbers.json'
-    output_path = './Pantone-Colour-Cart-tool.html'
-    colors = load_colors_from_json(input_path)
+    parser = argparse.ArgumentParser(description='Generate the PANTONE to HTML colour converter table.')
+    parser.add_argument('--from-html', help='Read swatches from a vendor HTML dump such as pantone-colors.html')
+    parser.add_argument('-o', '--output', default='./Pantone-Colour-Cart-tool.html')
+    args = parser.parse_args()
+
+    output_path = args.output
+    if args.from_html:
+        colors = swatches_to_palette(iter_swatches(args.from_html))
+    else:
+        colors = load_colors_from_json(PANTONE_FILE_PATH)
     generate_html(colors, output_path)
     print(f'Color Chartset created at {output_path}')
 
@@ -1,57 +1,119 @@
-from PIL import Image
 import numpy as np
-from sklearn.cluster import KMeans
+import argparse
+import glob
+import hashlib
 import json
 import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
 from datetime import datetime
+from lut import PantoneLUT
+from match_cache import MatchCache
+from matcher import METRICS, PantoneMatcher
+from palette import PANTONE_FILE_PATH, Palette, hex_to_rgb, load_pantone_colors
+from profiling import HOOKS, enable as enable_profiling, stage
+from quantize import QUANTIZERS, quantize, unique_colors
+from remap import remap_image, save_remap
+from sequence import DEFAULT_THRESHOLD, process_sequence
+from streaming import DEFAULT_HIST_BITS, image_histogram
 
-def load_pantone_colors(file_path):
-    with open(file_path, 'r') as f:
-        return json.load(f)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp')
+SAMPLING_MODES = ('random', 'stratified')
+# The manifest is rewritten after this many new images, and once more when the batch ends
+MANIFEST_FLUSH_EVERY = 50
+
+# PIL and scikit-learn are imported where they're needed, so that
+# `picker.py hex` starts without loading them
+def downscale_image(img, max_side):
+    from PIL import Image
 
-def extract_colors(image_path, num_colors=9):
-    img = Image.open(image_path)
+    if max(img.size) <= max_side:
+        return img
+    img.draft('RGB', (max_side, max_side))
     img = img.convert('RGB')
-    img_np = np.array(img)
-    img_np = img_np.reshape((img_np.shape[0] * img_np.shape[1], 3))
+    scale = max_side / max(img.size)
+    if scale < 1:
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.BOX)
+    return img
+
+def sample_pixels(img_np, max_pixels, mode='random', seed=None):
+    height, width = img_np.shape[:2]
+    if height * width <= max_pixels:
+        return img_np.reshape(-1, 3)
+
+    rng = np.random.default_rng(seed)
+    if mode == 'random':
+        flat = rng.choice(height * width, size=max_pixels, replace=False)
+        return img_np.reshape(-1, 3)[np.sort(flat)]
+
+    # Stratified: one randomly placed pixel per step x step block
+    step = int(np.ceil(np.sqrt(height * width / max_pixels)))
+    ys = np.arange(0, height, step)
+    xs = np.arange(0, width, step)
+    ys = np.minimum(ys[:, None] + rng.integers(0, step, (len(ys), len(xs))), height - 1)
+    xs = np.minimum(xs[None, :] + rng.integers(0, step, (len(ys), len(xs))), width - 1)
+    return img_np[ys, xs].reshape(-1, 3)
+
+def extract_colors(image_path, num_colors=9, max_side=None, sample=None, max_pixels=None, unique=False, seed=None,
+                   tile_rows=None, hist_bits=DEFAULT_HIST_BITS, quantizer='kmeans'):
+    from PIL import Image
+
+    if quantizer not in QUANTIZERS:
+        raise ValueError(f"Unknown quantizer '{quantizer}'. Expected one of: {', '.join(QUANTIZERS)}")
+
+    if tile_rows:
+        if max_side or sample:
+            raise ValueError('Tiled analysis reads every pixel; it cannot be combined with max_side or sample')
+        with stage('histogram') as record:
+            img_np, weights = image_histogram(image_path, tile_rows, hist_bits).colors()
+            record['items'] = len(img_np)
+        with stage('quantize', items=len(img_np), clusters=num_colors, quantizer=quantizer):
+            return quantize(img_np, num_colors, quantizer, weights, seed).astype(int)
+
+    if sample is not None and sample not in SAMPLING_MODES:
+        raise ValueError(f"Unknown sampling mode '{sample}'. Expected one of: {', '.join(SAMPLING_MODES)}")
+    if sample is not None and not max_pixels:
+        raise ValueError('Pixel sampling needs a max_pixels budget')
+
+    with stage('decode') as record:
+        img = Image.open(image_path)
+        if max_side:
+            img = downscale_image(img, max_side)
+        img = img.convert('RGB')
+        img_np = np.asarray(img)
+        record['items'] = img_np.shape[0] * img_np.shape[1]
+
+    with stage('reshape') as record:
+        if sample is not None:
+            img_np = sample_pixels(img_np, max_pixels, sample, seed)
+        img_np = img_np.reshape((-1, 3))
+
+        weights = None
+        if unique:
+            img_np, weights = unique_colors(img_np)
+        record['items'] = len(img_np)
 
-    kmeans = KMeans(n_clusters=num_colors).fit(img_np)
-    colors = kmeans.cluster_centers_.astype(int)
+    with stage('quantize', items=len(img_np), clusters=num_colors, quantizer=quantizer):
+        colors = quantize(img_np, num_colors, quantizer, weights, seed, bits=hist_bits).astype(int)
     return colors
 
 def color_distance(color1, color2):
     return np.sqrt(np.sum((np.array(color1) - np.array(color2)) ** 2))
 
 def find_closest_pantone_color(rgb, pantone_colors):
-    closest_color = None
-    min_distance = float('inf')
-
-    for code, pantone in pantone_colors.items():
-        pantone_color = (
-            int(pantone['hex'][0:2], 16),
-            int(pantone['hex'][2:4], 16),
-            int(pantone['hex'][4:6], 16)
-        )
-        distance = color_distance(rgb, pantone_color)
-
-        if distance < min_distance:
-            min_distance = distance
-            closest_color = {
-                'name': pantone['name'],
-                'hex': pantone['hex'],
-                'code': code,
-                'cmyk': pantone.get('cmyk', [0, 0, 0, 0])
-            }
-
-    return closest_color
+    matcher = pantone_colors if isinstance(pantone_colors, (PantoneMatcher, MatchCache)) else PantoneMatcher(pantone_colors)
+    return matcher.closest([rgb])[0]
 
 def rgb_to_hex(rgb):
     return ''.join(f'{c:02x}' for c in rgb)
 
-def save_html(image_path, pantone_matches):
+def save_html(image_path, pantone_matches, output_dir='.'):
     image_name = os.path.basename(image_path)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    output_file = f'Results_{image_name}_{timestamp}.html'
+    output_file = os.path.join(output_dir, f'Results_{image_name}_{timestamp}.html')
+    image_src = os.path.relpath(os.path.abspath(image_path), os.path.abspath(output_dir))
 
     html_content = f"""
     <!DOCTYPE html>
@@ -100,7 +162,7 @@ def save_html(image_path, pantone_matches):
     </head>
     <body>
         <div id="image">
-            <img src="{image_path}" alt="Image">
+            <img src="{image_src}" alt="Image">
     """
 
     for idx, match in enumerate(pantone_matches):
@@ -152,17 +214,294 @@ def save_html(image_path, pantone_matches):
     with open(output_file, 'w') as file:
         file.write(html_content)
     print(f"Results saved to {output_file}")
+    return output_file
 
-def process_image(image_path):
-    pantone_colors = load_pantone_colors('./engine/pantone-html-cmyk.json')
-    colors = extract_colors(image_path)
-    pantone_matches = [find_closest_pantone_color(tuple(color), pantone_colors) for color in colors]
-    save_html(image_path, pantone_matches)
+def process_image(image_path, matcher=None, output_dir='.', remap=False, remap_jobs=None, **extract_options):
+    with stage('process_image', image=image_path):
+        if matcher is None:
+            with stage('palette_load') as record:
+                matcher = PantoneMatcher(Palette.load(PANTONE_FILE_PATH))
+                record['items'] = len(matcher)
+        colors = extract_colors(image_path, **extract_options)
+        with stage('match', items=len(colors)):
+            pantone_matches = matcher.closest(colors)
+        with stage('save_html', items=len(pantone_matches)):
+            report = save_html(image_path, pantone_matches, output_dir)
+        result = {'image': image_path, 'report': report, 'matches': pantone_matches}
+        if remap:
+            # Every pixel is matched exactly, so the quantized match cache is bypassed
+            matcher = getattr(matcher, 'matcher', matcher)
+            lut = PantoneLUT.load() if matcher.metric == 'rgb' else None
+            with ExitStack() as stack:
+                with stage('remap', jobs=remap_jobs) as record:
+                    output, indices, counts = stack.enter_context(remap_image(image_path, matcher, remap_jobs, lut=lut))
+                    record['items'] = indices.size
+                # Saved straight from the remap buffers, before they are released
+                with stage('save_remap', items=int(np.count_nonzero(counts))):
+                    result['remap'] = save_remap(image_path, matcher, output, indices, counts, output_dir)
+                del output, indices
+    return result
 
-if __name__ == "__main__":
-    image_path = input("Image PATH?: ").strip()
+def file_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def collect_images(inputs):
+    images = []
+    for entry in inputs:
+        if os.path.isdir(entry):
+            for root, _, files in os.walk(entry):
+                images.extend(os.path.join(root, name) for name in sorted(files)
+                              if name.lower().endswith(IMAGE_EXTENSIONS))
+        elif os.path.isfile(entry):
+            images.append(entry)
+        else:
+            images.extend(path for path in sorted(glob.glob(entry, recursive=True)) if os.path.isfile(path))
+    # Keep the first occurrence of each path
+    return list(dict.fromkeys(os.path.normpath(path) for path in images))
+
+def load_manifest(manifest_path):
+    if not os.path.isfile(manifest_path):
+        return {}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+def save_manifest(manifest_path, manifest):
+    tmp_path = f'{manifest_path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+_worker_matcher = None
+
+def _init_worker(matcher, share_matches=False):
+    global _worker_matcher
+    _worker_matcher = matcher
+    if share_matches:
+        matcher.take_fresh()
+
+def _process_task(image_path, digest, output_dir, extract_options, remap=False, remap_jobs=1):
+    result = process_image(image_path, _worker_matcher, output_dir, remap, remap_jobs, **extract_options)
+    result['sha256'] = digest
+    # New match cache entries go back with the result, since this worker's copy is never saved
+    fresh = _worker_matcher.take_fresh() if getattr(_worker_matcher, 'fresh', None) is not None else {}
+    return result, fresh
+
+def process_batch(inputs, output_dir='.', jobs=None, manifest_path=None, results_path=None, force=False, match_cache=False,
+                  remap=False, **extract_options):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(output_dir, 'manifest.json')
+    results_path = results_path or os.path.join(output_dir, 'results.json')
+    manifest = {} if force else load_manifest(manifest_path)
+    with stage('palette_load') as record:
+        matcher = PantoneMatcher(Palette.load(PANTONE_FILE_PATH))
+        record['items'] = len(matcher)
+    if remap:
+        # Build the lookup table once here rather than racing to build it in every worker
+        PantoneLUT.load()
+    if match_cache:
+        # Workers get a warm copy and send back what they add to it
+        matcher = MatchCache.load(matcher)
+
+    # Remap runs are recorded under their own options, so earlier manifests stay valid
+    options = dict(extract_options, remap=True) if remap else extract_options
+    results, pending = [], []
+    for image_path in collect_images(inputs):
+        digest = file_hash(image_path)
+        done = manifest.get(digest)
+        if done and done.get('options') == options and os.path.isfile(done.get('report', '')):
+            print(f"Skipping {image_path} (already processed)")
+            results.append(dict(done['result'], image=image_path))
+        else:
+            pending.append((image_path, digest))
+
+    unsaved = 0
 
-    if not os.path.isfile(image_path):
-        print("Incorrect PATH.")
+    def record(result, fresh):
+        nonlocal unsaved
+        if fresh:
+            matcher.merge(fresh)
+        manifest[result['sha256']] = {'options': options, 'report': result['report'], 'result': result}
+        results.append(result)
+        unsaved += 1
+        if unsaved >= MANIFEST_FLUSH_EVERY:
+            save_manifest(manifest_path, manifest)
+            unsaved = 0
+
+    try:
+        if jobs == 1 or len(pending) <= 1:
+            _init_worker(matcher)
+            for image_path, digest in pending:
+                try:
+                    # A single image gets the whole pool for its remap
+                    record(*_process_task(image_path, digest, output_dir, extract_options, remap, jobs))
+                except Exception as e:
+                    print(f"Error processing {image_path}: {e}")
+        else:
+            # The matcher is pickled once per worker, not once per image
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(matcher, match_cache)) as pool:
+                futures = {pool.submit(_process_task, image_path, digest, output_dir, extract_options, remap): image_path
+                           for image_path, digest in pending}
+                for future in as_completed(futures):
+                    try:
+                        record(*future.result())
+                    except Exception as e:
+                        print(f"Error processing {futures[future]}: {e}")
+    finally:
+        # Interrupted runs keep what they finished
+        if unsaved:
+            save_manifest(manifest_path, manifest)
+
+    if match_cache:
+        matcher.save()
+
+    results.sort(key=lambda result: result['image'])
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Combined results saved to {results_path}")
+    return results
+
+def sequence_name(entry, paths):
+    # Named after the file or the folder holding the frames; the hash of the input keeps same-named inputs apart
+    if len(paths) == 1:
+        label = os.path.splitext(os.path.basename(paths[0]))[0]
     else:
-        process_image(image_path)
+        label = os.path.basename(os.path.commonpath([os.path.abspath(os.path.dirname(path)) for path in paths]))
+    label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('._') or 'frames'
+    return f"{label}-{hashlib.sha256(os.path.abspath(entry).encode()).hexdigest()[:8]}"
+
+def process_sequences(inputs, output_dir='.', threshold=DEFAULT_THRESHOLD, num_colors=9, max_side=None, seed=None,
+                      hist_bits=DEFAULT_HIST_BITS, quantizer='hist-kmeans'):
+    os.makedirs(output_dir, exist_ok=True)
+    with stage('palette_load') as record:
+        matcher = PantoneMatcher(Palette.load(PANTONE_FILE_PATH))
+        record['items'] = len(matcher)
+
+    # Each input is one sequence: an animated or multi-page file, or a directory or glob of frames
+    summaries = []
+    for entry in inputs:
+        paths = collect_images([entry])
+        if not paths:
+            print(f"No frames found for {entry}")
+            continue
+        try:
+            summaries.append(process_sequence(sequence_name(entry, paths), paths, matcher, output_dir, max_side,
+                                              num_colors=num_colors, quantizer=quantizer, threshold=threshold,
+                                              bits=hist_bits, seed=seed))
+        except Exception as e:
+            print(f"Error processing {entry}: {e}")
+    return summaries
+
+def match_hex(hex_codes, metric='rgb', k=1, file_path=PANTONE_FILE_PATH):
+    matcher = PantoneMatcher(Palette.load(file_path), metric=metric)
+    colors = [hex_to_rgb(hex_code) for hex_code in hex_codes]
+    if k == 1:
+        indices, distances = matcher.match(colors)
+        indices, distances = indices[:, None], distances[:, None]
+    else:
+        all_distances = matcher.distances(colors)
+        indices = np.argsort(all_distances, axis=1, kind='stable')[:, :k]
+        distances = np.take_along_axis(all_distances, indices, axis=1)
+
+    return [
+        {'input': hex_code, 'matches': [dict(matcher.records[i], distance=float(d)) for i, d in zip(row, row_distances)]}
+        for hex_code, row, row_distances in zip(hex_codes, indices.tolist(), distances.tolist())
+    ]
+
+def hex_main(argv):
+    parser = argparse.ArgumentParser(prog='picker.py hex', description='Match hex colors to the closest Pantone swatches.')
+    parser.add_argument('colors', nargs='+', help="Hex colors such as ff6f61, '#ff6f61' or f66")
+    parser.add_argument('--metric', choices=METRICS, default='rgb')
+    parser.add_argument('-k', type=int, default=1, help='Swatches to list per color')
+    parser.add_argument('--json', action='store_true', help='Print the matches as JSON')
+    args = parser.parse_args(argv)
+
+    try:
+        results = match_hex(args.colors, args.metric, max(1, args.k))
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for result in results:
+        for match in result['matches']:
+            print(f"{result['input']}: {match['name']} ({match['code']}) #{match['hex']}  distance {match['distance']:.2f}")
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['hex']:
+        return hex_main(argv[1:])
+
+    parser = argparse.ArgumentParser(description='Extract dominant colors from images and match them to Pantone. '
+                                                 "Use 'picker.py hex COLOR...' to match hex codes.")
+    parser.add_argument('inputs', nargs='*', help='Image files, glob patterns or directories')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('-o', '--output-dir', default='.', help='Directory for HTML reports and results.json')
+    parser.add_argument('--manifest', help='Manifest of processed images (default: OUTPUT_DIR/manifest.json)')
+    parser.add_argument('--results', help='Combined results file (default: OUTPUT_DIR/results.json)')
+    parser.add_argument('--force', action='store_true', help='Reprocess images already in the manifest')
+    parser.add_argument('--colors', type=int, default=9, help='Number of dominant colors')
+    parser.add_argument('--max-side', type=int, help='Downscale so the longest side is at most this')
+    parser.add_argument('--sample', choices=SAMPLING_MODES, help='Pixel sampling mode')
+    parser.add_argument('--max-pixels', type=int, help='Pixel budget for --sample')
+    parser.add_argument('--unique', action='store_true', help='Cluster unique colors weighted by count')
+    parser.add_argument('--seed', type=int, help='Seed for sampling and clustering')
+    parser.add_argument('--tile-rows', type=int, help='Stream the image in strips of this many rows (bounded memory)')
+    parser.add_argument('--hist-bits', type=int, help='Bits per channel of the histogram pixels are binned into')
+    parser.add_argument('--quantizer', choices=QUANTIZERS, help='Dominant color backend (default: kmeans, scikit-learn)')
+    parser.add_argument('--match-cache', action='store_true', help='Reuse matches persisted from earlier runs')
+    parser.add_argument('--remap', action='store_true',
+                        help='Also map every pixel to its closest swatch: writes the image, an index map and coverage counts')
+    parser.add_argument('--sequence', action='store_true',
+                        help='Treat each input as a frame sequence (GIF, multi-page TIFF, directory of frames)')
+    parser.add_argument('--skip-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Sequence mode: recluster once a channel distribution shifted this share of the range')
+    parser.add_argument('--profile', nargs='?', const='-', metavar='PATH',
+                        help='Write per-stage timings as JSON lines to PATH (default: stderr)')
+    parser.add_argument('--profile-stage', help='Attach --profile-hook to this stage only, e.g. quantize')
+    parser.add_argument('--profile-hook', choices=HOOKS, default='cprofile', help='Profiler for --profile-stage')
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        enable_profiling(args.profile, args.profile_hook if args.profile_stage else None, args.profile_stage)
+
+    extract_options = {'num_colors': args.colors}
+    for option in ('max_side', 'sample', 'max_pixels', 'unique', 'seed', 'tile_rows', 'hist_bits', 'quantizer'):
+        value = getattr(args, option)
+        if value not in (None, False):
+            extract_options[option] = value
+
+    if args.sequence:
+        if not args.inputs:
+            parser.error('--sequence needs at least one input')
+        # Frames are clustered from their histograms, so pixel-level options don't apply
+        unsupported = [f"--{option.replace('_', '-')}" for option in ('sample', 'max_pixels', 'unique', 'tile_rows', 'remap')
+                       if getattr(args, option) not in (None, False)]
+        if unsupported:
+            parser.error(f"--sequence cannot be combined with {', '.join(unsupported)}")
+        process_sequences(args.inputs, args.output_dir, args.skip_threshold, **extract_options)
+        return
+
+    if not args.inputs:
+        image_path = input("Image PATH?: ").strip()
+
+        if not os.path.isfile(image_path):
+            print("Incorrect PATH.")
+        else:
+            matcher = None
+            if args.match_cache:
+                matcher = MatchCache.load(PantoneMatcher(Palette.load(PANTONE_FILE_PATH)))
+            process_image(image_path, matcher, remap=args.remap, remap_jobs=args.jobs, **extract_options)
+            if args.match_cache:
+                matcher.save()
+        return
+
+    process_batch(args.inputs, args.output_dir, args.jobs, args.manifest, args.results, args.force, args.match_cache,
+                  args.remap, **extract_options)
+
+if __name__ == "__main__":
+    main()
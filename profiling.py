@@ -0,0 +1,186 @@
+import json
+import os
+import sys
+import time
+
+PROFILE_ENV = 'PANTONE_PROFILE'
+HOOK_ENV = 'PANTONE_PROFILE_HOOK'
+HOOKS = ('cprofile', 'tracemalloc')
+TOP_ENTRIES = 15
+
+class _NullRecord(dict):
+    # Shared by every disabled stage, so annotations are dropped instead of piling up
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def setdefault(self, key, default=None):
+        return default
+
+class _NullStage:
+    record = _NullRecord()
+
+    def __enter__(self):
+        return self.record
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+_profiler = None
+
+def _read_hwm():
+    # Linux: VmHWM is the peak RSS since the last reset through clear_refs
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def _reset_hwm():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _process_peak():
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class _Stage:
+    def __init__(self, profiler, name, fields):
+        self.profiler = profiler
+        self.name = name
+        self.context = fields
+        self.hook = None
+        self.child_peak = 0
+
+    def __enter__(self):
+        profiler = self.profiler
+        if profiler.stack:
+            # Inner stages carry their parent's context, e.g. the image being processed
+            parent = profiler.stack[-1]
+            self.context = {**parent.context, **self.context}
+            # Keep the parent's peak so far before the high-water mark is reset
+            parent.child_peak = max(parent.child_peak, _read_hwm() or 0)
+        self.record = {'stage': self.name, **self.context}
+        profiler.stack.append(self)
+        self.per_stage = _reset_hwm()
+
+        if profiler.hook and self.name == profiler.hook_stage:
+            self.hook = profiler.hook
+            if self.hook == 'cprofile':
+                import cProfile
+                self.cprofile = cProfile.Profile()
+                self.cprofile.enable()
+            else:
+                import tracemalloc
+                tracemalloc.start()
+
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self.record
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        if self.hook == 'cprofile':
+            self.cprofile.disable()
+            self.record['cprofile'] = self._cprofile_top()
+        elif self.hook == 'tracemalloc':
+            self.record['tracemalloc'] = self._tracemalloc_top()
+
+        hwm = _read_hwm() if self.per_stage else None
+        peak = max(hwm if hwm is not None else _process_peak(), self.child_peak)
+        stack = self.profiler.stack
+        stack.pop()
+        if stack:
+            # An inner stage reset the high-water mark, so hand its peak up
+            stack[-1].child_peak = max(stack[-1].child_peak, peak)
+
+        self.record.update(
+            wall_ms=round(wall * 1000, 3),
+            cpu_ms=round(cpu * 1000, 3),
+            peak_rss_mb=round(peak / 1e6, 1),
+            rss_scope='stage' if hwm is not None else 'process',
+            pid=os.getpid(),
+            error=exc[0].__name__ if exc[0] else None,
+        )
+        self.profiler.emit(self.record)
+        return False
+
+    def _cprofile_top(self):
+        import pstats
+        stats = pstats.Stats(self.cprofile).sort_stats('cumulative')
+        top = []
+        for func in stats.fcn_list[:TOP_ENTRIES]:
+            calls, _, total, cumulative, _ = stats.stats[func]
+            top.append({'function': pstats.func_std_string(func), 'calls': calls,
+                        'total_ms': round(total * 1000, 3), 'cumulative_ms': round(cumulative * 1000, 3)})
+        return top
+
+    def _tracemalloc_top(self):
+        import tracemalloc
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        top = [{'site': str(stat.traceback[0]), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+               for stat in snapshot.statistics('lineno')[:TOP_ENTRIES]]
+        return {'traced_peak_mb': round(peak / 1e6, 3), 'top': top}
+
+class Profiler:
+    def __init__(self, output=None, hook=None, hook_stage=None):
+        if hook is not None and hook not in HOOKS:
+            raise ValueError(f"Unknown profile hook '{hook}'. Expected one of: {', '.join(HOOKS)}")
+        self.output = output
+        self.hook = hook
+        self.hook_stage = hook_stage
+        self.stack = []
+
+    def stage(self, name, **fields):
+        return _Stage(self, name, fields)
+
+    def emit(self, record):
+        line = json.dumps(record) + '\n'
+        if self.output in (None, '', '1', '-'):
+            sys.stderr.write(line)
+            sys.stderr.flush()
+        else:
+            # One write per line in append mode, so worker processes can share the file
+            with open(self.output, 'a') as f:
+                f.write(line)
+
+def enable(output=None, hook=None, hook_stage=None):
+    global _profiler
+    _profiler = Profiler(output, hook, hook_stage)
+    # Exported so worker processes pick up the same settings
+    os.environ[PROFILE_ENV] = output or '1'
+    if hook:
+        os.environ[HOOK_ENV] = f'{hook}:{hook_stage}'
+    return _profiler
+
+def disable():
+    global _profiler
+    _profiler = None
+    os.environ.pop(PROFILE_ENV, None)
+    os.environ.pop(HOOK_ENV, None)
+
+def stage(name, **fields):
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name, **fields)
+
+if os.environ.get(PROFILE_ENV, '') not in ('', '0'):
+    _hook, _, _hook_stage = os.environ.get(HOOK_ENV, '').partition(':')
+    _profiler = Profiler(os.environ[PROFILE_ENV], _hook or None, _hook_stage or None)
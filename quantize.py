@@ -0,0 +1,186 @@
+import numpy as np
+from streaming import DEFAULT_HIST_BITS, ColorHistogram, pack_rgb, unpack_rgb
+
+QUANTIZERS = ('kmeans', 'octree', 'median-cut', 'hist-kmeans')
+MAX_ITER = 100
+# hist-kmeans stops once no center moves further than this (RGB units)
+TOLERANCE = 0.5
+
+def _weighted(points, weights):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    weights = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=np.float64)
+    return points, weights
+
+def unique_colors(pixels):
+    packed, counts = np.unique(pack_rgb(pixels), return_counts=True)
+    return unpack_rgb(packed).astype(np.uint8), counts
+
+def _binned(points, bits, num_colors):
+    # Each bin stands for the mean of its pixels, so little precision is lost. A low-contrast image
+    # can fill fewer bins than there are clusters to find; its exact colors are used instead.
+    pixels = np.asarray(points, dtype=np.uint8).reshape(-1, 3)
+    histogram = ColorHistogram(bits)
+    histogram.add(pixels)
+    colors, counts = histogram.colors()
+    if len(colors) < num_colors:
+        colors, counts = unique_colors(pixels)
+    return colors.astype(np.float64), counts.astype(np.float64)
+
+def _histogram(points, weights, bits, num_colors):
+    # Raw pixels are binned first, so the passes below run over at most 2^(3*bits) colors
+    if weights is not None:
+        return _weighted(points, weights)
+    return _binned(points, bits, num_colors)
+
+def _means(points, weights, labels, count):
+    totals = np.bincount(labels, weights=weights, minlength=count)
+    sums = np.stack([np.bincount(labels, weights=points[:, c] * weights, minlength=count) for c in range(3)], axis=1)
+    # Empty clusters come out as NaN; callers that allow them replace those rows
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / totals[:, None]
+
+def _warm_start(init, k):
+    # Previous centers only seed the run if there are still as many clusters to find
+    if init is None:
+        return None
+    init = np.asarray(init, dtype=np.float64).reshape(-1, 3)
+    return init if len(init) == k else None
+
+def sklearn_kmeans(points, num_colors, weights=None, seed=None, init=None, bits=DEFAULT_HIST_BITS):
+    from sklearn.cluster import KMeans
+
+    if weights is None:
+        # With fewer distinct colors than clusters, those colors are clustered, so no center is repeated
+        colors, counts = _binned(points, bits, num_colors)
+        if len(colors) < num_colors:
+            points, weights = colors, counts
+    k = min(num_colors, len(points))
+    init = _warm_start(init, k)
+    if init is None:
+        kmeans = KMeans(n_clusters=k, random_state=seed)
+    else:
+        kmeans = KMeans(n_clusters=k, init=init, n_init=1, random_state=seed)
+    return kmeans.fit(points, sample_weight=weights).cluster_centers_
+
+def _octree_ids(ints, level):
+    # Morton order: each level appends one bit per channel, so a node's parent is id >> 3
+    ids = np.zeros(len(ints), dtype=np.int64)
+    for bit in range(7, 7 - level, -1):
+        ids = (ids << 3) | (((ints[:, 0] >> bit) & 1) << 2) | (((ints[:, 1] >> bit) & 1) << 1) | ((ints[:, 2] >> bit) & 1)
+    return ids
+
+def octree(points, num_colors, weights=None, bits=DEFAULT_HIST_BITS):
+    points, weights = _histogram(points, weights, bits, num_colors)
+    ints = np.clip(np.rint(points), 0, 255).astype(np.int64)
+
+    # Leaves sit at the shallowest level with more than num_colors nodes
+    for level in range(1, 9):
+        leaves, labels = np.unique(_octree_ids(ints, level), return_inverse=True)
+        if len(leaves) > num_colors:
+            break
+    else:
+        return _means(points, weights, labels, len(leaves))
+
+    # Classic reduction: fold the least populated parents into single leaves until few enough remain
+    leaf_weights = np.bincount(labels, weights=weights, minlength=len(leaves))
+    parents, parent_of_leaf = np.unique(leaves >> 3, return_inverse=True)
+    children = np.bincount(parent_of_leaf, minlength=len(parents))
+    parent_weights = np.bincount(parent_of_leaf, weights=leaf_weights, minlength=len(parents))
+
+    reducible = np.flatnonzero(children > 1)
+    order = reducible[np.lexsort((reducible, parent_weights[reducible]))]
+    before = len(leaves) - np.concatenate([[0], np.cumsum(children[order] - 1)])
+    last = int(np.argmax(before[1:] <= num_colors))
+
+    leaf_labels = np.arange(len(leaves))
+    folded = np.isin(parent_of_leaf, order[:last])
+    leaf_labels[folded] = len(leaves) + parent_of_leaf[folded]
+    # The last parent folds only its lightest children, just enough to reach num_colors
+    kids = np.flatnonzero(parent_of_leaf == order[last])
+    kids = kids[np.lexsort((kids, leaf_weights[kids]))][:before[last] - num_colors + 1]
+    leaf_labels[kids] = len(leaves) + order[last]
+    _, leaf_labels = np.unique(leaf_labels, return_inverse=True)
+    labels = leaf_labels[labels]
+    return _means(points, weights, labels, labels.max() + 1)
+
+def median_cut(points, num_colors, weights=None, bits=DEFAULT_HIST_BITS):
+    points, weights = _histogram(points, weights, bits, num_colors)
+    boxes = [np.arange(len(points))]
+
+    while len(boxes) < num_colors:
+        # Split the box whose widest channel spans the most population-weighted range
+        best, best_score, best_channel = None, 0.0, 0
+        for i, box in enumerate(boxes):
+            if len(box) < 2:
+                continue
+            spans = points[box].max(axis=0) - points[box].min(axis=0)
+            channel = int(np.argmax(spans))
+            score = spans[channel] * weights[box].sum()
+            if score > best_score:
+                best, best_score, best_channel = i, score, channel
+        if best is None:
+            break
+
+        box = boxes.pop(best)
+        box = box[np.argsort(points[box, best_channel], kind='stable')]
+        cumulative = np.cumsum(weights[box])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2.0)) + 1
+        split = min(max(split, 1), len(box) - 1)
+        boxes.extend([box[:split], box[split:]])
+
+    labels = np.empty(len(points), dtype=np.intp)
+    for i, box in enumerate(boxes):
+        labels[box] = i
+    return _means(points, weights, labels, len(boxes))
+
+def _kmeans_plus_plus(points, weights, k, rng):
+    centers = [points[rng.choice(len(points), p=weights / weights.sum())]]
+    closest = np.sum((points - centers[0]) ** 2, axis=1)
+    for _ in range(1, k):
+        scores = weights * closest
+        if scores.sum() <= 0:
+            break
+        centers.append(points[rng.choice(len(points), p=scores / scores.sum())])
+        np.minimum(closest, np.sum((points - centers[-1]) ** 2, axis=1), out=closest)
+    return np.array(centers)
+
+def hist_kmeans(points, num_colors, weights=None, seed=None, bits=DEFAULT_HIST_BITS, max_iter=MAX_ITER, tol=TOLERANCE,
+                init=None):
+    points, weights = _histogram(points, weights, bits, num_colors)
+
+    k = min(num_colors, len(points))
+    centers = _warm_start(init, k)
+    if centers is None:
+        # Unseeded runs are still reproducible
+        rng = np.random.default_rng(0 if seed is None else seed)
+        centers = _kmeans_plus_plus(points, weights, k, rng)
+
+    for _ in range(max_iter):
+        scores = points @ centers.T
+        scores *= -2.0
+        scores += np.einsum('ij,ij->i', centers, centers)[None, :]
+        labels = np.argmin(scores, axis=1)
+
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        updated = _means(points, weights, labels, len(centers))
+        # An emptied cluster keeps its old center
+        updated[totals == 0] = centers[totals == 0]
+        shift = np.sqrt(np.max(np.sum((updated - centers) ** 2, axis=1)))
+        centers = updated
+        if shift <= tol:
+            break
+
+    return centers
+
+def quantize(points, num_colors, method='kmeans', weights=None, seed=None, init=None, bits=DEFAULT_HIST_BITS):
+    # init warm-starts the k-means methods; octree and median-cut have nothing to resume.
+    # Raw pixels are binned at `bits` per channel; weighted points are used as given.
+    if method == 'kmeans':
+        return sklearn_kmeans(points, num_colors, weights, seed, init, bits)
+    if method == 'octree':
+        return octree(points, num_colors, weights, bits)
+    if method == 'median-cut':
+        return median_cut(points, num_colors, weights, bits)
+    if method == 'hist-kmeans':
+        return hist_kmeans(points, num_colors, weights, seed, bits, init=init)
+    raise ValueError(f"Unknown quantizer '{method}'. Expected one of: {', '.join(QUANTIZERS)}")
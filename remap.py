@@ -0,0 +1,158 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+from matcher import index_dtype
+from streaming import iter_strips, pack_rgb, unpack_rgb
+
+# Pixels per task; each task dedupes its colors before matching
+CHUNK_PIXELS = 1 << 18
+
+def palette_rgb(matcher):
+    return np.clip(np.rint(matcher.rgb), 0, 255).astype(np.uint8)
+
+def exact_cells(lut):
+    # A cell with a single candidate lies inside that swatch's RGB Voronoi cell,
+    # so every pixel in it is answered exactly; the others are marked -1
+    if lut.matcher.metric != 'rgb':
+        raise ValueError('Only RGB lookup tables resolve cells exactly')
+    candidates = np.asarray(lut.candidates)
+    cells = np.asarray(lut.table, dtype=np.int32).copy()
+    cells[~np.all(candidates == candidates[..., :1], axis=-1)] = -1
+    return cells.reshape(-1), lut.bits
+
+def remap_pixels(matcher, swatches, pixels, index_out, rgb_out, cells=None):
+    if cells is None:
+        indices = np.empty(len(pixels), dtype=np.intp)
+        rest = slice(None)
+        colors = pixels
+    else:
+        table, bits = cells
+        indices = table[pack_rgb(pixels >> (8 - bits), bits)].astype(np.intp)
+        rest = np.flatnonzero(indices < 0)
+        colors = pixels[rest]
+
+    if len(colors):
+        # Photos repeat colors a lot: match each distinct color of the chunk once
+        packed, inverse = np.unique(pack_rgb(colors), return_inverse=True)
+        found, _ = matcher.match(unpack_rgb(packed))
+        indices[rest] = found[inverse]
+
+    index_out[:] = indices
+    np.take(swatches, indices, axis=0, out=rgb_out)
+    return np.bincount(indices, minlength=len(swatches))
+
+def chunk_ranges(height, width, chunk_pixels=CHUNK_PIXELS):
+    rows = max(1, chunk_pixels // max(width, 1))
+    return [(top, min(top + rows, height)) for top in range(0, height, rows)]
+
+def _decode_into(image_path, pixels):
+    top = 0
+    for strip in iter_strips(image_path):
+        pixels[top:top + len(strip)] = strip
+        top += len(strip)
+
+_worker = {}
+
+def _init_worker(matcher, cells, shape, dtype, names):
+    segments = [shared_memory.SharedMemory(name=name) for name in names]
+    height, width = shape
+    _worker.update(
+        matcher=matcher,
+        cells=cells,
+        swatches=palette_rgb(matcher),
+        segments=segments,
+        pixels=np.ndarray((height, width, 3), dtype=np.uint8, buffer=segments[0].buf),
+        indices=np.ndarray((height, width), dtype=dtype, buffer=segments[1].buf),
+        output=np.ndarray((height, width, 3), dtype=np.uint8, buffer=segments[2].buf),
+    )
+
+def _remap_rows(top, bottom):
+    pixels, indices, output = _worker['pixels'], _worker['indices'], _worker['output']
+    return remap_pixels(_worker['matcher'], _worker['swatches'], pixels[top:bottom].reshape(-1, 3),
+                        indices[top:bottom].reshape(-1), output[top:bottom].reshape(-1, 3), _worker['cells'])
+
+def _release(segment):
+    segment.unlink()
+    try:
+        segment.close()
+    except BufferError:
+        # An array handed out is still referenced; the mapping goes away with it
+        pass
+
+@contextmanager
+def remap_image(image_path, matcher, jobs=None, chunk_pixels=CHUNK_PIXELS, lut=None):
+    from PIL import Image
+
+    # Yields (output, indices, counts); the arrays may live in shared memory, so they
+    # are only valid inside the with block
+    if lut is not None and len(lut.matcher) != len(matcher):
+        raise ValueError('The lookup table was built for a different palette')
+    cells = None if lut is None else exact_cells(lut)
+
+    with Image.open(image_path) as img:
+        width, height = img.size
+    dtype = index_dtype(matcher)
+    ranges = chunk_ranges(height, width, chunk_pixels)
+    jobs = min(jobs or os.cpu_count() or 1, len(ranges))
+
+    if jobs == 1:
+        pixels = np.empty((height, width, 3), dtype=np.uint8)
+        _decode_into(image_path, pixels)
+        indices = np.empty((height, width), dtype=dtype)
+        # The decoded pixels are overwritten chunk by chunk, so no second full-size RGB buffer is needed
+        output = pixels
+        swatches = palette_rgb(matcher)
+        counts = np.zeros(len(matcher), dtype=np.int64)
+        for top, bottom in ranges:
+            counts += remap_pixels(matcher, swatches, pixels[top:bottom].reshape(-1, 3),
+                                   indices[top:bottom].reshape(-1), output[top:bottom].reshape(-1, 3), cells)
+        yield output, indices, counts
+        return
+
+    # Workers read and write shared buffers; only row ranges and counts cross process boundaries.
+    # The results are handed out straight from the segments, never copied.
+    sizes = (height * width * 3, height * width * np.dtype(dtype).itemsize, height * width * 3)
+    segments = [shared_memory.SharedMemory(create=True, size=max(size, 1)) for size in sizes]
+    try:
+        pixels = np.ndarray((height, width, 3), dtype=np.uint8, buffer=segments[0].buf)
+        _decode_into(image_path, pixels)
+
+        counts = np.zeros(len(matcher), dtype=np.int64)
+        initargs = (matcher, cells, (height, width), dtype, [segment.name for segment in segments])
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as pool:
+            for chunk_counts in pool.map(_remap_rows, *zip(*ranges)):
+                counts += chunk_counts
+
+        # The input is no longer needed while the results are being used
+        del pixels
+        _release(segments.pop(0))
+        indices = np.ndarray((height, width), dtype=dtype, buffer=segments[0].buf)
+        output = np.ndarray((height, width, 3), dtype=np.uint8, buffer=segments[1].buf)
+        try:
+            yield output, indices, counts
+        finally:
+            del indices, output
+    finally:
+        for segment in segments:
+            _release(segment)
+
+def coverage(matcher, counts):
+    total = int(counts.sum())
+    return [
+        dict(matcher.records[i], pixels=int(counts[i]), coverage=counts[i] / total)
+        for i in np.argsort(-counts, kind='stable') if counts[i]
+    ]
+
+def save_remap(image_path, matcher, output, indices, counts, output_dir='.'):
+    from PIL import Image
+
+    base = os.path.join(output_dir, f'Remap_{os.path.splitext(os.path.basename(image_path))[0]}')
+    paths = {'image': f'{base}.png', 'index_map': f'{base}_index.npy', 'coverage': f'{base}_coverage.json'}
+    Image.fromarray(output).save(paths['image'])
+    np.save(paths['index_map'], indices)
+    with open(paths['coverage'], 'w') as f:
+        json.dump({'image': image_path, 'pixels': int(counts.sum()), 'swatches': coverage(matcher, counts)}, f, indent=2)
+    return paths
@@ -0,0 +1,136 @@
+import json
+
+GRAM_SIZE = 3
+# Separates fields inside a document so a query can never match across two fields
+FIELD_SEPARATOR = '\n'
+DEBOUNCE_MS = 120
+BASE36 = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+def build_search_index(entries):
+    docs = [FIELD_SEPARATOR.join(str(field).lower() for field in fields) for fields in entries]
+    postings = {}
+
+    for doc_id, doc in enumerate(docs):
+        for field in doc.split(FIELD_SEPARATOR):
+            for i in range(len(field) - GRAM_SIZE + 1):
+                ids = postings.setdefault(field[i:i + GRAM_SIZE], [])
+                if not ids or ids[-1] != doc_id:
+                    ids.append(doc_id)
+
+    # Compact encoding for the page: all grams concatenated into one string, and
+    # per gram its ascending ids as base-36 gaps ("," between ids, " " between grams)
+    grams = sorted(postings)
+    encoded = []
+    for gram in grams:
+        ids = postings[gram]
+        gaps = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+        encoded.append(','.join(_base36(gap) for gap in gaps))
+    return {'docs': docs, 'grams': ''.join(grams), 'postings': ' '.join(encoded)}
+
+def _base36(n):
+    digits = ''
+    while True:
+        n, r = divmod(n, 36)
+        digits = BASE36[r] + digits
+        if n == 0:
+            return digits
+
+def decode_postings(index):
+    grams = index['grams']
+    lists = {}
+    for i, encoded in enumerate(index['postings'].split(' ')):
+        ids, total = [], 0
+        for gap in encoded.split(','):
+            total += int(gap, 36)
+            ids.append(total)
+        lists[grams[i * GRAM_SIZE:(i + 1) * GRAM_SIZE]] = ids
+    return lists
+
+def search(index, query, postings=None):
+    # Mirror of SEARCH_SCRIPT's searchIndex(), used to check the index in Python
+    postings = postings if postings is not None else decode_postings(index)
+    query = query.lower()
+    docs = index['docs']
+    if FIELD_SEPARATOR in query:
+        return []
+    if len(query) < GRAM_SIZE:
+        return [i for i, doc in enumerate(docs) if query in doc]
+
+    lists = []
+    for i in range(len(query) - GRAM_SIZE + 1):
+        ids = postings.get(query[i:i + GRAM_SIZE])
+        if ids is None:
+            return []
+        lists.append(ids)
+
+    lists.sort(key=len)
+    candidates = set(lists[0])
+    for ids in lists[1:]:
+        candidates.intersection_update(ids)
+    return [i for i in sorted(candidates) if query in docs[i]]
+
+def search_index_json(index):
+    return json.dumps(index, separators=(',', ':')).replace('</', '<\\/')
+
+SEARCH_SCRIPT = f'''
+const SEARCH_GRAM = {GRAM_SIZE};
+let searchPostingsMap = null;
+function searchPostings(index, gram) {{
+  if (!searchPostingsMap) {{
+    searchPostingsMap = new Map();
+    index.postings.split(" ").forEach((encoded, i) => {{
+      searchPostingsMap.set(index.grams.slice(i * SEARCH_GRAM, (i + 1) * SEARCH_GRAM), encoded);
+    }});
+  }}
+  let ids = searchPostingsMap.get(gram);
+  if (typeof ids === "string") {{
+    let total = 0;
+    ids = ids.split(",").map(gap => (total += parseInt(gap, 36)));
+    searchPostingsMap.set(gram, ids);
+  }}
+  return ids || null;
+}}
+function searchIndex(index, query) {{
+  query = query.toLowerCase();
+  const docs = index.docs;
+  const result = [];
+  if (query.includes({json.dumps(FIELD_SEPARATOR)})) return result;
+  if (query.length < SEARCH_GRAM) {{
+    for (let i = 0; i < docs.length; i++) if (docs[i].includes(query)) result.push(i);
+    return result;
+  }}
+  const lists = [];
+  for (let i = 0; i + SEARCH_GRAM <= query.length; i++) {{
+    const ids = searchPostings(index, query.slice(i, i + SEARCH_GRAM));
+    if (!ids) return result;
+    lists.push(ids);
+  }}
+  lists.sort((a, b) => a.length - b.length);
+  let candidates = lists[0];
+  for (const ids of lists.slice(1)) {{
+    const keep = new Set(ids);
+    candidates = candidates.filter(id => keep.has(id));
+  }}
+  for (const id of candidates) if (docs[id].includes(query)) result.push(id);
+  return result;
+}}
+function debounce(fn, wait) {{
+  let timer = null;
+  return function(...args) {{
+    clearTimeout(timer);
+    timer = setTimeout(() => fn.apply(this, args), wait);
+  }};
+}}
+function bindSearch(input, index, elements, display) {{
+  // Only elements whose visibility flips are touched
+  let shown = new Uint8Array(elements.length).fill(1);
+  input.addEventListener("input", debounce(function() {{
+    const next = new Uint8Array(elements.length);
+    for (const id of searchIndex(index, this.value)) next[id] = 1;
+    for (let i = 0; i < elements.length; i++) {{
+      if (next[i] !== shown[i]) display(elements[i], next[i] === 1);
+    }}
+    shown = next;
+  }}, {DEBOUNCE_MS}));
+}}
+'''
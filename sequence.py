@@ -0,0 +1,125 @@
+import json
+import os
+import numpy as np
+from profiling import stage
+from quantize import QUANTIZERS, quantize
+from streaming import DEFAULT_HIST_BITS, ColorHistogram
+
+# A frame is clustered again once a channel's distribution has shifted by this share of the 0-255 range
+# since the last clustered frame. Noise and GIF dithering stay well under it; a scene cut is around 0.2.
+DEFAULT_THRESHOLD = 0.01
+
+def iter_frames(paths, max_side=None):
+    from PIL import Image, ImageSequence
+
+    # One frame is decoded at a time, whether it comes from a GIF, a multi-page TIFF or a folder of stills
+    for path in paths:
+        page = 0
+        try:
+            with Image.open(path) as img:
+                for page, frame in enumerate(ImageSequence.Iterator(img)):
+                    duration = frame.info.get('duration')
+                    frame = frame.convert('RGB')
+                    if max_side and max(frame.size) > max_side:
+                        frame.thumbnail((max_side, max_side), Image.BOX)
+                    yield {'source': path, 'page': page, 'duration': duration}, np.asarray(frame)
+        except Exception as e:
+            # An unreadable file, or a damaged frame and the rest of its file, is reported in place of its frames
+            yield {'source': path, 'page': page, 'error': str(e)}, None
+
+def channel_cdfs(histogram):
+    size = 1 << histogram.bits
+    counts = histogram.counts.reshape(size, size, size)
+    marginals = np.stack([counts.sum(axis=(1, 2)), counts.sum(axis=(0, 2)), counts.sum(axis=(0, 1))])
+    return np.cumsum(marginals, axis=1) / max(histogram.counts.sum(), 1)
+
+def histogram_delta(cdfs, reference):
+    # Earth mover's distance per channel, as a share of the range; the channel that moved most decides
+    return float(np.abs(cdfs - reference).mean(axis=1).max())
+
+class SequenceAnalyzer:
+    def __init__(self, matcher, num_colors=9, quantizer='hist-kmeans', threshold=DEFAULT_THRESHOLD,
+                 bits=DEFAULT_HIST_BITS, seed=None):
+        if quantizer not in QUANTIZERS:
+            raise ValueError(f"Unknown quantizer '{quantizer}'. Expected one of: {', '.join(QUANTIZERS)}")
+
+        self.matcher = matcher
+        self.num_colors = num_colors
+        self.quantizer = quantizer
+        self.threshold = threshold
+        self.bits = bits
+        self.seed = seed
+        # Fixed-size state: the whole sequence is summarized by one histogram
+        self.aggregate = ColorHistogram(bits)
+        self.reference = None
+        self.centers = None
+        self.matches = None
+        self.frames = self.analyzed = 0
+
+    def add(self, pixels):
+        frame = self.frames
+        self.frames += 1
+        with stage('histogram') as record:
+            histogram = ColorHistogram(self.bits)
+            histogram.add(pixels)
+            self.aggregate.merge(histogram)
+            record['items'] = len(pixels.reshape(-1, 3))
+
+        # Compared with the last clustered frame, so slow drift still triggers a new palette
+        cdfs = channel_cdfs(histogram)
+        delta = 1.0 if self.reference is None else histogram_delta(cdfs, self.reference)
+        if delta < self.threshold:
+            return {'frame': frame, 'skipped': True, 'delta': delta, 'matches': self.matches}
+
+        colors, weights = histogram.colors()
+        with stage('quantize', items=len(colors), clusters=self.num_colors, quantizer=self.quantizer):
+            self.centers = quantize(colors, self.num_colors, self.quantizer, weights.astype(np.float64), self.seed,
+                                    init=self.centers)
+        with stage('match', items=len(self.centers)):
+            self.matches = self.matcher.closest(np.rint(self.centers).astype(int))
+        self.reference = cdfs
+        self.analyzed += 1
+        return {'frame': frame, 'skipped': False, 'delta': delta, 'matches': self.matches}
+
+    def palette(self):
+        colors, weights = self.aggregate.colors()
+        if not len(colors):
+            return []
+        with stage('quantize', items=len(colors), clusters=self.num_colors, quantizer=self.quantizer):
+            centers = quantize(colors, self.num_colors, self.quantizer, weights.astype(np.float64), self.seed)
+        return self.matcher.closest(np.rint(centers).astype(int))
+
+def process_sequence(name, paths, matcher, output_dir='.', max_side=None, **options):
+    base = os.path.join(output_dir, f'Sequence_{name}')
+    timeline_path, summary_path = f'{base}_timeline.jsonl', f'{base}.json'
+    analyzer = SequenceAnalyzer(matcher, **options)
+    errors = 0
+
+    with stage('sequence', image=name):
+        # Frames are written as they are analyzed, so nothing accumulates per frame
+        with open(timeline_path, 'w') as timeline:
+            for info, pixels in iter_frames(paths, max_side):
+                if pixels is None:
+                    print(f"Error reading {info['source']} (frame {info['page']}): {info['error']}")
+                    errors += 1
+                    timeline.write(json.dumps(info) + '\n')
+                    continue
+                with stage('frame', frame=analyzer.frames):
+                    entry = analyzer.add(pixels)
+                timeline.write(json.dumps({'frame': entry['frame'], **info, **entry}) + '\n')
+        palette = analyzer.palette()
+
+    summary = {
+        'sequence': name,
+        'frames': analyzer.frames,
+        'analyzed': analyzer.analyzed,
+        'skipped': analyzer.frames - analyzer.analyzed,
+        'errors': errors,
+        'threshold': analyzer.threshold,
+        'timeline': timeline_path,
+        'palette': palette,
+    }
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"{name}: {analyzer.frames} frames, {analyzer.analyzed} clustered. Results saved to {summary_path}")
+    return summary
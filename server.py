@@ -0,0 +1,255 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+from match_cache import DEFAULT_MAX_SIZE, MatchCache
+from matcher import METRICS, PantoneMatcher
+from palette import PANTONE_FILE_PATH, hex_to_rgb, load_palette_table
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_CONCURRENT = 64
+QUEUE_TIMEOUT = 5.0
+MAX_BODY = 32 << 20
+# Batches up to this size are matched on the event loop; larger ones go to the pool.
+# Sized per metric so an inline batch costs about 2 ms against the shipped palette.
+INLINE_MATCH_LIMITS = {'rgb': 256, 'de76': 256, 'de94': 32, 'de2000': 1}
+# Query/JSON option -> extract_colors keyword
+EXTRACT_OPTIONS = {
+    'colors': ('num_colors', int), 'max_side': ('max_side', int), 'sample': ('sample', str),
+    'max_pixels': ('max_pixels', int), 'unique': ('unique', bool), 'seed': ('seed', int),
+    'tile_rows': ('tile_rows', int), 'hist_bits': ('hist_bits', int), 'quantizer': ('quantizer', str),
+}
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def parse_color(value):
+    try:
+        if isinstance(value, str):
+            return hex_to_rgb(value)
+        rgb = tuple(int(c) for c in value)
+        if len(rgb) != 3 or not all(0 <= c <= 255 for c in rgb):
+            raise ValueError
+        return rgb
+    except (TypeError, ValueError):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f'Invalid color {value!r}: expected "#rrggbb" or [r, g, b]')
+
+def parse_extract_options(options):
+    extract_options = {}
+    for key, value in options.items():
+        if key not in EXTRACT_OPTIONS:
+            continue
+        name, kind = EXTRACT_OPTIONS[key]
+        try:
+            if kind is bool:
+                extract_options[name] = value if isinstance(value, bool) else value.lower() in ('1', 'true', 'yes')
+            else:
+                extract_options[name] = kind(value)
+        except (TypeError, ValueError):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f'Invalid value for {key}: {value!r}')
+    return extract_options
+
+_worker_matcher = None
+
+def _init_worker(matcher):
+    global _worker_matcher
+    _worker_matcher = matcher
+
+def _match_task(colors):
+    return match_colors(_worker_matcher, colors)
+
+def _extract_task(source, extract_options):
+    from picker import extract_colors
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    colors = extract_colors(source, **extract_options)
+    return match_colors(_worker_matcher, colors)
+
+def match_colors(matcher, colors):
+    indices, distances = matcher.match(colors)
+    return [dict(matcher.records[i], distance=round(float(d), 4)) for i, d in zip(indices, distances)]
+
+class MatchService:
+    def __init__(self, matcher, jobs=None, max_concurrent=MAX_CONCURRENT, queue_timeout=QUEUE_TIMEOUT, cache_size=DEFAULT_MAX_SIZE):
+        self.matcher = matcher
+        # Inline matches go through the cache; the pool keeps the plain matcher
+        self.cache = MatchCache(matcher, cache_size) if cache_size else None
+        self.inline = self.cache if self.cache is not None else matcher
+        self.inline_limit = INLINE_MATCH_LIMITS.get(matcher.metric, 1)
+        self.jobs = jobs
+        self.queue_timeout = queue_timeout
+        self.slots = asyncio.Semaphore(max_concurrent)
+        self.pool = None
+        self.stats = {'requests': 0, 'rejected': 0, 'errors': 0}
+
+    def start_pool(self):
+        # Workers get the resident matcher once, at startup
+        self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker, initargs=(self.matcher,))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def offload(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def route(self, method, path, query, headers, body):
+        if path == '/health' and method == 'GET':
+            return HTTPStatus.OK, {'status': 'ok', 'swatches': len(self.matcher), 'metric': self.matcher.metric,
+                                   'stats': self.stats, 'cache': self.cache.stats() if self.cache is not None else None}
+
+        if path == '/match' and method == 'GET':
+            color = query.get('hex') or query.get('rgb', '').split(',')
+            return HTTPStatus.OK, {'match': match_colors(self.inline, [parse_color(color)])[0]}
+
+        if path == '/match' and method == 'POST':
+            payload = self.json_body(body)
+            if 'color' in payload:
+                return HTTPStatus.OK, {'match': match_colors(self.inline, [parse_color(payload['color'])])[0]}
+            if not isinstance(payload.get('colors'), list):
+                raise RequestError(HTTPStatus.BAD_REQUEST, 'Expected "color" or a "colors" list')
+            colors = [parse_color(color) for color in payload['colors']]
+            if len(colors) <= self.inline_limit:
+                return HTTPStatus.OK, {'matches': match_colors(self.inline, colors)}
+            return HTTPStatus.OK, {'matches': await self.offload(_match_task, colors)}
+
+        if path == '/extract' and method == 'POST':
+            if headers.get('content-type', '').startswith('application/json'):
+                payload = self.json_body(body)
+                source = payload.get('path')
+                if not isinstance(source, str) or not os.path.isfile(source):
+                    raise RequestError(HTTPStatus.BAD_REQUEST, 'Expected "path" of an existing image file')
+                extract_options = parse_extract_options(payload)
+            else:
+                # Raw image bytes in the body, options in the query string
+                if not body:
+                    raise RequestError(HTTPStatus.BAD_REQUEST, 'Empty image body')
+                source = body
+                extract_options = parse_extract_options(query)
+            try:
+                return HTTPStatus.OK, {'matches': await self.offload(_extract_task, source, extract_options)}
+            except OSError as e:
+                # Includes PIL's UnidentifiedImageError: the upload or file is not an image PIL can read
+                raise RequestError(HTTPStatus.BAD_REQUEST, f'Could not read image: {e}')
+
+        if path in ('/health', '/match', '/extract'):
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f'{method} not allowed on {path}')
+        raise RequestError(HTTPStatus.NOT_FOUND, f'No such endpoint: {path}')
+
+    def json_body(self, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, 'Body is not valid JSON')
+        if not isinstance(payload, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, 'Expected a JSON object')
+        return payload
+
+    async def respond(self, method, target, headers, body):
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        try:
+            await asyncio.wait_for(self.slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats['rejected'] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'Too many concurrent requests'}
+
+        self.stats['requests'] += 1
+        try:
+            return await self.route(method, url.path, query, headers, body)
+        except RequestError as e:
+            return e.status, {'error': str(e)}
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except Exception as e:
+            self.stats['errors'] += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f'{type(e).__name__}: {e}'}
+        finally:
+            self.slots.release()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.send(writer, HTTPStatus.BAD_REQUEST, {'error': 'Malformed request line'}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                length = int(headers.get('content-length', 0) or 0)
+                if length > MAX_BODY:
+                    await self.send(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {'error': 'Body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.respond(method.upper(), target, headers, body)
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode('latin-1') + body
+        )
+        await writer.drain()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, metric='rgb', jobs=None, max_concurrent=MAX_CONCURRENT,
+                palette_path=PANTONE_FILE_PATH, cache_size=DEFAULT_MAX_SIZE):
+    matcher = PantoneMatcher(load_palette_table(palette_path), metric=metric)
+    service = MatchService(matcher, jobs, max_concurrent, cache_size=cache_size)
+    service.start_pool()
+    server = await asyncio.start_server(service.handle, host, port)
+    address = server.sockets[0].getsockname()
+    print(f'Serving {len(matcher)} swatches ({metric}) on http://{address[0]}:{address[1]}', flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Pantone matching service with the palette kept in memory.')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--metric', choices=METRICS, default='rgb')
+    parser.add_argument('--palette', default=PANTONE_FILE_PATH)
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--max-concurrent', type=int, default=MAX_CONCURRENT, help='Requests handled at once')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_SIZE, help='Match cache entries (0 disables)')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.metric, args.jobs, args.max_concurrent, args.palette, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
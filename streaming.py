@@ -0,0 +1,242 @@
+import struct
+import zlib
+from contextlib import nullcontext
+import numpy as np
+
+DEFAULT_TILE_ROWS = 256
+DEFAULT_HIST_BITS = 5
+
+def pack_rgb(cells, bits=8):
+    # One integer per color, `bits` bits per channel; cells must already fit in that many bits
+    cells = np.asarray(cells).reshape(-1, 3)
+    dtype = np.promote_types(cells.dtype, np.uint32)
+    return (cells[:, 0].astype(dtype) << (2 * bits)) | (cells[:, 1].astype(dtype) << bits) | cells[:, 2]
+
+def unpack_rgb(packed, bits=8):
+    mask = (1 << bits) - 1
+    return np.stack([(packed >> (2 * bits)) & mask, (packed >> bits) & mask, packed & mask], axis=1)
+
+class ColorHistogram:
+    def __init__(self, bits=DEFAULT_HIST_BITS):
+        self.bits = bits
+        self.shift = 8 - bits
+        bins = 1 << (3 * bits)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        # Per-bin channel sums, so each bin is represented by the mean of its pixels
+        self.sums = np.zeros((bins, 3), dtype=np.int64)
+
+    def add(self, pixels):
+        pixels = np.asarray(pixels, dtype=np.uint8).reshape(-1, 3)
+        bins = pack_rgb(pixels >> self.shift, self.bits)
+        minlength = len(self.counts)
+
+        self.counts += np.bincount(bins, minlength=minlength)
+        for channel in range(3):
+            self.sums[:, channel] += np.bincount(bins, weights=pixels[:, channel], minlength=minlength).astype(np.int64)
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.sums += other.sums
+
+    def colors(self):
+        occupied = np.flatnonzero(self.counts)
+        counts = self.counts[occupied]
+        return self.sums[occupied] / counts[:, None], counts
+
+def _open_binary(image_path):
+    # File objects, such as an upload held in a BytesIO, are read in place and left open
+    return nullcontext(image_path) if hasattr(image_path, 'read') else open(image_path, 'rb')
+
+def _raw_strip_reader(img, image_path, tile_rows):
+    from PIL import Image
+
+    # Only uncompressed ('raw') layouts can be sliced without decoding the rest.
+    # Strips must span the full width; raw tiled TIFFs go through _tiff_strip_reader.
+    if not img.tile or any(tile[0] != 'raw' or tile[1][0] != 0 or tile[1][2] != img.width for tile in img.tile):
+        return None
+
+    width, height = img.size
+    reads = []
+    for tile in img.tile:
+        x0, y0, x1, y1 = tile[1]
+        args = (tile[3],) if isinstance(tile[3], str) else tuple(tile[3])
+        rawmode = args[0]
+        stride = args[1] if len(args) > 1 else 0
+        orientation = args[2] if len(args) > 2 else 1
+
+        if stride == 0:
+            if rawmode != img.mode:
+                return None
+            stride = len(Image.new(img.mode, (x1 - x0, 1)).tobytes())
+
+        tile_height = y1 - y0
+        for row in range(0, tile_height, tile_rows):
+            rows = min(tile_rows, tile_height - row)
+            first = row if orientation > 0 else tile_height - row - rows
+            reads.append((tile[2] + first * stride, (x1 - x0, rows), rawmode, stride, orientation))
+
+    palette = img.getpalette() if img.mode == 'P' else None
+    mode = img.mode
+
+    def strips():
+        with _open_binary(image_path) as f:
+            for offset, size, rawmode, stride, orientation in reads:
+                f.seek(offset)
+                data = f.read(size[1] * stride)
+                strip = Image.frombytes(mode, size, data, 'raw', rawmode, stride, orientation)
+                if palette:
+                    strip.putpalette(palette)
+                yield np.asarray(strip.convert('RGB'))
+
+    return strips()
+
+# Tags a single band of a TIFF needs; the strip or tile layout is rewritten per band
+TIFF_BAND_TAGS = (256, 258, 259, 262, 266, 277, 278, 284, 317, 320, 322, 323, 338, 339, 347, 529, 530, 532)
+
+def _tiff_strip_reader(img, image_path, tile_rows):
+    from io import BytesIO
+    from PIL import Image, TiffImagePlugin, TiffTags
+
+    if img.format != 'TIFF' or img.tag_v2.get(284, 1) != 1:
+        return None
+    tags = img.tag_v2
+    width, height = img.size
+    if 322 in tags:
+        block_rows, across, offsets_tag, counts_tag = tags[323], -(-width // tags[322]), 324, 325
+    else:
+        block_rows, across, offsets_tag, counts_tag = tags.get(278, height), 1, 273, 279
+    offsets, counts = list(tags.get(offsets_tag, ())), list(tags.get(counts_tag, ()))
+    if not offsets or len(offsets) != len(counts) or len(offsets) < across * -(-height // block_rows):
+        return None
+
+    # Each band is whole strips (or rows of tiles), re-wrapped as a small TIFF of its own,
+    # so libtiff only ever decodes that band
+    band_rows = max(1, tile_rows // block_rows) * block_rows
+    template = [(tag, tags[tag], tags.tagtype[tag]) for tag in TIFF_BAND_TAGS if tag in tags]
+    endian = '<' if tags.prefix == b'II' else '>'
+    palette = img.getpalette() if img.mode == 'P' else None
+
+    def strips():
+        with _open_binary(image_path) as f:
+            for top in range(0, height, band_rows):
+                rows = min(band_rows, height - top)
+                first, last = top // block_rows * across, -(-(top + rows) // block_rows) * across
+                blocks = []
+                for offset, count in zip(offsets[first:last], counts[first:last]):
+                    f.seek(offset)
+                    blocks.append(f.read(count))
+
+                ifd = TiffImagePlugin.ImageFileDirectory_v2(prefix=tags.prefix)
+                for tag, value, tag_type in template:
+                    ifd[tag] = value
+                    ifd.tagtype[tag] = tag_type
+                ifd[257] = rows
+                ifd[counts_tag] = [len(block) for block in blocks]
+                ifd.tagtype[counts_tag] = ifd.tagtype[offsets_tag] = TiffTags.LONG
+                # Laid out as header, directory, blocks. Pillow moves StripOffsets past the
+                # directory by itself; TileOffsets are written as given.
+                starts = np.concatenate([[0], np.cumsum(ifd[counts_tag])[:-1]]).tolist()
+                ifd[offsets_tag] = starts
+                if offsets_tag == 324:
+                    data_start = 8 + len(ifd.tobytes(8))
+                    ifd[offsets_tag] = [data_start + start for start in starts]
+                header = tags.prefix + struct.pack(endian + 'HI', 42, 8)
+
+                with Image.open(BytesIO(b''.join([header, ifd.tobytes(8)] + blocks))) as band:
+                    if palette and band.mode == 'P':
+                        band.putpalette(palette)
+                    yield np.asarray(band.convert('RGB'))
+
+    return strips()
+
+PNG_CHANNELS = {'L': 1, 'LA': 2, 'P': 1, 'RGB': 3, 'RGBA': 4}
+
+def _png_idat(image_path, block_size=1 << 16):
+    with _open_binary(image_path) as f:
+        f.seek(8)
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                return
+            length, kind = struct.unpack('>I4s', head)
+            if kind == b'IEND':
+                return
+            if kind != b'IDAT':
+                f.seek(length + 4, 1)
+                continue
+            while length:
+                block = f.read(min(length, block_size))
+                if not block:
+                    return
+                length -= len(block)
+                yield block
+            f.seek(4, 1)
+
+def _png_strip_reader(img, image_path, tile_rows):
+    from PIL import Image
+
+    # 8-bit, non-interlaced PNGs only: their rows can be unfiltered band by band
+    if img.format != 'PNG' or img.info.get('interlace') or len(img.tile) != 1 or img.tile[0][0] != 'zip':
+        return None
+    rawmode = img.tile[0][3]
+    if rawmode != img.mode or rawmode not in PNG_CHANNELS:
+        return None
+
+    width, height = img.size
+    mode = img.mode
+    row_bytes = width * PNG_CHANNELS[mode]
+    palette = img.getpalette() if mode == 'P' else None
+
+    def strips():
+        inflater = zlib.decompressobj()
+        blocks = _png_idat(image_path)
+        # PNG filters refer to the row above; the first row sees zeros
+        previous = bytes(row_bytes)
+        for top in range(0, height, tile_rows):
+            rows = min(tile_rows, height - top)
+            need = rows * (row_bytes + 1)
+            parts, size = [], 0
+            while size < need:
+                source = inflater.unconsumed_tail or next(blocks, None)
+                if source is None:
+                    raise OSError(f'Truncated PNG image data in {image_path}')
+                part = inflater.decompress(source, need - size)
+                parts.append(part)
+                size += len(part)
+
+            # The row above goes first, unfiltered, so PIL's decoder can undo this band's filters
+            stream = zlib.compress(b''.join([b'\x00', previous] + parts), 0)
+            band = Image.frombytes(mode, (width, rows + 1), stream, 'zip', rawmode)
+            previous = band.crop((0, rows, width, rows + 1)).tobytes()
+            band = band.crop((0, 1, width, rows + 1))
+            if palette:
+                band.putpalette(palette)
+            yield np.asarray(band.convert('RGB'))
+
+    return strips()
+
+def iter_strips(image_path, tile_rows=DEFAULT_TILE_ROWS):
+    from PIL import Image
+
+    # Full-width strips, top to bottom
+    with Image.open(image_path) as img:
+        for reader in (_raw_strip_reader, _tiff_strip_reader, _png_strip_reader):
+            strips = reader(img, image_path, tile_rows)
+            if strips is not None:
+                yield from strips
+                return
+
+        # Other formats are decoded by PIL in one go; JPEG at least decodes straight to RGB,
+        # and the RGB/NumPy copies are never more than one strip
+        if img.format == 'JPEG':
+            img.draft('RGB', img.size)
+        width, height = img.size
+        for top in range(0, height, tile_rows):
+            strip = img.crop((0, top, width, min(top + tile_rows, height)))
+            yield np.asarray(strip.convert('RGB'))
+
+def image_histogram(image_path, tile_rows=DEFAULT_TILE_ROWS, bits=DEFAULT_HIST_BITS):
+    histogram = ColorHistogram(bits)
+    for strip in iter_strips(image_path, tile_rows):
+        histogram.add(strip)
+    return histogram
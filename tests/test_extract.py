@@ -0,0 +1,23 @@
+from extract_html import iter_swatches, swatches_to_palette
+from palette import rgb_to_cmyk
+from pantoner2 import generate_html
+
+HTML_PATH = './pantone-colors.html'
+
+def test_dump_feeds_the_viewers():
+    records = list(iter_swatches(HTML_PATH))
+    # Tags split across read chunks are still parsed once
+    assert list(iter_swatches(HTML_PATH, chunk_size=1000)) == records
+    palette = swatches_to_palette(records)
+    assert len(palette) == len({name for name, _ in records}) > 0
+
+    name, hex_code = records[0]
+    color = palette[name]
+    assert color['hex'] == hex_code.lstrip('#').lower()
+    assert color['cmyk'] == rgb_to_cmyk(tuple(int(color['hex'][i:i + 2], 16) for i in (0, 2, 4)))
+
+def test_pantoner2_bare_file_name(tmp_path, monkeypatch):
+    palette = swatches_to_palette(iter_swatches(HTML_PATH))
+    monkeypatch.chdir(tmp_path)
+    generate_html(palette, 'chart.html')
+    assert (tmp_path / 'chart.html').read_text().count('class="color-box"') == len(palette)
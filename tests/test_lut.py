@@ -0,0 +1,67 @@
+import json
+import numpy as np
+from lut import PantoneLUT, build_tables
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, Palette
+
+def test_refined_lookup_matches_matcher(tmp_path):
+    lut = PantoneLUT.load(bits=4, cache_dir=str(tmp_path))
+    matcher = PantoneMatcher(Palette.load(PANTONE_FILE_PATH))
+    colors = np.random.default_rng(0).integers(0, 256, (200000, 3))
+
+    expected, _ = matcher.match(colors)
+    assert np.array_equal(lut.lookup(colors, refine=True), expected)
+
+def test_cells_with_one_candidate_are_exact():
+    matcher = PantoneMatcher(Palette.load(PANTONE_FILE_PATH))
+    table, candidates = build_tables(matcher, bits=4)
+    settled = np.all(candidates == candidates[..., :1], axis=-1)
+
+    colors = np.random.default_rng(1).integers(0, 256, (100000, 3))
+    cells = colors >> 4
+    inside = settled[cells[:, 0], cells[:, 1], cells[:, 2]]
+    expected, _ = matcher.match(colors[inside])
+    assert np.array_equal(table[cells[inside, 0], cells[inside, 1], cells[inside, 2]], expected)
+
+def test_large_palettes_get_wide_indices():
+    rng = np.random.default_rng(2)
+    palette = {f'{i:06d}': {'name': f'synthetic-{i}', 'hex': ''.join(f'{c:02x}' for c in rgb), 'cmyk': [0, 0, 0, 0]}
+               for i, rgb in enumerate(rng.integers(0, 256, (70000, 3)).tolist())}
+    matcher = PantoneMatcher(Palette.from_dict(palette))
+    table, candidates = build_tables(matcher, bits=2)
+    assert table.dtype == np.uint32 and candidates.dtype == np.uint32
+
+    colors = rng.integers(0, 256, (2000, 3))
+    cells = colors >> 6
+    found, _ = matcher.match_candidates(colors, candidates[cells[:, 0], cells[:, 1], cells[:, 2]])
+    expected, _ = matcher.match(colors)
+    assert np.array_equal(found, expected)
+
+def test_tables_of_other_palettes_survive(tmp_path):
+    paths = []
+    for i, hex_code in enumerate(('0f4c81', 'ff0000')):
+        path = tmp_path / f'palette-{i}.json'
+        path.write_text(json.dumps({'19-4052': {'name': 'a', 'hex': hex_code}, '11-0601': {'name': 'b', 'hex': 'f4f5f0'}}))
+        paths.append(str(path))
+    cache_dir = tmp_path / 'cache'
+    for path in paths:
+        PantoneLUT.load(path, bits=2, cache_dir=str(cache_dir))
+    assert len(list(cache_dir.glob('lut-*.npy'))) == 4
+    assert len(list(cache_dir.glob('palette-*.npy'))) == 2
+
+    PantoneLUT.load(paths[0], bits=2, cache_dir=str(cache_dir), rebuild=True)
+    assert len(list(cache_dir.glob('lut-*.npy'))) == 4
+
+def test_perceptual_refined_lookup_matches_matcher(tmp_path):
+    lut = PantoneLUT.load(bits=3, metric='de2000', cache_dir=str(tmp_path))
+    colors = np.random.default_rng(3).integers(0, 256, (3000, 3))
+    expected, _ = lut.matcher.match(colors)
+    assert np.array_equal(lut.lookup(colors, refine=True), expected)
+
+def test_tables_without_a_source_key_are_swept(tmp_path):
+    legacy = [tmp_path / 'lut-rgb-2-v2-0123456789abcdef-table.npy', tmp_path / 'lut-rgb-2-0123456789abcdef-table.npy']
+    for path in legacy:
+        np.save(path, np.zeros(1))
+    PantoneLUT.load(bits=2, cache_dir=str(tmp_path))
+    assert not any(path.exists() for path in legacy)
+    assert len(list(tmp_path.glob('lut-*.npy'))) == 2
@@ -0,0 +1,48 @@
+import numpy as np
+from match_cache import MatchCache
+from matcher import PantoneMatcher
+from palette import load_palette_table
+
+def test_repeats_in_a_batch_are_matched_once():
+    matcher = PantoneMatcher(load_palette_table())
+    calls = []
+    original = matcher.match
+    matcher.match = lambda colors: calls.append(len(colors)) or original(colors)
+    cache = MatchCache(matcher)
+
+    colors = [[10, 20, 30], [200, 0, 0], [10, 20, 30], [10, 20, 30], [0, 0, 0]]
+    indices, distances = cache.match(colors)
+    expected, expected_distances = original(colors)
+    assert np.array_equal(indices, expected) and np.allclose(distances, expected_distances)
+    assert calls == [3]
+    assert (cache.misses, cache.hits) == (3, 2)
+
+    cache.match([[0, 0, 0], [1, 1, 1], [1, 1, 1]])
+    assert calls == [3, 1]
+    assert (cache.misses, cache.hits) == (4, 4)
+
+def test_empty_batch():
+    cache = MatchCache(PantoneMatcher(load_palette_table()))
+    indices, distances = cache.match(np.empty((0, 3)))
+    assert indices.shape == distances.shape == (0,)
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+def test_pool_workers_matches_are_saved(tmp_path, monkeypatch):
+    from PIL import Image
+    import picker
+
+    rng = np.random.default_rng(0)
+    inputs = []
+    for i in range(3):
+        inputs.append(str(tmp_path / f'image-{i}.png'))
+        Image.fromarray(rng.integers(0, 256, (16, 16, 3), dtype=np.uint8)).save(inputs[-1])
+
+    saved, load = {}, MatchCache.load
+    for jobs in (1, 2):
+        path = str(tmp_path / f'cache-{jobs}.npz')
+        monkeypatch.setattr(picker.MatchCache, 'load', classmethod(lambda cls, matcher: load(matcher, path=path)))
+        picker.process_batch(inputs, str(tmp_path / f'out-{jobs}'), jobs=jobs, match_cache=True, seed=0)
+        cache = load(PantoneMatcher(load_palette_table()), path=path)
+        saved[jobs] = dict(cache.entries)
+    assert len(saved[1]) > 0
+    assert saved[2] == saved[1]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from matcher import PaletteIndex, PantoneMatcher
+from palette import PANTONE_FILE_PATH, load_pantone_colors
+
+@pytest.fixture(scope='module')
+def colors():
+    return load_pantone_colors(PANTONE_FILE_PATH)
+
+def loop_closest(rgb, pantone_colors):
+    # The original per-swatch scan: the first swatch at the smallest distance wins
+    closest_code, min_distance = None, float('inf')
+    for code, pantone in pantone_colors.items():
+        swatch = tuple(int(pantone['hex'][i:i + 2], 16) for i in (0, 2, 4))
+        distance = np.sqrt(np.sum((np.array(rgb) - np.array(swatch)) ** 2))
+        if distance < min_distance:
+            closest_code, min_distance = code, distance
+    return closest_code
+
+def queries(matcher, count, seed):
+    rng = np.random.default_rng(seed)
+    swatches = matcher.rgb.astype(int)
+    # Random colors, every swatch itself (duplicate hex codes tie exactly), and midpoints between
+    # swatch pairs whose coordinates sum to even numbers, which are equally far from both
+    pairs = swatches[rng.integers(0, len(swatches), (count * 4, 2))]
+    pairs = pairs[((pairs[:, 0] + pairs[:, 1]) % 2 == 0).all(axis=1)][:count]
+    return np.concatenate([rng.integers(0, 256, (count, 3)), swatches, (pairs[:, 0] + pairs[:, 1]) // 2])
+
+def test_knn_matches_the_original_loop(colors):
+    matcher = PantoneMatcher(colors)
+    index = PaletteIndex(matcher)
+    rgb = queries(matcher, 300, seed=0)
+    hexes = [color['hex'].lower() for color in colors.values()]
+    assert len(set(hexes)) < len(hexes)
+
+    indices, distances = index.knn(rgb, 1)
+    assert np.array_equal(indices[:, 0], np.argmin(matcher.distances(rgb), axis=1))
+    assert np.allclose(distances[:, 0], matcher.match(rgb)[1])
+    # The loop is slow, so it checks a sample of each kind of query
+    sample = np.concatenate([np.arange(100), np.arange(300, len(rgb), 13)])
+    assert [matcher.codes[i] for i in indices[sample, 0]] == [loop_closest(rgb[i], colors) for i in sample]
+
+def test_knn_orders_ties_by_palette_position():
+    colors = {code: {'name': code, 'hex': hex_code} for code, hex_code in
+              [('a', '101010'), ('b', '303030'), ('c', '101010'), ('d', '303030'), ('e', '101010')]}
+    index = PaletteIndex(PantoneMatcher(colors))
+    # (32, 32, 32) is equally far from all five, so the tie runs past the third slot
+    indices, distances = index.knn([[16, 16, 16], [32, 32, 32]], 3)
+    assert indices.tolist() == [[0, 2, 4], [0, 1, 2]]
+    assert np.allclose(distances[0], 0)
+
+def test_within_matches_brute_force(colors):
+    matcher = PantoneMatcher(colors)
+    index = PaletteIndex(matcher)
+    rgb = queries(matcher, 100, seed=1)
+    all_distances = matcher.distances(rgb)
+    for radius in (0.0, 5.0, 20.0):
+        found, found_distances = index.within(rgb, radius)
+        for row, ind, dist in zip(all_distances, found, found_distances):
+            expected = np.flatnonzero(row <= radius + 1e-9)
+            expected = expected[np.lexsort((expected, row[expected]))]
+            assert np.array_equal(ind, expected)
+            assert np.allclose(dist, row[expected])
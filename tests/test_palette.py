@@ -0,0 +1,49 @@
+import json
+import os
+from palette import load_palette_table
+
+def write_palette(path, hex_code):
+    with open(path, 'w') as f:
+        json.dump({'19-4052': {'name': 'classic-blue', 'hex': hex_code, 'cmyk': [100, 70, 0, 50]}}, f)
+
+def test_caches_of_other_palettes_survive(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    first, second = str(tmp_path / 'first.json'), str(tmp_path / 'second.json')
+    write_palette(first, '0f4c81')
+    write_palette(second, 'ff0000')
+    load_palette_table(first, cache_dir)
+    load_palette_table(second, cache_dir)
+    assert len(os.listdir(cache_dir)) == 2
+
+    # Editing one palette replaces its own cache and leaves the other alone
+    write_palette(first, '0f4c82')
+    assert load_palette_table(first, cache_dir)['hex'].tolist() == [b'0f4c82']
+    assert len(os.listdir(cache_dir)) == 2
+    assert load_palette_table(second, cache_dir)['hex'].tolist() == [b'ff0000']
+
+def test_old_module_loaders_still_work(tmp_path):
+    import list as list_viewer
+    import picker
+
+    path = str(tmp_path / 'palette.json')
+    write_palette(path, '0f4c81')
+    for module in (picker, list_viewer):
+        colors = module.load_pantone_colors(path)
+        assert colors['19-4052']['hex'] == '0f4c81' and colors['19-4052']['name'] == 'classic-blue'
+
+def test_hex_codes_are_parsed_alike(tmp_path):
+    import pytest
+    from palette import Palette, hex_to_rgb, normalize_hex
+
+    path = str(tmp_path / 'palette.json')
+    write_palette(path, '#FF6F61')
+    table = load_palette_table(path, str(tmp_path / 'cache'))
+    palette = Palette.load(path, str(tmp_path / 'cache'))
+    assert table['hex'][0] == b'ff6f61' and table['rgb'][0].tolist() == [255, 111, 97]
+    assert str(palette.hex[0]) == 'ff6f61' and palette.rgb[0].tolist() == [255, 111, 97]
+
+    assert normalize_hex(' #F66') == 'ff6666'
+    assert hex_to_rgb('0f4c81') == (15, 76, 129)
+    for value in ('', '#12345', 'ff6f6g', '#ff6f610'):
+        with pytest.raises(ValueError):
+            hex_to_rgb(value)
@@ -0,0 +1,11 @@
+import profiling
+from profiling import stage
+
+def test_disabled_stages_keep_nothing(monkeypatch):
+    monkeypatch.setattr(profiling, '_profiler', None)
+    with stage('extract') as record:
+        record['items'] = 1000
+        record.update(image='a.png')
+    with stage('match') as record:
+        assert record == {}
+        assert record.get('items') is None
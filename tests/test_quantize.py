@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from PIL import Image
+import picker
+from quantize import QUANTIZERS, quantize
+
+def pixels(colors, size=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.asarray(colors, dtype=np.uint8)[rng.integers(0, len(colors), size)]
+
+LOW_CONTRAST = [(r, g, b) for r in range(4) for g in range(4) for b in range(4)]
+FEW = [(0, 0, 0), (255, 255, 255), (200, 30, 40), (20, 60, 188), (90, 90, 10)]
+SPREAD = np.random.default_rng(1).integers(0, 256, (500, 3))
+
+@pytest.mark.parametrize('quantizer', QUANTIZERS)
+@pytest.mark.parametrize('colors, num_colors', [(LOW_CONTRAST, 9), (FEW, 9), (FEW, 5), (SPREAD, 9), (SPREAD, 1)])
+def test_center_count(quantizer, colors, num_colors):
+    # Low-contrast pixels fall into one 5-bit bin, yet still give as many centers as k-means finds
+    centers = quantize(pixels(colors), num_colors, quantizer, seed=0)
+    expected = min(num_colors, len(np.unique(np.asarray(colors), axis=0)))
+    assert len(centers) == expected
+    assert len(np.unique(np.rint(centers), axis=0)) == expected
+
+@pytest.mark.parametrize('quantizer', QUANTIZERS)
+def test_hist_bits_reach_the_quantizer(quantizer, tmp_path, monkeypatch):
+    path = str(tmp_path / 'image.png')
+    Image.fromarray(pixels(SPREAD).reshape(40, 100, 3)).save(path)
+    seen = []
+    original = picker.quantize
+    monkeypatch.setattr(picker, 'quantize', lambda *args, **kwargs: seen.append(kwargs.get('bits')) or original(*args, **kwargs))
+    picker.extract_colors(path, 4, hist_bits=3, quantizer=quantizer, seed=0)
+    assert seen == [3]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from PIL import Image
+from lut import PantoneLUT
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, load_palette_table
+from remap import palette_rgb, remap_image
+
+@pytest.fixture(scope='module')
+def matcher():
+    return PantoneMatcher(load_palette_table(PANTONE_FILE_PATH))
+
+@pytest.fixture(scope='module')
+def image_path(tmp_path_factory):
+    # Random colors plus flat areas, so chunks see both distinct and repeated colors
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (53, 67, 3), dtype=np.uint8)
+    pixels[10:30, 5:40] = (12, 140, 200)
+    pixels[40:] = rng.integers(0, 256, (1, 67, 3), dtype=np.uint8)
+    path = str(tmp_path_factory.mktemp('remap') / 'image.png')
+    Image.fromarray(pixels).save(path)
+    return path
+
+@pytest.mark.parametrize('jobs', [1, 2])
+@pytest.mark.parametrize('use_lut', [False, True])
+def test_remap_matches_the_matcher(matcher, image_path, tmp_path, jobs, use_lut):
+    lut = PantoneLUT.load(bits=4, cache_dir=str(tmp_path)) if use_lut else None
+    pixels = np.asarray(Image.open(image_path).convert('RGB'))
+    expected, _ = matcher.match(pixels.reshape(-1, 3))
+    expected = expected.reshape(pixels.shape[:2])
+
+    # 1000 pixels per task gives several tasks, so jobs=2 really runs a pool
+    with remap_image(image_path, matcher, jobs=jobs, chunk_pixels=1000, lut=lut) as (output, indices, counts):
+        assert np.array_equal(indices, expected)
+        assert np.array_equal(output, palette_rgb(matcher)[expected])
+        assert np.array_equal(counts, np.bincount(expected.reshape(-1), minlength=len(matcher)))
@@ -0,0 +1,86 @@
+import json
+import random
+import shutil
+import subprocess
+import pytest
+from creator import card_search_index
+from palette import PANTONE_FILE_PATH, load_pantone_colors
+from search_index import SEARCH_SCRIPT, build_search_index, decode_postings, search
+
+ENTRIES = [
+    ['19-4052', 'Classic Blue', '#0F4C81'],
+    ['11-0601', 'Bright White', '#F4F5F0'],
+    ['18-1663', 'Chili Pepper', '#9B1B30'],
+    ['14-4318', 'Sky Blue', '#8ABAD3'],
+]
+# 1-2 characters are scanned, 3+ go through the index; the last ones run across two fields
+QUERIES = ['', 'b', 'B', '#', '4', 'bl', '#0', '-4', 'blu', 'BLUE', 'sky blue', 'pepper', '19-', '#8abad3', 'zzz',
+           'blue#0', '4052classic', '0601 bright', 'white\n#f4', '\n']
+
+def viewer_fields(colors):
+    # The fields each generated page searched with its old substring scan
+    return {
+        'creator': [[code, color['name'], f"#{color['hex'].upper()}"] for code, color in colors.items()],
+        'list': [[color['name'], color['hex'], ', '.join(f'{value:.2f}' for value in color['cmyk'])]
+                 for color in colors.values()],
+        'pantoner2': [[color['name'], f"#{color['hex']}"] for color in colors.values()],
+    }
+
+def substring_matches(fields, query):
+    query = query.lower()
+    return [i for i, values in enumerate(fields) if any(query in value.lower() for value in values)]
+
+def sample_queries(fields, count, seed):
+    rng = random.Random(seed)
+    queries = ['', 'a', 'bl', 'blue', '#f', '19-', 'zzz', '0.00', 'dark-blue']
+    for _ in range(count):
+        value = rng.choice(rng.choice(fields)).lower()
+        start = rng.randrange(len(value))
+        queries.append(value[start:start + rng.randint(1, 8)])
+    return queries
+
+@pytest.fixture(scope='module')
+def viewers():
+    # Per generated page: the fields its old substring scan looked at, and its index
+    colors = load_pantone_colors(PANTONE_FILE_PATH)
+    return {
+        viewer: (fields, card_search_index(colors) if viewer == 'creator' else build_search_index(fields))
+        for viewer, fields in viewer_fields(colors).items()
+    }
+
+def test_hand_built_entries():
+    index = build_search_index(ENTRIES)
+    assert search(index, 'blue') == [0, 3]
+    assert search(index, 'b') == [0, 1, 2, 3]
+    assert search(index, '#9b') == [2]
+    assert search(index, '4052classic') == []
+    assert search(index, 'blue#0') == []
+    assert search(index, 'white\n#f4') == []
+    for query in QUERIES:
+        assert search(index, query) == substring_matches(ENTRIES, query), query
+
+@pytest.mark.parametrize('viewer', ['creator', 'list', 'pantoner2'])
+def test_index_matches_substring_search(viewers, viewer):
+    fields, index = viewers[viewer]
+    postings = decode_postings(index)
+    for query in QUERIES + sample_queries(fields, 300, seed=0):
+        assert search(index, query, postings) == substring_matches(fields, query), query
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_page_script_matches_python(viewers, tmp_path):
+    # SEARCH_SCRIPT itself, run under node, against the Python mirror
+    cases = [(ENTRIES, build_search_index(ENTRIES))] + list(viewers.values())
+    data = [{'index': index, 'queries': QUERIES + sample_queries(fields, 100, seed=1)} for fields, index in cases]
+    (tmp_path / 'data.json').write_text(json.dumps(data))
+    (tmp_path / 'run.js').write_text(SEARCH_SCRIPT + '''
+const data = JSON.parse(require("fs").readFileSync(process.argv[2], "utf8"));
+console.log(JSON.stringify(data.map(({index, queries}) => {
+  searchPostingsMap = null;
+  return queries.map(query => searchIndex(index, query));
+})));
+''')
+    output = subprocess.run(['node', str(tmp_path / 'run.js'), str(tmp_path / 'data.json')],
+                            check=True, capture_output=True, text=True).stdout
+    for case, found in zip(data, json.loads(output)):
+        postings = decode_postings(case['index'])
+        assert found == [search(case['index'], query, postings) for query in case['queries']]
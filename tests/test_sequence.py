@@ -0,0 +1,69 @@
+import json
+import numpy as np
+import pytest
+from PIL import Image
+from matcher import PantoneMatcher
+from palette import PANTONE_FILE_PATH, load_palette_table
+from picker import process_sequences
+from sequence import SequenceAnalyzer, process_sequence
+
+# Near the middle of their 5-bit histogram bins, so small noise stays in the same bins
+RED, BLUE = (204, 28, 44), (20, 60, 188)
+
+@pytest.fixture(scope='module')
+def matcher():
+    return PantoneMatcher(load_palette_table(PANTONE_FILE_PATH))
+
+def frame(color, noise=0, seed=0):
+    pixels = np.full((24, 32, 3), color, dtype=np.int64)
+    pixels += np.random.default_rng(seed).integers(-noise, noise + 1, pixels.shape)
+    return np.clip(pixels, 0, 255).astype(np.uint8)
+
+def save_frames(directory, frames):
+    directory.mkdir(parents=True)
+    paths = []
+    for i, pixels in enumerate(frames):
+        paths.append(str(directory / f'frame-{i}.png'))
+        Image.fromarray(pixels).save(paths[-1])
+    return paths
+
+def test_frames_under_the_threshold_reuse_the_last_palette(matcher):
+    analyzer = SequenceAnalyzer(matcher, num_colors=2, seed=0)
+    frames = [frame(RED), frame(RED, noise=2, seed=1), frame(RED), frame(BLUE), frame(BLUE, noise=2, seed=2)]
+    entries = [analyzer.add(pixels) for pixels in frames]
+    assert [entry['skipped'] for entry in entries] == [False, True, True, False, True]
+    assert (analyzer.frames, analyzer.analyzed) == (5, 2)
+    assert entries[1]['matches'] == entries[0]['matches']
+    assert entries[4]['matches'] == entries[3]['matches'] != entries[0]['matches']
+
+    # With no threshold every frame is clustered
+    analyzer = SequenceAnalyzer(matcher, num_colors=2, threshold=0, seed=0)
+    assert [analyzer.add(pixels)['skipped'] for pixels in frames] == [False, False, False, False, False]
+
+def test_aggregate_palette_covers_every_scene(matcher, tmp_path):
+    paths = save_frames(tmp_path / 'frames', [frame(RED), frame(RED), frame(RED), frame(BLUE)])
+    summary = process_sequence('frames', paths, matcher, str(tmp_path), num_colors=2, seed=0)
+    # Red is the only color of the first clustered frame; the summary palette holds both scenes
+    expected = {record['code'] for record in matcher.closest([RED, BLUE])}
+    assert {record['code'] for record in summary['palette']} == expected
+    assert (summary['frames'], summary['analyzed'], summary['skipped'], summary['errors']) == (4, 2, 2, 0)
+
+def test_unreadable_frames_are_reported_and_skipped(tmp_path):
+    first = save_frames(tmp_path / 'a' / 'shots', [frame(RED), frame(BLUE)])
+    second = save_frames(tmp_path / 'b' / 'shots', [frame(BLUE)] * 3)
+    with open(first[0], 'wb') as f:
+        f.write(b'not an image')
+
+    summaries = process_sequences([str(tmp_path / 'a' / 'shots'), str(tmp_path / 'b' / 'shots'),
+                                   str(tmp_path / 'b' / 'shots' / '*.png')], str(tmp_path / 'out'), num_colors=2, seed=0)
+    assert [(summary['frames'], summary['errors']) for summary in summaries] == [(1, 1), (3, 0), (3, 0)]
+    # Inputs with the same folder name still get reports of their own
+    names = [summary['sequence'] for summary in summaries]
+    assert len(set(names)) == 3 and all(name.startswith('shots-') for name in names)
+    for summary in summaries:
+        assert (tmp_path / 'out' / f"Sequence_{summary['sequence']}.json").exists()
+
+    with open(summaries[0]['timeline']) as f:
+        timeline = [json.loads(line) for line in f]
+    assert timeline[0]['source'] == first[0] and 'error' in timeline[0]
+    assert timeline[1]['frame'] == 0 and timeline[1]['source'] == first[1]
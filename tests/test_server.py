@@ -0,0 +1,62 @@
+import asyncio
+import io
+import json
+from http import HTTPStatus
+import pytest
+import server
+from matcher import PantoneMatcher
+from palette import load_palette_table
+from server import INLINE_MATCH_LIMITS, MatchService
+
+def request(service, method, target, body=b'', content_type='application/json'):
+    async def send():
+        return await service.respond(method, target, {'content-type': content_type}, body)
+    return asyncio.run(send())
+
+def colors_body(count):
+    return json.dumps({'colors': [[i % 256, 0, 0] for i in range(count)]}).encode()
+
+@pytest.mark.parametrize('metric', ['rgb', 'de2000'])
+def test_large_batches_are_offloaded(metric, monkeypatch):
+    service = MatchService(PantoneMatcher(load_palette_table(), metric=metric))
+    offloaded = []
+
+    async def offload(fn, *args):
+        offloaded.append(len(args[0]))
+        return fn.__name__
+
+    monkeypatch.setattr(service, 'offload', offload)
+    limit = INLINE_MATCH_LIMITS[metric]
+    status, payload = request(service, 'POST', '/match', colors_body(limit))
+    assert status == HTTPStatus.OK and len(payload['matches']) == limit
+    status, payload = request(service, 'POST', '/match', colors_body(limit + 1))
+    assert status == HTTPStatus.OK and payload['matches'] == '_match_task'
+    assert offloaded == [limit + 1]
+
+def test_unreadable_image_is_a_bad_request(tmp_path):
+    service = MatchService(PantoneMatcher(load_palette_table()))
+    status, payload = request(service, 'POST', '/extract', b'not an image', content_type='image/png')
+    assert status == HTTPStatus.BAD_REQUEST
+    assert payload['error'].startswith('Could not read image')
+
+    path = tmp_path / 'broken.png'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 64)
+    status, payload = request(service, 'POST', '/extract', json.dumps({'path': str(path)}).encode())
+    assert status == HTTPStatus.BAD_REQUEST
+    assert service.stats['errors'] == 0
+
+def test_tiled_extraction_of_an_upload(monkeypatch):
+    from PIL import Image
+
+    service = MatchService(PantoneMatcher(load_palette_table()))
+    monkeypatch.setattr(server, '_worker_matcher', service.matcher)
+
+    async def offload(fn, *args):
+        return fn(*args)
+
+    monkeypatch.setattr(service, 'offload', offload)
+    upload = io.BytesIO()
+    Image.new('RGB', (40, 30), (200, 30, 30)).save(upload, 'PNG')
+    status, payload = request(service, 'POST', '/extract?tile_rows=8&colors=2', upload.getvalue(), content_type='image/png')
+    assert status == HTTPStatus.OK
+    assert payload['matches']
@@ -0,0 +1,49 @@
+import pytest
+from palette import SORT_ORDERS, sort_orders
+
+# Two swatches share a name and a color (0 and 6), and three are greys (1, 3, 5)
+PALETTE = {
+    '19-4052': {'name': 'Classic Blue', 'hex': '0000ff'},
+    '11-0601': {'name': 'Bright White', 'hex': 'ffffff'},
+    '18-1663': {'name': 'Chili', 'hex': 'ff0000'},
+    '19-0303': {'name': 'Jet Black', 'hex': '000000'},
+    '15-0343': {'name': 'Greenery', 'hex': '00ff00'},
+    '14-4102': {'name': 'Glacier Gray', 'hex': '808080'},
+    '19-4053': {'name': 'classic blue', 'hex': '0000FF'},
+    '12-0752': {'name': 'Buttercup', 'hex': 'ffff00'},
+    '9-4020': {'name': 'Aqua', 'hex': '00ffff'},
+}
+
+# Worked out by hand. CIELAB: blue L 32.3 C 133.8 h 306, red L 53.2 C 104.6 h 40,
+# green L 87.7 C 119.8 h 136, yellow L 97.1 C 96.9 h 103, cyan L 91.1 C 50.1 h 196,
+# greys L 0 / 53.6 / 100 with chroma (nearly) 0, black lowest
+EXPECTED = {
+    'name': ([8, 1, 7, 2, 0, 6, 5, 4, 3], [3, 4, 5, 0, 6, 2, 7, 1, 8]),
+    # Numeric parts compare as numbers: 9-4020 comes before 11-0601
+    'pantone': ([8, 1, 7, 5, 4, 2, 3, 0, 6], [6, 0, 3, 2, 4, 5, 7, 1, 8]),
+    'hex': ([3, 0, 6, 4, 8, 5, 2, 7, 1], [1, 7, 2, 5, 8, 4, 0, 6, 3]),
+    # Greys first, dark to light, then by hue angle
+    'hue': ([3, 5, 1, 2, 7, 4, 8, 0, 6], [0, 6, 8, 4, 7, 2, 1, 5, 3]),
+    'lightness': ([3, 0, 6, 2, 5, 4, 8, 7, 1], [1, 7, 8, 4, 5, 2, 0, 6, 3]),
+    'chroma': ([3, 5, 1, 8, 7, 2, 4, 0, 6], [0, 6, 4, 2, 7, 8, 1, 5, 3]),
+}
+
+def test_every_order_is_covered():
+    assert set(sort_orders(PALETTE)) == set(SORT_ORDERS) == set(EXPECTED)
+
+@pytest.mark.parametrize('name', SORT_ORDERS)
+def test_orders_both_directions(name):
+    ascending, descending = sort_orders(PALETTE)[name]
+    assert ascending == EXPECTED[name][0]
+    assert descending == EXPECTED[name][1]
+
+def test_equal_keys_keep_palette_order():
+    # Swatches 0 and 6 tie on every key but their code
+    for name, (ascending, descending) in sort_orders(PALETTE).items():
+        if name == 'pantone':
+            continue
+        assert ascending.index(0) < ascending.index(6)
+        assert descending.index(0) < descending.index(6)
+
+def test_empty_palette():
+    assert sort_orders({}) == {name: [[], []] for name in SORT_ORDERS}
@@ -0,0 +1,46 @@
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from streaming import _png_strip_reader, _raw_strip_reader, _tiff_strip_reader, iter_strips
+
+FORMATS = [
+    ('raw.tif', 'RGB', {}, _raw_strip_reader),
+    ('lzw.tif', 'RGB', {'compression': 'tiff_lzw'}, _tiff_strip_reader),
+    ('tiled.tif', 'RGB', {'compression': 'tiff_adobe_deflate', 'tile': (64, 64)}, _tiff_strip_reader),
+    ('palette.tif', 'P', {'compression': 'tiff_lzw'}, _tiff_strip_reader),
+    ('rgba.tif', 'RGBA', {'compression': 'tiff_lzw'}, _tiff_strip_reader),
+    ('jpeg.tif', 'RGB', {'compression': 'jpeg'}, _tiff_strip_reader),
+    ('rgb.png', 'RGB', {}, _png_strip_reader),
+    ('palette.png', 'P', {}, _png_strip_reader),
+    ('rgba.png', 'RGBA', {}, _png_strip_reader),
+    ('gray.png', 'LA', {}, _png_strip_reader),
+    ('photo.jpg', 'RGB', {'quality': 90}, None),
+]
+
+def sample_image(mode):
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:157, 0:131]
+    pixels = np.stack([x % 256, y % 256, (x * y) % 256], axis=-1).astype(np.uint8)
+    pixels[::7] = rng.integers(0, 256, pixels[::7].shape)
+    img = Image.fromarray(pixels)
+    return img.convert(mode, palette=Image.ADAPTIVE) if mode == 'P' else img.convert(mode)
+
+@pytest.mark.parametrize('name, mode, options, reader', FORMATS)
+def test_strips_match_full_decode(tmp_path, name, mode, options, reader):
+    path = str(tmp_path / name)
+    sample_image(mode).save(path, **options)
+    with Image.open(path) as img:
+        if reader is not None:
+            assert reader(img, path, 16) is not None
+        expected = np.asarray(img.convert('RGB'))
+
+    for tile_rows in (1, 10, 64, 1000):
+        assert np.array_equal(np.concatenate(list(iter_strips(path, tile_rows))), expected)
+
+@pytest.mark.parametrize('name, mode, options, reader', FORMATS)
+def test_file_objects_stream_like_paths(tmp_path, name, mode, options, reader):
+    path = tmp_path / name
+    sample_image(mode).save(str(path), **options)
+    expected = np.concatenate(list(iter_strips(str(path), 10)))
+    assert np.array_equal(np.concatenate(list(iter_strips(io.BytesIO(path.read_bytes()), 10))), expected)
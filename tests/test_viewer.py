@@ -0,0 +1,65 @@
+import json
+import math
+import re
+from html.parser import HTMLParser
+import pytest
+from creator import CARD_GAP, CARD_HEIGHT, CARD_WIDTH, generate_html
+from palette import PANTONE_FILE_PATH, load_pantone_colors
+
+# Budgets for the virtual mode on a 1920x1080 viewport
+BYTE_BUDGET = 400 * 1024
+NODE_BUDGET = 1500
+# Elements in one rendered .card tree (card, color-block, card-info, 4 <p>, 4 <span>)
+NODES_PER_CARD = 11
+
+class ElementCounter(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.elements = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.elements += 1
+
+def count_elements(html):
+    counter = ElementCounter()
+    counter.feed(html)
+    counter.close()
+    return counter.elements
+
+def window_cards(viewport_width, viewport_height, buffer_rows=2):
+    # Cards the virtual window keeps rendered: the visible rows, a partial one and the buffer rows either side
+    columns = max(1, (viewport_width + CARD_GAP) // (CARD_WIDTH + CARD_GAP))
+    rows = math.ceil(viewport_height / (CARD_HEIGHT + CARD_GAP)) + 1 + 2 * buffer_rows
+    return columns * rows
+
+@pytest.fixture(scope='module')
+def colors():
+    return load_pantone_colors(PANTONE_FILE_PATH)
+
+def test_virtual_mode_stays_within_budget(colors, tmp_path):
+    path = tmp_path / 'virtual.html'
+    generate_html(colors, str(path), 'virtual')
+    html = path.read_text()
+    # The static page plus the cards rendered for a 1920x1080 viewport
+    elements = count_elements(html) + window_cards(1920, 1080) * NODES_PER_CARD
+    assert len(html.encode()) <= BYTE_BUDGET
+    assert elements <= NODE_BUDGET
+
+def test_virtual_mode_embeds_every_swatch(colors, tmp_path):
+    path = tmp_path / 'virtual.html'
+    generate_html(colors, str(path), 'virtual')
+    data = re.search(r'<script type="application/json" id="paletteData">(.*?)</script>', path.read_text()).group(1)
+    rows = json.loads(data)
+    assert [row[0] for row in rows] == list(colors)
+    assert [row[2] for row in rows] == [color['hex'].upper() for color in colors.values()]
+
+def test_cards_mode_renders_every_swatch(colors, tmp_path):
+    path = tmp_path / 'cards.html'
+    generate_html(colors, str(path))
+    assert path.read_text().count('<div class="card" ') == len(colors)
+
+@pytest.mark.parametrize('mode', ['cards', 'virtual'])
+def test_bare_file_name(colors, tmp_path, monkeypatch, mode):
+    monkeypatch.chdir(tmp_path)
+    generate_html(colors, 'swatches.html', mode)
+    assert (tmp_path / 'swatches.html').exists()